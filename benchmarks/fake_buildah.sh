@@ -0,0 +1,111 @@
+#!/bin/sh
+# Stand-in for buildah used by the orchestration benchmarks.
+# Records every invocation and answers instantly. Images are files under $FAKE_BUILDAH_STATE/images,
+# named by image ID and holding one image name per line.
+set -e
+
+STATE="${FAKE_BUILDAH_STATE:?FAKE_BUILDAH_STATE is not set}"
+mkdir -p "$STATE/images"
+echo "$*" >> "$STATE/invocations.log"
+
+normalize() {
+    t=$1
+    case "$t" in
+        */*)
+            first=${t%%/*}
+            case "$first" in
+                *.*|*:*|localhost) ;;
+                *) t="localhost/$t" ;;
+            esac ;;
+        *) t="localhost/$t" ;;
+    esac
+    case "${t##*/}" in
+        *:*|*@*) ;;
+        *) t="$t:latest" ;;
+    esac
+    echo "$t"
+}
+
+find_image() {
+    for f in "$STATE"/images/*; do
+        [ -f "$f" ] || continue
+        while read -r name; do
+            if [ "$name" = "$1" ]; then
+                echo "${f##*/}"
+                return 0
+            fi
+        done < "$f"
+    done
+    return 1
+}
+
+untag() {
+    # Removes one name from its image; the image stays, possibly without names, like a dangling image
+    if old=$(find_image "$1"); then
+        grep -vxF "$1" "$STATE/images/$old" > "$STATE/images/$old.tmp" || true
+        mv "$STATE/images/$old.tmp" "$STATE/images/$old"
+    fi
+}
+
+cmd=$1
+shift
+case "$cmd" in
+    images)
+        if [ "$1" = "--json" ]; then
+            sep=""
+            printf '['
+            for f in "$STATE"/images/*; do
+                [ -f "$f" ] || continue
+                names=""
+                while read -r name; do
+                    names="$names${names:+,}\"$name\""
+                done < "$f"
+                printf '%s{"id":"%s","names":[%s],"size":"1 MB","created":0}' "$sep" "${f##*/}" "$names"
+                sep=","
+            done
+            printf ']\n'
+        elif [ "$1" = "-q" ]; then
+            find_image "$(normalize "$2")" || true
+        fi ;;
+    from)
+        echo "$2" ;;
+    commit)
+        for tag; do :; done
+        tag=$(normalize "$tag")
+        n=0
+        [ -f "$STATE/counter" ] && read -r n < "$STATE/counter"
+        n=$((n + 1))
+        echo "$n" > "$STATE/counter"
+        id=$(printf '%064d' "$n")
+        untag "$tag"
+        echo "$tag" > "$STATE/images/$id"
+        echo "$id" ;;
+    tag)
+        id=$(find_image "$(normalize "$1")") || { echo "image not known: $1" >&2; exit 1; }
+        shift
+        for name; do
+            name=$(normalize "$name")
+            untag "$name"
+            echo "$name" >> "$STATE/images/$id"
+        done ;;
+    rmi)
+        for name; do
+            case "$name" in -*) continue ;; esac
+            name=$(normalize "$name")
+            if id=$(find_image "$name"); then
+                untag "$name"
+                [ -s "$STATE/images/$id" ] || rm -f "$STATE/images/$id"
+            fi
+        done ;;
+    containers)
+        echo "[]" ;;
+    inspect)
+        echo "{}" ;;
+    run)
+        for last; do :; done
+        if [ "$last" = "--version" ]; then
+            echo "Valkey server v=0.0.0 sha=00000000:0 malloc=libc bits=64 build=0"
+        fi ;;
+    *) ;;
+esac
+exit 0
@@ -0,0 +1,174 @@
+"""
+Orchestration-overhead benchmarks.
+
+Runs the core, module and runtime builders end to end against a stub buildah (fake_buildah.sh) that answers
+instantly, so the measured time is the Python side: spec handling, hashing, cache checks, argument assembly,
+logging and subprocess spawning. Each builder is measured cold (empty image storage) and fully warm (every
+cached step hits).
+
+Usage:
+    PYTHONPATH=src python benchmarks/orchestration.py [--repeat N] [--output results.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Callable
+
+import yaml
+from rich.console import Console
+from rich.table import Table
+
+from valkey_setup.containers.core.builder import CoreBuilder
+from valkey_setup.containers.modules.valkey_bloom.builder import ValkeyBloomBuilder
+from valkey_setup.containers.modules.valkey_json.builder import ValkeyJsonBuilder
+from valkey_setup.containers.modules.valkey_search.builder import ValkeySearchBuilder
+from valkey_setup.containers.runtime.builder import RuntimeBuilder, MODULES
+from valkey_setup.core import BuildSpec, tracer
+
+ROOT = Path(__file__).resolve().parent.parent
+FAKE_BUILDAH = Path(__file__).resolve().parent / "fake_buildah.sh"
+
+console = Console()
+
+
+def load_bench_spec(spec_file: Path, state_dir: Path) -> BuildSpec:
+    """
+    Load the build spec and point it at the stub buildah and scratch locations.
+    :param spec_file:
+    :param state_dir:
+    :return:
+    """
+    with open(spec_file, "r") as f:
+        data = yaml.safe_load(f)
+
+    data["Buildah"] = {"Path": str(FAKE_BUILDAH)}
+    data["CompilerCache"] = {"Enabled": False}
+    data["ArtifactStore"] = {"Enabled": False}
+    data["Cache"] = {"UsageFile": str(state_dir / "cache-usage.json")}
+    data["Valkey"]["Runtime"]["Resources"] = str(ROOT / data["Valkey"]["Runtime"].get("Resources", "resources"))
+
+    return BuildSpec(**data)
+
+
+def scenarios(config: BuildSpec) -> List[tuple[str, Callable[[], None]]]:
+    """
+    Builders in dependency order; the runtime includes every module.
+    :param config:
+    :return:
+    """
+    return [
+        ("core", lambda: CoreBuilder(config).build()),
+        ("valkey-json", lambda: ValkeyJsonBuilder(config).build()),
+        ("valkey-search", lambda: ValkeySearchBuilder(config).build()),
+        ("valkey-bloom", lambda: ValkeyBloomBuilder(config).build()),
+        ("runtime", lambda: RuntimeBuilder(config, modules=[(module, "latest") for module in MODULES]).build()),
+    ]
+
+
+def measure(build: Callable[[], None], state_dir: Path) -> Dict[str, Any]:
+    """
+    Run one build with output suppressed.
+    :param build:
+    :param state_dir:
+    :return: wall time, subprocess count and time, cache hits/misses and cache-path latency.
+    """
+    log = state_dir / "invocations.log"
+    calls_before = len(log.read_text().splitlines()) if log.exists() else 0
+    spans_before = len(tracer.spans)
+
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        start = time.perf_counter()
+        build()
+        wall = time.perf_counter() - start
+
+    spans = tracer.spans[spans_before:]
+    subprocesses = [s for s in spans if s["cat"] == "subprocess"]
+    cached_steps = [s for s in spans if s["cat"] == "step" and "cache" in s["args"]]
+    hits = [s["duration"] for s in cached_steps if s["args"]["cache"] == "hit"]
+    checks = [s["duration"] for s in spans if s["name"] == "image_check"]
+
+    return {
+        "wall": wall,
+        "subprocesses": len(log.read_text().splitlines()) - calls_before,
+        "subprocess_time": sum(s["duration"] for s in subprocesses),
+        "hits": len(hits),
+        "misses": len(cached_steps) - len(hits),
+        "hit_latency": statistics.mean(hits) if hits else 0.0,
+        "image_check_latency": statistics.mean(checks) if checks else 0.0,
+    }
+
+
+def run(spec_file: Path, repeat: int) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    :param spec_file:
+    :param repeat: number of cold/warm rounds; the median of each metric is reported.
+    :return: {case: {builder: metrics}}
+    :raises RuntimeError: if a warm build misses a cached step.
+    """
+    tracer.enable()
+    rounds: Dict[str, Dict[str, List[Dict[str, Any]]]] = {"cold": {}, "warm": {}}
+
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp:
+            state_dir = Path(tmp)
+            os.environ["FAKE_BUILDAH_STATE"] = str(state_dir)
+            config = load_bench_spec(spec_file, state_dir)
+
+            for case in ("cold", "warm"):
+                for name, build in scenarios(config):
+                    metrics = measure(build, state_dir)
+                    if case == "warm" and metrics["misses"]:
+                        raise RuntimeError(f"Warm {name} build missed {metrics['misses']} of "
+                                           f"{metrics['hits'] + metrics['misses']} cached steps")
+                    rounds[case].setdefault(name, []).append(metrics)
+
+    return {
+        case: {
+            name: {key: statistics.median(m[key] for m in results) for key in results[0]}
+            for name, results in builders.items()
+        }
+        for case, builders in rounds.items()
+    }
+
+
+def print_results(results: Dict[str, Dict[str, Dict[str, Any]]]):
+    table = Table(title="Orchestration overhead (stub buildah)")
+    for column in ["Case", "Builder", "Wall (ms)", "Subprocesses", "Subprocess (ms)", "Python (ms)", "Hits/Cached",
+                   "Hit latency (ms)", "Image check (µs)"]:
+        table.add_column(column, justify="left" if column in ("Case", "Builder") else "right")
+
+    for case, builders in results.items():
+        for name, m in builders.items():
+            table.add_row(case, name, f"{m['wall'] * 1e3:.1f}", f"{m['subprocesses']:.0f}",
+                          f"{m['subprocess_time'] * 1e3:.1f}", f"{(m['wall'] - m['subprocess_time']) * 1e3:.1f}",
+                          f"{m['hits']:.0f}/{m['hits'] + m['misses']:.0f}", f"{m['hit_latency'] * 1e3:.2f}",
+                          f"{m['image_check_latency'] * 1e6:.1f}")
+    console.print(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark orchestration overhead against a stub buildah.")
+    parser.add_argument("--spec", type=Path, default=ROOT / "configs" / "build.yaml",
+                        help="Path to build specification file.")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of cold/warm rounds (median is reported).")
+    parser.add_argument("--output", type=Path, default=None, help="Optional. Write results as JSON to this file.")
+    args = parser.parse_args()
+
+    results = run(args.spec, args.repeat)
+    print_results(results)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        console.print(f"Results written to: [green]{args.output}[/green]")
+
+
+if __name__ == "__main__":
+    main()
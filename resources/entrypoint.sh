@@ -1,6 +1,22 @@
 #!/bin/sh
 set -e
 
+# Images built for a specific x86-64 level (VALKEY_MARCH) would crash with SIGILL on an older CPU
+if [ -n "$VALKEY_MARCH" ] && [ -x /usr/local/bin/x86-64-level ]; then
+    supported=$(/usr/local/bin/x86-64-level)
+    level() {
+        case "$1" in
+            x86-64-v*) echo "${1#x86-64-v}" ;;
+            *) echo 1 ;;
+        esac
+    }
+    if [ "$(level "$VALKEY_MARCH")" -gt "$(level "$supported")" ]; then
+        echo "This image is built for $VALKEY_MARCH but the CPU only supports $supported." >&2
+        echo "Use the $supported variant of the image." >&2
+        exit 1
+    fi
+fi
+
 if [ "$#" -eq 0 ]; then
     set -- valkey-server /usr/share/valkey/config/valkey.conf
 fi
@@ -0,0 +1,29 @@
+#!/bin/sh
+# Print the highest x86-64 microarchitecture level this CPU supports: x86-64, x86-64-v2, x86-64-v3 or x86-64-v4.
+# Use it to pick the matching image variant on a node, e.g. IMAGE="localhost/valkey:9.0.1-$(./x86-64-level.sh)".
+
+flags=""
+while IFS=: read -r key value; do
+    case "$key" in
+        flags*) flags=" $value "; break ;;
+    esac
+done < /proc/cpuinfo
+
+has() {
+    for flag; do
+        case "$flags" in
+            *" $flag "*) ;;
+            *) return 1 ;;
+        esac
+    done
+}
+
+if ! has cx16 lahf_lm popcnt sse4_1 sse4_2 ssse3; then
+    echo "x86-64"
+elif ! has avx avx2 bmi1 bmi2 f16c fma abm movbe xsave; then
+    echo "x86-64-v2"
+elif ! has avx512f avx512bw avx512cd avx512dq avx512vl; then
+    echo "x86-64-v3"
+else
+    echo "x86-64-v4"
+fi
@@ -0,0 +1,111 @@
+from pathlib import Path
+from typing import Optional
+
+import typer
+
+from valkey_setup.containers.pipeline import PipelineBuilder
+from valkey_setup.core import load_spec, BuildSpec, parse_size, parse_duration
+
+app = typer.Typer(help="Manage cache layers of all components.")
+
+
+@app.command("gc", help="Evict least recently used cache layers until the cache fits the disk budget and age limit.")
+def gc(
+        spec_file: Optional[Path] = typer.Option("configs/build.yaml", "--spec", "--s",
+                                                 help="Path to build specification file."),
+        cache_prefix: Optional[str] = typer.Option("", "--cache-prefix", "--c",
+                                                   help="Optional. Prefix of cache layers to collect. Defaults to all cache layers of the project."),
+        max_size: Optional[str] = typer.Option("", "--max-size",
+                                               help="Optional. Disk budget e.g, 50G. Overrides Cache.MaxSize in the spec."),
+        max_age: Optional[str] = typer.Option("", "--max-age",
+                                              help="Optional. Evict layers unused for longer than this e.g, 14d. Overrides Cache.MaxAge in the spec."),
+        dry_run: Optional[bool] = typer.Option(False, "--dry-run",
+                                               help="Optional. Only print the layers that would be removed.")
+):
+    """
+    Evict least recently used cache layers.
+
+    :param spec_file: Path to build spec file.
+    :param cache_prefix: Prefix of cache layers to collect.
+    :param max_size: Disk budget.
+    :param max_age: Maximum time since last use.
+    :param dry_run: Only report.
+    :return:
+    """
+    config = load_spec(spec_file, BuildSpec)
+
+    max_size = max_size or config.Cache.MaxSize
+    max_age = max_age or config.Cache.MaxAge
+    if not max_size and not max_age:
+        raise typer.BadParameter("Set --max-size and/or --max-age (or Cache.MaxSize / Cache.MaxAge in the spec).")
+
+    builder = PipelineBuilder(config, cache_prefix)
+
+    builder.gc_cache_images(max_size=parse_size(max_size) if max_size else None,
+                            max_age=parse_duration(max_age) if max_age else None, dry_run=dry_run)
+
+
+@app.command("export", help="Export cache layers to an OCI image layout directory or .tar archive.")
+def export(
+        output: Path = typer.Option(..., "--output", "--o",
+                                    help="Destination OCI layout directory, or archive file ending in .tar. Existing layouts are updated incrementally."),
+        spec_file: Optional[Path] = typer.Option("configs/build.yaml", "--spec", "--s",
+                                                 help="Path to build specification file."),
+        cache_prefix: Optional[str] = typer.Option("", "--cache-prefix", "--c",
+                                                   help="Optional. Prefix of cache layers to export. Defaults to all cache layers of the project.")
+):
+    """
+    Export cache layers so other hosts can start warm.
+
+    :param output: Destination layout directory or archive.
+    :param spec_file: Path to build spec file.
+    :param cache_prefix: Prefix of cache layers to export.
+    :return:
+    """
+    config = load_spec(spec_file, BuildSpec)
+
+    builder = PipelineBuilder(config, cache_prefix)
+
+    builder.export_cache_images(output)
+
+
+@app.command("import", help="Import cache layers from an OCI image layout directory or .tar archive.")
+def import_(
+        input_path: Path = typer.Option(..., "--input", "--i",
+                                        help="OCI layout directory or .tar archive written by 'cache export'."),
+        spec_file: Optional[Path] = typer.Option("configs/build.yaml", "--spec", "--s",
+                                                 help="Path to build specification file.")
+):
+    """
+    Import cache layers exported on another host, keeping their tags.
+
+    :param input_path: Source layout directory or archive.
+    :param spec_file: Path to build spec file.
+    :return:
+    """
+    config = load_spec(spec_file, BuildSpec)
+
+    builder = PipelineBuilder(config)
+
+    builder.import_cache_images(input_path)
+
+
+@app.command("delete", help="Delete all cache layers of the project.")
+def delete(
+        spec_file: Optional[Path] = typer.Option("configs/build.yaml", "--spec", "--s",
+                                                 help="Path to build specification file."),
+        cache_prefix: Optional[str] = typer.Option("", "--cache-prefix", "--c",
+                                                   help="Optional. Prefix of cache layers to delete. Defaults to all cache layers of the project.")
+):
+    """
+    Delete all cache layers of the project.
+
+    :param spec_file: Path to build spec file.
+    :param cache_prefix: Prefix of cache layers to delete.
+    :return:
+    """
+    config = load_spec(spec_file, BuildSpec)
+
+    builder = PipelineBuilder(config, cache_prefix)
+
+    builder.prune_cache_images()
@@ -1,8 +1,16 @@
+from pathlib import Path
+from typing import Optional
+
 import typer
 from rich.console import Console
 from .core import app as core_app
 from .modules import app as modules_app
 from .runtime import app as runtime_app
+from .runtime.runtime import parse_modules
+from .pipeline import PipelineBuilder
+from .cache import app as cache_app
+from .image import app as image_app
+from valkey_setup.core import BuildSpec, load_spec, tracer, planner
 
 app = typer.Typer(help="Container components for the valkey stack.")
 console = Console()
@@ -10,3 +18,135 @@ console = Console()
 app.add_typer(core_app, name="core")
 app.add_typer(modules_app, name="modules")
 app.add_typer(runtime_app, name="runtime")
+app.add_typer(cache_app, name="cache")
+app.add_typer(image_app, name="image")
+
+
+@app.callback()
+def main(
+        ctx: typer.Context,
+        trace: Optional[Path] = typer.Option(None, "--trace",
+                                             help="Optional. Record timed spans of every build step and buildah call and write them to this file as a Chrome trace (chrome://tracing, Perfetto)."),
+        plan: Optional[bool] = typer.Option(False, "--plan",
+                                            help="Optional. Dry run: resolve every cache layer against local images and report which steps hit and which would be rebuilt, without building anything."),
+        plan_output: Optional[Path] = typer.Option(None, "--plan-output",
+                                                   help="Optional. Write the plan as JSON to this file. Implies --plan.")
+):
+    """
+    Container components for the valkey stack.
+
+    :param ctx:
+    :param trace: Path of the Chrome trace file to write.
+    :param plan: Only plan the build.
+    :param plan_output: Path of the JSON plan to write.
+    :return:
+    """
+    if trace:
+        tracer.enable()
+
+        def finish_trace():
+            tracer.print_summary()
+            tracer.write_chrome_trace(trace)
+            console.print(f"Trace written to: [green]{trace}[/green]")
+
+        ctx.call_on_close(finish_trace)
+
+    if plan or plan_output:
+        planner.enable()
+
+        def finish_plan():
+            planner.print_summary()
+            if plan_output:
+                planner.write_json(plan_output)
+                console.print(f"Plan written to: [green]{plan_output}[/green]")
+
+        ctx.call_on_close(finish_plan)
+
+
+@app.command("build-all", help="Build core, modules and runtime, running independent builds in parallel.")
+def build_all(
+        spec_file: Optional[Path] = typer.Option("configs/build.yaml", "--spec", "--s",
+                                                 help="Path to build specification file."),
+        image_name: Optional[str] = typer.Option("valkey", "--image-name", "--n",
+                                                 help="Name of new valkey runtime image."),
+        image_tag: Optional[str] = typer.Option("", "--image-tag", "--t",
+                                                help="Optional. Tag of new valkey runtime image"),
+        modules: Optional[str] = typer.Option("", "--modules", "--m",
+                                              help="Optional. Comma-separated list of modules e.g, valkey-json=1.0.0, valkey-search=latest"),
+        cache_prefix: Optional[str] = typer.Option("", "--cache-prefix", "--c",
+                                                   help="Optional. Custom prefix for generated images acting as cache layers. Core, module and runtime layers go under <prefix>/<component>/<version>."),
+        jobs: Optional[int] = typer.Option(4, "--jobs", "--j",
+                                           help="Optional. Maximum number of builds running at the same time."),
+        remove_package_manager: Optional[bool] = typer.Option(True, "--remove-package-manager", "--rp",
+                                                              help="Optional. Remove dependency manager at the end of image build. Slims the image and improves security."),
+        squash: Optional[bool] = typer.Option(True, "--squash", "--sq",
+                                              help="Optional. Merge layers into one. Important if remove_package_manager is set to True"),
+        variants: Optional[str] = typer.Option("", "--variants",
+                                               help="Optional. Comma-separated x86-64 levels e.g, x86-64-v2,x86-64-v3,x86-64-v4. Each is built into separately tagged images. Defaults to Variants.Levels in the spec."),
+        pgo: Optional[bool] = typer.Option(False, "--pgo",
+                                           help="Optional. Profile-guided build of valkey-server (see Valkey.Build.Pgo in the spec)."),
+        debuginfo: Optional[bool] = typer.Option(False, "--debuginfo",
+                                                 help="Optional. Split debug info of core and modules into separate <tag>-debuginfo images."),
+        minimal: Optional[bool] = typer.Option(False, "--minimal",
+                                               help="Optional. Build the runtime from scratch with only valkey, the shared libraries it loads and the files in Valkey.Runtime.Minimal."),
+        layered: Optional[bool] = typer.Option(False, "--layered",
+                                               help="Optional. Build the runtime as stable per-component layers instead of squashing it."),
+        reproducible: Optional[bool] = typer.Option(False, "--reproducible",
+                                                    help="Optional. Reproducible core, module and runtime builds: SOURCE_DATE_EPOCH for compile steps and fixed image and file timestamps without history (see Reproducible in the spec).")
+):
+    """
+    Build core, requested modules and the runtime image.
+    Core and modules are built concurrently; the runtime starts once all of them are done.
+
+    :param spec_file: Path to build spec file.
+    :param image_name: Name of the runtime image.
+    :param image_tag: Tag of the runtime image.
+    :param modules: Modules to build and include in the runtime.
+    :param cache_prefix: Custom prefix for cache layers generated.
+    :param jobs: Maximum number of concurrent builds.
+    :param remove_package_manager:
+    :param squash:
+    :param variants: x86-64 levels to build.
+    :param pgo: Profile-guided core build.
+    :param debuginfo: Split debug info into separate images.
+    :param minimal: Build the runtime from scratch.
+    :param layered: Build the runtime as per-component layers.
+    :param reproducible: Normalize timestamps.
+    :return:
+    """
+    config = load_spec(spec_file, BuildSpec)
+    config.Reproducible.Enabled = config.Reproducible.Enabled or reproducible
+
+    module_list = parse_modules(modules)
+    variant_list = [march.strip() for march in variants.split(",") if march.strip()]
+
+    builder = PipelineBuilder(config, cache_prefix, image_name=image_name, image_tag=image_tag, modules=module_list,
+                              remove_package_manager=remove_package_manager, squash=squash, jobs=jobs,
+                              variants=variant_list, pgo=pgo, debuginfo=debuginfo, minimal=minimal,
+                              layered=layered)
+
+    builder.build()
+
+
+@app.command("fetch", help="Download core and module sources into the local artifact store.")
+def fetch(
+        spec_file: Optional[Path] = typer.Option("configs/build.yaml", "--spec", "--s",
+                                                 help="Path to build specification file."),
+        modules: Optional[str] = typer.Option("", "--modules", "--m",
+                                              help="Optional. Comma-separated list of modules e.g, valkey-json=1.0.0, valkey-search=latest. Defaults to all modules."),
+        record: Optional[bool] = typer.Option(False, "--record",
+                                              help="Optional. Accept sources without a Sha256 in the spec and write their computed digests into the spec file.")
+):
+    """
+    Download and verify sources ahead of a build, e.g. to seed an offline build host.
+
+    :param spec_file: Path to build spec file.
+    :param modules: Modules whose sources to fetch.
+    :param record: Pin the digests of unpinned sources in the spec file.
+    :return:
+    """
+    config = load_spec(spec_file, BuildSpec)
+
+    builder = PipelineBuilder(config, modules=parse_modules(modules))
+
+    builder.fetch(spec_file if record else None)
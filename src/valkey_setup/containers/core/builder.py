@@ -1,11 +1,34 @@
-from valkey_setup.core import BaseBuilder, BuildahContainer, prune_cache_images, BuildSpec, init_base_distro
+import shlex
+from pathlib import Path
+from typing import Dict, Optional
+
+from valkey_setup.core import BaseBuilder, BuildahContainer, prune_cache_images, BuildSpec, init_base_distro, \
+    CompilerCache, Toolchain, ArtifactStore, check_march, variant_tag, march_env, split_debuginfo_script, \
+    commit_debuginfo_image, debuginfo_tag, reproducible_env
+
+
+PGO_PROFILE_DIR = "/tmp/valkey-pgo"
+PGO_PORT = 6399
 
 
 class CoreBuilder(BaseBuilder):
-    def __init__(self, config: BuildSpec, cache_prefix: str = ""):
+    def __init__(self, config: BuildSpec, cache_prefix: str = "", march: str = "", pgo: bool = False,
+                 debuginfo: bool = False):
+        """
+        :param config:
+        :param cache_prefix:
+        :param march: x86-64 level to build for, e.g. x86-64-v3. Appended to the image tag.
+        :param pgo: profile-guided build; defaults to Valkey.Build.Pgo.Enabled in the spec.
+        :param debuginfo: strip the binaries and commit their debug info into a <tag>-debuginfo image; defaults to
+            DebugInfo.Enabled in the spec.
+        """
         super().__init__(config, cache_prefix)
+        self.march = check_march(march)
+        self.pgo = pgo or self.config.Valkey.Build.Pgo.Enabled
+        self.debuginfo = debuginfo or self.config.DebugInfo.Enabled
         self.image_name = f"{self.config.ProjectName}-core"
-        self.image_tag = self.config.Valkey.Version
+        self.image_tag = variant_tag(self.config.Valkey.Version, self.march)
+        self.artifact_store = ArtifactStore(self.config)
 
     def _init_cache_prefix(self, cache_prefix: str):
         if len(cache_prefix) > 0:
@@ -17,23 +40,27 @@ class CoreBuilder(BaseBuilder):
         self.log(f"Starting build for Valkey {self.config.Valkey.Version} core", style="bold blue")
 
         current_step = 1
-        total_no_of_steps = 7
+        # deps, source, compile, verify and tag, plus the optional PGO training and debug info split
+        total_no_of_steps = 5 + int(self.pgo) + int(self.debuginfo)
 
         with BuildahContainer(
                 base_image=self.config.BaseImage,
-                image_name=self.image_name,
+                image_name=variant_tag(self.image_name, self.march),
                 config=self.config,
                 cache_prefix=self.cache_prefix
         ) as container:
             base_distro = init_base_distro(self.config.Distro, container)
+            compiler_cache = CompilerCache(self.config, Toolchain.MAKE)
+            build_dependencies = self.config.Valkey.Build.Dependencies + compiler_cache.packages()
+
             self.log(
                 f"[bold blue]Step {current_step}/{total_no_of_steps}[/bold blue]: Installing build dependencies")
 
             base_distro.refresh_package_repository()
 
             base_distro.install_packages(
-                packages=self.config.Valkey.Build.Dependencies,
-                extra_cache_keys={"step": "deps", "packages": sorted(self.config.Valkey.Build.Dependencies)}
+                packages=build_dependencies,
+                extra_cache_keys={"step": "deps", "packages": sorted(build_dependencies)}
             )
 
             current_step += 1
@@ -43,18 +70,38 @@ class CoreBuilder(BaseBuilder):
             tar_path = f"/tmp/valkey-{self.config.Valkey.Version}.tar.gz"
             src_dir = f"/tmp/valkey-{self.config.Valkey.Version}"
 
-            container.run_cached(
-                command=[
-                    "sh", "-c",
-                    f"curl -L '{self.config.Valkey.SourceUrl}' -o {tar_path} && tar -xf {tar_path} -C /tmp"
-                ],
-                extra_cache_keys={"step": "source", "url": self.config.Valkey.SourceUrl, "src_dir": src_dir,
-                                  "tar_path": tar_path}
-            )
+            if self.artifact_store.enabled:
+                # Archive extracts into src_dir
+                container.copy_host_container(self.fetch_source(), "/tmp", extract=True,
+                                              extra_cache_keys={"step": "source", "src_dir": src_dir})
+            else:
+                container.run_cached(
+                    command=[
+                        "sh", "-c",
+                        f"curl -L '{self.config.Valkey.SourceUrl}' -o {tar_path} && tar -xf {tar_path} -C /tmp"
+                    ],
+                    extra_cache_keys={"step": "source", "url": self.config.Valkey.SourceUrl, "src_dir": src_dir,
+                                      "tar_path": tar_path}
+                )
+
+            make_flags = " ".join(self.config.Valkey.Build.Flags)
+            compile_env = reproducible_env(self.config, march_env(self.march, compiler_cache.env()))
+            compile_cache_keys = {"step": "compile", "version": self.config.Valkey.Version,
+                                  "flags": sorted(self.config.Valkey.Build.Flags)}
+
+            if self.pgo:
+                current_step += 1
+                self.log(f"[bold blue]Step {current_step}/{total_no_of_steps}[/bold blue]: "
+                         f"Collecting PGO profiles with an instrumented build")
+                profile_layer = self._train(container, src_dir, make_flags, compile_env, compiler_cache)
+
+                compile_env = self._with_flags(compile_env,
+                                               f"-fprofile-use={PGO_PROFILE_DIR} -fprofile-partial-training "
+                                               f"-Wno-missing-profile")
+                compile_cache_keys["pgo_profile"] = profile_layer
 
             current_step += 1
             self.log(f"[bold blue]Step {current_step}/{total_no_of_steps}[/bold blue]: Compiling and installing")
-            make_flags = " ".join(self.config.Valkey.Build.Flags)
             container.run_cached(
                 command=[
                     "sh", "-c",
@@ -63,7 +110,9 @@ class CoreBuilder(BaseBuilder):
                     make -j$(nproc) {make_flags} &&
                     make install PREFIX={self.config.Valkey.Prefix}""",
                 ],
-                extra_cache_keys={"step": "compile", "version": self.config.Valkey.Version, "flags": sorted(self.config.Valkey.Build.Flags)}
+                env=compile_env,
+                extra_cache_keys=compile_cache_keys,
+                mounts=compiler_cache.mounts()
             )
 
             current_step += 1
@@ -78,20 +127,111 @@ class CoreBuilder(BaseBuilder):
                 self.log("[bold red]Verification Failed[/bold red]: Valkey binary missing or corrupt.")
                 raise
 
+            if self.debuginfo:
+                current_step += 1
+                self.log(f"[bold blue]Step {current_step}/{total_no_of_steps}[/bold blue]: "
+                         f"Splitting debug info into {self.config.DebugInfo.Directory}")
+                container.run(["sh", "-c", split_debuginfo_script([f"{self.config.Valkey.Prefix}/bin"],
+                                                                  self.config.DebugInfo.Directory)])
+
             current_step += 1
             self.log(
                 f"[bold blue]Step {current_step}/{total_no_of_steps}[/bold blue]: Tagging image and adding metadata.")
 
-            container.configure([
+            metadata = [
                 ("--env",
                  f"PATH={self.config.Valkey.Prefix}/bin:/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin"),
                 ("--label", f"org.valkey.version={self.config.Valkey.Version}"),
                 ("--label", f"org.valkey.prefix={self.config.Valkey.Prefix}"),
-            ])
+            ]
+            if self.march:
+                metadata.append(("--label", f"org.valkey.march={self.march}"))
+            if self.pgo:
+                metadata.append(("--label", "org.valkey.pgo=true"))
+            debuginfo_name_tag = self.image_name + ":" + debuginfo_tag(self.image_tag)
+            if self.debuginfo:
+                metadata.append(("--label", f"org.valkey.debuginfo={debuginfo_name_tag}"))
+            container.configure(metadata)
             image_name_tag = self.image_name + ":" + self.image_tag
             container.commit(image_name_tag)
 
             self.log(f"Image tagged as: [green]{image_name_tag}[/green]")
 
+        if self.debuginfo:
+            commit_debuginfo_image(self.config, self.cache_prefix, image_name_tag,
+                                   variant_tag(self.image_name, self.march), debuginfo_name_tag,
+                                   [("--label", f"org.valkey.version={self.config.Valkey.Version}")])
+            self.log(f"Debug info tagged as: [green]{debuginfo_name_tag}[/green]")
+
+    @staticmethod
+    def _with_flags(env: Optional[Dict[str, str]], flags: str) -> Dict[str, str]:
+        """
+        Append flags to CFLAGS and LDFLAGS of env.
+        :param env:
+        :param flags:
+        :return:
+        """
+        env = dict(env or {})
+        for name in ("CFLAGS", "LDFLAGS"):
+            env[name] = f"{env.get(name, '')} {flags}".strip()
+        return env
+
+    def _train(self, container: BuildahContainer, src_dir: str, make_flags: str, env: Optional[Dict[str, str]],
+               compiler_cache: CompilerCache) -> Optional[str]:
+        """
+        Build an instrumented valkey, run the training workload from Valkey.Build.Pgo against it and keep the
+        profiles in PGO_PROFILE_DIR. The source tree is cleaned afterwards for the optimized build.
+        The step is cached on the workload, so an unchanged training run is reused.
+        :param container:
+        :param src_dir:
+        :param make_flags:
+        :param env: compile environment without instrumentation.
+        :param compiler_cache:
+        :return: image ID of the layer holding the profiles. It changes whenever the training is re-run, so the
+            optimized build is keyed on the profile data.
+        """
+        pgo = self.config.Valkey.Build.Pgo
+        benchmark_args = ["-p", str(PGO_PORT), "-q", "-n", str(pgo.Requests), "-c", str(pgo.Clients),
+                          "-P", str(pgo.Pipeline), "-d", str(pgo.DataSize), "-t", ",".join(pgo.Tests)] + pgo.ExtraArgs
+
+        # The server writes its profiles on a clean exit, so it is stopped with SHUTDOWN rather than a signal
+        container.run_cached(
+            command=[
+                "sh", "-c",
+                f"""
+                set -e
+                cd {src_dir}
+                rm -rf {PGO_PROFILE_DIR}
+                make -j$(nproc) {make_flags}
+                ./src/valkey-server --port {PGO_PORT} --save '' --appendonly no --daemonize yes \
+                    --pidfile /tmp/valkey-pgo.pid --logfile /tmp/valkey-pgo.log
+                i=0
+                until ./src/valkey-cli -p {PGO_PORT} ping >/dev/null 2>&1; do
+                    i=$((i + 1)); [ $i -lt 100 ] || {{ cat /tmp/valkey-pgo.log; exit 1; }}; sleep 0.1
+                done
+                ./src/valkey-benchmark {shlex.join(benchmark_args)}
+                pid=$(cat /tmp/valkey-pgo.pid)
+                ./src/valkey-cli -p {PGO_PORT} shutdown nosave || true
+                while kill -0 $pid 2>/dev/null; do sleep 0.1; done
+                make distclean
+                find {PGO_PROFILE_DIR} -name '*.gcda' | grep -q .""",
+            ],
+            env=self._with_flags(env, f"-fprofile-generate={PGO_PROFILE_DIR} -fprofile-update=atomic"),
+            extra_cache_keys={"step": "pgo-train", "version": self.config.Valkey.Version,
+                              "flags": sorted(self.config.Valkey.Build.Flags), "workload": pgo.model_dump()},
+            mounts=compiler_cache.mounts()
+        )
+
+        return container.current_image_id()
+
+    def fetch_source(self) -> Path:
+        """
+        Download the source archive into the artifact store (if missing) and verify it.
+        :return: path of the archive on the host.
+        """
+        return self.artifact_store.fetch_archive(self.config.Valkey.SourceUrl, self.config.Valkey.Version,
+                                                 self.config.Valkey.Sha256,
+                                                 f"valkey-{self.config.Valkey.Version}.tar.gz")
+
     def prune_cache_images(self):
         prune_cache_images(self.config.Buildah.Path, self.cache_prefix)
@@ -14,19 +14,32 @@ def build(
         spec_file: Optional[Path] = typer.Option("configs/build.yaml", "--spec", "--s",
                                                  help="Path to build specification file."),
         cache_prefix: Optional[str] = typer.Option("", "--cache-prefix", "--c",
-                                                   help="Optional. Custom prefix for generated images acting as cache layers.")
+                                                   help="Optional. Custom prefix for generated images acting as cache layers."),
+        march: Optional[str] = typer.Option("", "--march",
+                                            help="Optional. x86-64 level to build for e.g, x86-64-v3. Appended to the image tag."),
+        pgo: Optional[bool] = typer.Option(False, "--pgo",
+                                           help="Optional. Profile-guided build: train an instrumented valkey-server with the workload in Valkey.Build.Pgo, then rebuild with the profiles."),
+        debuginfo: Optional[bool] = typer.Option(False, "--debuginfo",
+                                                 help="Optional. Strip the binaries and commit their debug info into a separate <tag>-debuginfo image."),
+        reproducible: Optional[bool] = typer.Option(False, "--reproducible",
+                                                    help="Optional. Reproducible build: SOURCE_DATE_EPOCH for compile steps and fixed image and file timestamps without history (see Reproducible in the spec).")
 ):
     """
     Build valkey binaries from source (core).
 
     :param spec_file: Path to build spec file.
     :param cache_prefix: Custom prefix for cache layers generated.
+    :param march: x86-64 level to build for.
+    :param pgo: Profile-guided build.
+    :param debuginfo: Split debug info into a separate image.
+    :param reproducible: Normalize timestamps.
 
     :return:
     """
     config = load_spec(spec_file, BuildSpec)
+    config.Reproducible.Enabled = config.Reproducible.Enabled or reproducible
 
-    builder = CoreBuilder(config, cache_prefix)
+    builder = CoreBuilder(config, cache_prefix, march, pgo, debuginfo)
     builder.build()
 
 
@@ -0,0 +1 @@
+from .image import app
@@ -0,0 +1,39 @@
+from pathlib import Path
+from typing import Optional
+
+import typer
+
+from valkey_setup.core import load_spec, BuildSpec, analyze_image, print_image_analysis, write_image_analysis
+
+app = typer.Typer(help="Inspect built images.")
+
+
+@app.command("analyze", help="Break an image down by layer, directory and file type.")
+def analyze(
+        image: str = typer.Option(..., "--image", "--i", help="Image to analyze e.g, valkey:9.0.1."),
+        spec_file: Optional[Path] = typer.Option("configs/build.yaml", "--spec", "--s",
+                                                 help="Path to build specification file."),
+        depth: Optional[int] = typer.Option(3, "--depth", "--d",
+                                            help="Optional. Directory depth of the directory breakdown."),
+        top: Optional[int] = typer.Option(15, "--top",
+                                          help="Optional. Number of directories and files listed."),
+        output: Optional[Path] = typer.Option(None, "--output", "--o",
+                                              help="Optional. Also write the full analysis to this JSON file.")
+):
+    """
+    Analyze the size of an image.
+
+    :param image: Image to analyze.
+    :param spec_file: Path to build spec file.
+    :param depth: Directory depth.
+    :param top: Rows of the directory and file tables.
+    :param output: JSON output file.
+    :return:
+    """
+    config = load_spec(spec_file, BuildSpec)
+
+    analysis = analyze_image(config.Buildah.Path, image, depth)
+    print_image_analysis(analysis, top)
+
+    if output:
+        write_image_analysis(analysis, output)
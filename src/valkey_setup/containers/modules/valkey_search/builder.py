@@ -1,13 +1,30 @@
-from valkey_setup.core import BaseBuilder, BuildSpec, BuildahContainer, prune_cache_images, init_base_distro
+from pathlib import Path
+from typing import List, Optional
+
+from valkey_setup.core import BaseBuilder, BuildSpec, BuildahContainer, prune_cache_images, init_base_distro, \
+    CompilerCache, Toolchain, ArtifactStore, check_march, variant_tag, with_march, bench_module, \
+    split_debuginfo_script, commit_debuginfo_image, debuginfo_tag, manifest_label, reproducible_env
 
 
 class ValkeySearchBuilder(BaseBuilder):
-    def __init__(self, config: BuildSpec, ext_version: str = "", cache_prefix: str = ""):
+    def __init__(self, config: BuildSpec, ext_version: str = "", cache_prefix: str = "", march: str = "",
+                 debuginfo: bool = False):
+        """
+        :param config:
+        :param ext_version:
+        :param cache_prefix:
+        :param march: x86-64 level to build for, e.g. x86-64-v3. Appended to the image tag.
+        :param debuginfo: strip the module and commit its debug info into a <tag>-debuginfo image; defaults to
+            DebugInfo.Enabled in the spec.
+        """
         self._init_ext_version(config, ext_version)
         super().__init__(config, cache_prefix)
+        self.march = check_march(march)
+        self.debuginfo = debuginfo or self.config.DebugInfo.Enabled
         self.base_image = self.config.BaseImage
         self.image_name = f"{self.config.ProjectName}-valkeysearch"
-        self.image_tag = self.config.Valkey.Version + "-" + self.ext_version
+        self.image_tag = variant_tag(self.config.Valkey.Version + "-" + self.ext_version, self.march)
+        self.artifact_store = ArtifactStore(self.config)
 
     def _init_ext_version(self, config: BuildSpec, ext_version: str):
         if not len(ext_version) > 0 or ext_version == "latest":
@@ -35,38 +52,46 @@ class ValkeySearchBuilder(BaseBuilder):
 
         with BuildahContainer(
                 base_image=self.base_image,
-                image_name=self.image_name,
+                image_name=variant_tag(self.image_name, self.march),
                 config=self.config,
                 cache_prefix=self.cache_prefix
         ) as container:
             base_distro = init_base_distro(self.config.Distro, container)
-            if self.version_config.Build.Dependencies:
+            compiler_cache = CompilerCache(self.config, Toolchain.CMAKE)
+            build_dependencies = self.version_config.Build.Dependencies + compiler_cache.packages()
+
+            if build_dependencies:
                 self.log(
                     f"[bold blue]Step {current_step}/{total_no_of_steps}[/bold blue]: Installing build dependencies")
 
                 base_distro.install_packages(
-                    packages=self.version_config.Build.Dependencies,
-                    extra_cache_keys={"step": "deps", "packages": sorted(self.version_config.Build.Dependencies)}
+                    packages=build_dependencies,
+                    extra_cache_keys={"step": "deps", "packages": sorted(build_dependencies)}
                 )
                 current_step += 1
 
             self.log(
                 f"[bold blue]Step {current_step}/{total_no_of_steps}[/bold blue]: Cloning {self.version_config.SourceUrl} tag {self.ext_version}")
             src_dir = f"/tmp/valkeysearch-{self.ext_version}"
-            container.run_cached(
-                command=[
-                    "git", "clone", "--depth", "1", "--branch", self.ext_version,
-                    self.version_config.SourceUrl, src_dir
-                ],
-                extra_cache_keys={"step": "source", "url": self.version_config.SourceUrl,
-                                  "version": self.ext_version, "src_dir": src_dir}
-            )
+            if self.artifact_store.enabled:
+                # Archive extracts into src_dir
+                container.copy_host_container(self.fetch_source(), "/tmp", extract=True,
+                                              extra_cache_keys={"step": "source", "src_dir": src_dir})
+            else:
+                container.run_cached(
+                    command=[
+                        "git", "clone", "--depth", "1", "--branch", self.ext_version,
+                        self.version_config.SourceUrl, src_dir
+                    ],
+                    extra_cache_keys={"step": "source", "url": self.version_config.SourceUrl,
+                                      "version": self.ext_version, "src_dir": src_dir}
+                )
 
             current_step += 1
             self.log(f"[bold blue]Step {current_step}/{total_no_of_steps}[/bold blue]: Compiling and installing")
 
             flags = " ".join(self.version_config.Build.Flags)
-            env = " ".join(self.version_config.Build.Env)
+            env = " ".join(with_march(self.version_config.Build.Env, self.march))
             container.run_cached(
                 command=[
                     "sh", "-c",
@@ -76,8 +101,10 @@ class ValkeySearchBuilder(BaseBuilder):
                     {env} cmake .. {flags} &&
                     make -j{self.version_config.Build.Cpu}""",
                 ],
+                env=reproducible_env(self.config, compiler_cache.env()),
                 extra_cache_keys={"step": "compile", "version": self.config.Valkey.Version, "flags": flags,
-                                  "env": env}
+                                  "env": env},
+                mounts=compiler_cache.mounts()
             )
 
             module_dir = f"{self.config.Valkey.Prefix}/modules"
@@ -101,8 +128,14 @@ class ValkeySearchBuilder(BaseBuilder):
                 self.log(f"[bold red]Error[/bold red]: {so_file_name} not found in {module_dir}")
                 raise
 
+            if self.debuginfo:
+                self.log(f"[bold blue]Splitting debug info[/bold blue] into {self.config.DebugInfo.Directory}")
+                container.run(["sh", "-c", split_debuginfo_script([f"{module_dir}/{so_file_name}"],
+                                                                  self.config.DebugInfo.Directory)])
+
             current_step += 1
             image_name_tag = self.image_name + ":" + self.image_tag
+            debuginfo_name_tag = self.image_name + ":" + debuginfo_tag(self.image_tag)
             self.log(
                 f"[bold blue]Step {current_step}/{total_no_of_steps}[/bold blue]: Tagging image and adding metadata.")
 
@@ -110,10 +143,37 @@ class ValkeySearchBuilder(BaseBuilder):
                 ("--label",
                  f'org.opencontainers.image.title="Valkey {self.config.Valkey.Version} with ValkeySearch {self.ext_version}"'),
                 ("--label", f'org.valkeysearch.version={self.ext_version}'),
-            ])
+                manifest_label([f"{module_dir}/{so_file_name}"]),
+            ] + ([("--label", f"org.valkey.march={self.march}")] if self.march else [])
+              + ([("--label", f"org.valkey.debuginfo={debuginfo_name_tag}")] if self.debuginfo else []))
             container.commit(image_name_tag)
 
             self.log(f"Image tagged as: [green]{image_name_tag}[/green]")
 
+        if self.debuginfo:
+            commit_debuginfo_image(self.config, self.cache_prefix, image_name_tag,
+                                   variant_tag(self.image_name, self.march), debuginfo_name_tag,
+                                   [("--label", f'org.valkeysearch.version={self.ext_version}')])
+            self.log(f"Debug info tagged as: [green]{debuginfo_name_tag}[/green]")
+
+    def fetch_source(self) -> Path:
+        """
+        Export the tagged source tree into the artifact store (if missing) and verify it.
+        :return: path of the archive on the host.
+        """
+        return self.artifact_store.fetch_git(self.version_config.SourceUrl, self.ext_version,
+                                             self.version_config.Sha256, f"valkeysearch-{self.ext_version}")
+
+    def bench(self, image: str = "", baseline: Optional[Path] = None) -> List[str]:
+        """
+        Load this version into a runtime image and run the valkey-search workloads, comparing against the Current version.
+        :param image: runtime image providing valkey-server. Defaults to valkey:<valkey version>.
+        :param baseline: results file to compare against instead of the Current version.
+        :return: regressions beyond the spec thresholds.
+        """
+        image = image or "valkey:" + variant_tag(self.config.Valkey.Version, self.march)
+        return bench_module(self.config, "valkey-search", self.ext_version, self.config.ValkeySearch.Current,
+                            self.image_name + ":" + self.image_tag, "valkeysearch.so", image, baseline, self.march)
+
     def prune_cache_images(self):
         prune_cache_images(self.config.Buildah.Path, self.cache_prefix)
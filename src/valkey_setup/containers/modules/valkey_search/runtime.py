@@ -1,4 +1,4 @@
-from valkey_setup.core import BaseRuntime, init_base_distro
+from valkey_setup.core import BaseRuntime, init_base_distro, variant_tag
 
 
 class ValkeySearchRuntime(BaseRuntime):
@@ -17,8 +17,10 @@ class ValkeySearchRuntime(BaseRuntime):
     def build(self):
         self.log(f"Adding ValkeySearch extension version {self.ext_version}", style="bold blue")
 
-        valkeysearch_source_image = f"{self.config.ProjectName}-valkeysearch" + ":" + self.config.Valkey.Version + "-" + self.ext_version
+        self.install_dependencies()
+        self.install_files()
 
+    def install_dependencies(self):
         base_distro = init_base_distro(self.config.Distro, self.src_container)
         if self.version_config.Runtime and self.version_config.Runtime.Dependencies:
             deps = self.version_config.Runtime.Dependencies
@@ -29,25 +31,8 @@ class ValkeySearchRuntime(BaseRuntime):
                 extra_cache_keys={"step": "deps", "packages": sorted(deps)}
             )
 
-        staging_dir = f"/tmp/stage_valkeysearch-{self.ext_version}"
-        self.log(f"[bold blue]Copying valkeysearch source into staging directory[/bold blue]: {staging_dir}")
-
-        self.src_container.copy_container_current(
-            valkeysearch_source_image,
-            self.config.Valkey.Prefix,
-            staging_dir
-        )
-
-        self.log(f"Syncing {staging_dir} to {self.config.Valkey.Prefix}/modules", style="bold blue")
-        self.src_container.run(
-            command=[
-                "rsync", "-av", "--ignore-existing",
-                f"{staging_dir}/",
-                f"{self.config.Valkey.Prefix}/"
-            ]
-        )
-
-        self.log(f"[bold blue]Removing staging directory[/bold blue]: {staging_dir}")
-        self.src_container.run(
-            command=["rm", "-rf", staging_dir]
-        )
+    def install_files(self):
+        valkeysearch_source_image = f"{self.config.ProjectName}-valkeysearch" + ":" + variant_tag(
+            self.config.Valkey.Version + "-" + self.ext_version, self.march)
+
+        self.install_module(valkeysearch_source_image, [f"{self.config.Valkey.Prefix}/modules/valkeysearch.so"])
@@ -15,7 +15,13 @@ def build(
         spec_file: Optional[Path] = typer.Option("configs/build.yaml", "--spec", "--s",
                                                  help="Path to build specification file."),
         cache_prefix: Optional[str] = typer.Option("", "--cache-prefix", "--c",
-                                                   help="Optional. Custom prefix for generated images acting as cache layers.")
+                                                   help="Optional. Custom prefix for generated images acting as cache layers."),
+        march: Optional[str] = typer.Option("", "--march",
+                                            help="Optional. x86-64 level to build for e.g, x86-64-v3. Appended to the image tag."),
+        debuginfo: Optional[bool] = typer.Option(False, "--debuginfo",
+                                                 help="Optional. Strip the binaries and commit their debug info into a separate <tag>-debuginfo image."),
+        reproducible: Optional[bool] = typer.Option(False, "--reproducible",
+                                                    help="Optional. Reproducible build: SOURCE_DATE_EPOCH for compile steps and fixed image and file timestamps without history (see Reproducible in the spec).")
 ):
     """
     Build valkey search binaries from source (valkey search).
@@ -23,15 +29,52 @@ def build(
     :param version: Version of valkey search to build.
     :param spec_file: Path to build spec file.
     :param cache_prefix: Custom prefix for cache layers generated.
+    :param march: x86-64 level to build for.
+    :param debuginfo: Split debug info into a separate image.
+    :param reproducible: Normalize timestamps.
 
     :return:
     """
     config = load_spec(spec_file, BuildSpec)
+    config.Reproducible.Enabled = config.Reproducible.Enabled or reproducible
 
-    builder = ValkeySearchBuilder(config, version, cache_prefix)
+    builder = ValkeySearchBuilder(config, version, cache_prefix, march, debuginfo)
     builder.build()
 
 
+@app.command("bench", help="Benchmark a valkey search version loaded into a runtime image and compare it with the current version.")
+def bench(
+        version: str = typer.Option("latest", "--version", "--v", help="Version to benchmark."),
+        spec_file: Optional[Path] = typer.Option("configs/build.yaml", "--spec", "--s",
+                                                 help="Path to build specification file."),
+        image: Optional[str] = typer.Option("", "--image", "--i",
+                                            help="Optional. Runtime image providing valkey-server and the module's runtime libraries. Defaults to valkey:<valkey version>."),
+        march: Optional[str] = typer.Option("", "--march",
+                                            help="Optional. x86-64 level of the images e.g, x86-64-v3."),
+        baseline: Optional[Path] = typer.Option(None, "--baseline",
+                                                help="Optional. Results file to compare against. Defaults to the results of the current version.")
+):
+    """
+    Benchmark valkey search (valkey-search). Exits with 1 if a workload regressed beyond the spec thresholds.
+
+    :param version: Version of valkey search to benchmark. Its module image must be built.
+    :param spec_file: Path to build spec file.
+    :param image: Runtime image to load the module into.
+    :param march: x86-64 level of the images.
+    :param baseline: Results file to compare against.
+
+    :return:
+    """
+    config = load_spec(spec_file, BuildSpec)
+
+    builder = ValkeySearchBuilder(config, version, march=march)
+    regressions = builder.bench(image, baseline)
+    if regressions:
+        for regression in regressions:
+            builder.log(f"[bold red]Regression:[/bold red] {regression}")
+        raise typer.Exit(code=1)
+
+
 @app.command("delete-cache", help="Delete cache images used to build valkey search binaries from source (valkey search).")
 def delete_cache(
         spec_file: Optional[Path] = typer.Option("configs/build.yaml", "--spec", "--s",
@@ -0,0 +1 @@
+from .builder import PipelineBuilder
@@ -0,0 +1,173 @@
+from pathlib import Path
+from typing import List, Tuple, Optional
+
+from valkey_setup.containers.core.builder import CoreBuilder
+from valkey_setup.containers.modules.valkey_bloom.builder import ValkeyBloomBuilder
+from valkey_setup.containers.modules.valkey_json.builder import ValkeyJsonBuilder
+from valkey_setup.containers.modules.valkey_search.builder import ValkeySearchBuilder
+from valkey_setup.containers.runtime.builder import RuntimeBuilder, MODULES
+from valkey_setup.core import BaseBuilder, BuildSpec, BuildGraph, prune_cache_images, CacheUsage, gc_cache_images, \
+    export_cache_images, import_cache_images, check_march, pin_sha256, sha256_file
+
+MODULE_BUILDERS = {
+    "valkey-json": ValkeyJsonBuilder,
+    "valkey-search": ValkeySearchBuilder,
+    "valkey-bloom": ValkeyBloomBuilder,
+}
+
+# Spec section holding the versions of each module
+MODULE_SPEC_SECTIONS = {
+    "valkey-json": "ValkeyJson",
+    "valkey-search": "ValkeySearch",
+    "valkey-bloom": "ValkeyBloom",
+}
+
+
+class PipelineBuilder(BaseBuilder):
+    def __init__(self, config: BuildSpec, cache_prefix: str = "", image_name: str = "", image_tag: str = "",
+                 modules: Optional[List[Tuple[str, str]]] = None, remove_package_manager: bool = True,
+                 squash: bool = True, jobs: int = 4, variants: Optional[List[str]] = None, pgo: bool = False,
+                 debuginfo: bool = False, minimal: bool = False, layered: bool = False):
+        """
+        :param config:
+        :param cache_prefix: parent of the component cache prefixes, <ProjectName>/cache if empty.
+        :param image_name:
+        :param image_tag:
+        :param modules:
+        :param remove_package_manager:
+        :param squash:
+        :param jobs: maximum number of builds running at the same time.
+        :param variants: x86-64 levels to build core, modules and runtime for. Defaults to Variants.Levels in
+            the spec; empty builds a single variant with the flags in the spec.
+        :param pgo: profile-guided core build.
+        :param debuginfo: split debug info of core and modules into <tag>-debuginfo images.
+        :param minimal: build the runtime from scratch, see RuntimeBuilder.
+        :param layered: build the runtime as stable per-component layers, see RuntimeBuilder.
+        """
+        super().__init__(config, cache_prefix)
+
+        if modules:
+            for module in modules:
+                if not module[0] in MODULES:
+                    raise RuntimeError(f"Module '{module[0]}' not found.")
+
+        self.image_name = image_name
+        self.image_tag = image_tag
+        self.modules = modules
+        self.remove_package_manager = remove_package_manager
+        self.squash = squash
+        self.jobs = jobs
+        self.pgo = pgo
+        self.debuginfo = debuginfo
+        self.minimal = minimal
+        self.layered = layered
+        self.variants = [check_march(march) for march in (variants or self.config.Variants.Levels)]
+
+    def _init_cache_prefix(self, cache_prefix: str):
+        # Parent namespace of every component cache prefix.
+        if len(cache_prefix) > 0:
+            self.cache_prefix = cache_prefix
+        else:
+            self.cache_prefix = f"{self.config.ProjectName}/cache"
+
+    def _scoped(self, builder: BaseBuilder) -> BaseBuilder:
+        """
+        Move the cache prefix of a component builder under the pipeline cache prefix, keeping its component and
+        version suffix, e.g. <cache_prefix>/core/9.0.1.
+        :param builder: builder created with its default cache prefix.
+        :return:
+        """
+        default_parent = f"{self.config.ProjectName}/cache"
+        if self.cache_prefix != default_parent and builder.cache_prefix.startswith(f"{default_parent}/"):
+            builder.cache_prefix = self.cache_prefix + builder.cache_prefix[len(default_parent):]
+        return builder
+
+    def _init_graph(self) -> BuildGraph:
+        """
+        Core and module builders all start from BaseImage and are independent of each other.
+        The runtime copies from the core image and every selected module image, so it waits for all of them.
+        Each variant gets its own chain of nodes, e.g. core@x86-64-v3 -> runtime@x86-64-v3.
+        :return:
+        """
+        graph = BuildGraph(max_workers=self.jobs)
+
+        for march in self.variants or [""]:
+            def node(name: str) -> str:
+                return f"{name}@{march}" if march else name
+
+            core_builder = self._scoped(CoreBuilder(self.config, march=march, pgo=self.pgo, debuginfo=self.debuginfo))
+            graph.add(node("core"), core_builder.build)
+
+            runtime_dependencies = [node("core")]
+            for module in self.modules or []:
+                module_builder = self._scoped(MODULE_BUILDERS[module[0]](self.config, module[1], march=march,
+                                                                         debuginfo=self.debuginfo))
+                graph.add(node(module[0]), module_builder.build)
+                runtime_dependencies.append(node(module[0]))
+
+            runtime_builder = self._scoped(RuntimeBuilder(self.config, image_name=self.image_name,
+                                                          image_tag=self.image_tag, modules=self.modules,
+                                                          remove_package_manager=self.remove_package_manager,
+                                                          squash=self.squash, march=march, minimal=self.minimal,
+                                                          layered=self.layered))
+            graph.add(node("runtime"), runtime_builder.build, depends_on=runtime_dependencies)
+
+        return graph
+
+    def build(self):
+        graph = self._init_graph()
+
+        stages = graph.order()
+        self.log(f"Starting pipeline build for Valkey {self.config.Valkey.Version} with {self.jobs} parallel jobs",
+                 style="bold blue")
+        if self.variants:
+            self.log(f"Variants: {', '.join(self.variants)}")
+        for index, stage in enumerate(stages, start=1):
+            self.log(f"[bold blue]Stage {index}/{len(stages)}[/bold blue]: {', '.join(stage)}")
+
+        graph.run()
+
+        self.log("Pipeline build complete.", style="bold green")
+
+    def fetch(self, record: Optional[Path] = None):
+        """
+        Fill the artifact store with the sources of core and every requested module (all modules if none requested).
+        :param record: spec file to write the digests of unpinned sources into. Unpinned sources are accepted only
+            in this mode (or with ArtifactStore.AllowUnpinned); pinned ones are still verified.
+        :return:
+        """
+        modules = self.modules or [(module, "latest") for module in MODULES]
+        if record:
+            self.config.ArtifactStore.AllowUnpinned = True
+
+        core_builder = CoreBuilder(self.config)
+        sources = [("core", ("Valkey",), self.config.Valkey.Sha256, core_builder)]
+        for module in modules:
+            module_builder = MODULE_BUILDERS[module[0]](self.config, module[1])
+            sources.append((f"{module[0]} {module_builder.ext_version}",
+                            (MODULE_SPEC_SECTIONS[module[0]], "Versions", module_builder.ext_version),
+                            module_builder.version_config.Sha256, module_builder))
+
+        for name, section, pinned, builder in sources:
+            self.log(f"Fetching {name} source", style="bold blue")
+            path = builder.fetch_source()
+            if record and not pinned:
+                digest = sha256_file(path)
+                pin_sha256(record, section, digest)
+                self.log(f"Pinned {'.'.join(section)}.Sha256 = {digest} in {record}")
+
+        self.log(f"Artifact store {self.config.ArtifactStore.Directory} is up to date.", style="bold green")
+
+    def prune_cache_images(self):
+        prune_cache_images(self.config.Buildah.Path, self.cache_prefix)
+
+    def gc_cache_images(self, max_size: Optional[int] = None, max_age: Optional[float] = None, dry_run: bool = False):
+        gc_cache_images(self.config.Buildah.Path, self.cache_prefix, CacheUsage(Path(self.config.Cache.UsageFile)),
+                        max_size=max_size, max_age=max_age, dry_run=dry_run)
+
+    def export_cache_images(self, destination: Path):
+        export_cache_images(self.config.Buildah.Path, self.cache_prefix, destination,
+                            CacheUsage(Path(self.config.Cache.UsageFile)))
+
+    def import_cache_images(self, source: Path):
+        import_cache_images(self.config.Buildah.Path, source, CacheUsage(Path(self.config.Cache.UsageFile)))
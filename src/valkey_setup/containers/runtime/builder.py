@@ -1,19 +1,45 @@
+import json
 from pathlib import Path
 from typing import Tuple, List, Optional
 
 from valkey_setup.containers.modules.valkey_bloom import ValkeyBloomRuntime
 from valkey_setup.containers.modules.valkey_json import ValkeyJsonRuntime
 from valkey_setup.containers.modules.valkey_search import ValkeySearchRuntime
-from valkey_setup.core import BaseBuilder, BuildSpec, prune_cache_images, BuildahContainer, init_base_distro
+from valkey_setup.core import BaseBuilder, BuildSpec, prune_cache_images, BuildahContainer, init_base_distro, \
+    check_march, variant_tag, debloat_script, run_benchmark, write_results, compare_results, results_path, baseline_path, \
+    bench_dataset, BaseDistro, BaseRuntime, minimal_root_script, MINIMAL_ROOT, CompressionConfig, push_image, bench_pull
 
 MODULES = ["valkey-json", "valkey-search", "valkey-bloom"]
 
+BASE_VALKEY_DIR = "/var/lib/valkey"
+DATA_DIR = f"{BASE_VALKEY_DIR}/data"
+CONFIG_DIR = "/usr/share/valkey/config"
+
 
 class RuntimeBuilder(BaseBuilder):
     def __init__(self, config: BuildSpec, cache_prefix: str = "", image_name: str = "", image_tag: str = "",
                  modules: Optional[List[Tuple[str, str]]] = None, remove_package_manager: bool = True,
-                 squash: bool = True):
+                 squash: bool = True, batch: bool = True, march: str = "", debloat: bool = False,
+                 minimal: bool = False, layered: bool = False):
+        """
+        :param config:
+        :param cache_prefix:
+        :param image_name:
+        :param image_tag:
+        :param modules:
+        :param remove_package_manager:
+        :param squash:
+        :param batch:
+        :param march: x86-64 level of the core and module images to use, e.g. x86-64-v3. Appended to the image tag.
+        :param debloat: strip binaries and modules and remove headers, static libraries, docs and locales.
+            Also enabled by Valkey.Runtime.Debloat.Enabled.
+        :param minimal: build the image from scratch with only the prefix, the shared libraries it loads and the
+            Valkey.Runtime.Minimal files. Also enabled by Valkey.Runtime.Minimal.Enabled.
+        :param layered: commit stable per-component layers instead of squashing, so updates ship as small deltas.
+            Also enabled by Valkey.Runtime.Layered. Overrides squash.
+        """
         super().__init__(config, cache_prefix)
+        self.march = check_march(march)
 
         if len(image_name) > 0:
             self.image_name = image_name
@@ -21,9 +47,9 @@ class RuntimeBuilder(BaseBuilder):
             self.image_name = f"{self.config.ProjectName}-runtime"
 
         if len(image_tag) > 0:
-            self.image_tag = image_tag
+            self.image_tag = variant_tag(image_tag, self.march)
         else:
-            self.image_tag = self.config.Valkey.Version
+            self.image_tag = variant_tag(self.config.Valkey.Version, self.march)
 
         if modules:
             for module in modules:
@@ -33,6 +59,10 @@ class RuntimeBuilder(BaseBuilder):
         self.modules = modules
         self.remove_package_manager = remove_package_manager
         self.squash = squash
+        self.batch = batch
+        self.debloat = debloat or self.config.Valkey.Runtime.Debloat.Enabled
+        self.minimal = minimal or self.config.Valkey.Runtime.Minimal.Enabled
+        self.layered = layered or self.config.Valkey.Runtime.Layered
 
     def _init_cache_prefix(self, cache_prefix: str):
         if len(cache_prefix) > 0:
@@ -40,54 +70,154 @@ class RuntimeBuilder(BaseBuilder):
         else:
             self.cache_prefix = f"{self.config.ProjectName}/cache/runtime/{self.config.Valkey.Version}"
 
+    def _module_runtimes(self, container: BuildahContainer) -> List[BaseRuntime]:
+        """
+        Installers of the selected modules into container.
+        :param container:
+        :return:
+        """
+        runtimes: List[BaseRuntime] = []
+        for module in self.modules or []:
+            match (module[0]):
+                case 'valkey-json':
+                    runtimes.append(ValkeyJsonRuntime(self.config, container, module[1], self.march))
+                case 'valkey-search':
+                    runtimes.append(ValkeySearchRuntime(self.config, container, module[1], self.march))
+                case 'valkey-bloom':
+                    runtimes.append(ValkeyBloomRuntime(self.config, container, module[1], self.march))
+                case _:
+                    self.log(f'[bold red]Error[/bold red]: ')
+                    raise RuntimeError(f"Module {module[0]} not found.")
+        return runtimes
+
+    def _install_components(self, container: BuildahContainer, base_distro: BaseDistro, current_step: int) -> int:
+        """
+        Install runtime dependencies, the core binaries and the selected modules, and debloat if enabled.
+        :param container:
+        :param base_distro:
+        :param current_step: number of the first step logged.
+        :return: number of the last step logged.
+        """
+        # Dependencies first: they do not change with the core image, so their layer survives core rebuilds
+        self.log(
+            f"[bold blue]Step {current_step}[/bold blue]: Installing valkey runtime dependencies")
+
+        base_distro.refresh_package_repository()
+
+        base_distro.install_packages(
+            packages=self.config.Valkey.Runtime.Dependencies,
+            extra_cache_keys={"step": "deps", "packages": sorted(self.config.Valkey.Runtime.Dependencies)}
+        )
+
+        current_step += 1
+        self.log(f"[bold blue]Step {current_step}[/bold blue]: Retrieving valkey binaries")
+
+        container.copy_container_current(f"{self.config.ProjectName}-core:"
+                                         f"{variant_tag(self.config.Valkey.Version, self.march)}",
+                                         self.config.Valkey.Prefix, self.config.Valkey.Prefix)
+
+        if self.modules:
+            self.log(
+                f"[bold blue]Step {current_step}[/bold blue]: Installing modules {self.modules}")
+
+            for module_runtime in self._module_runtimes(container):
+                module_runtime.build()
+
+        if self.debloat:
+            current_step += 1
+            self.log(f"[bold blue]Step {current_step}[/bold blue]: Debloating")
+            if not self.squash and not self.minimal:
+                self.log("[bold yellow]Warning[/bold yellow]: Removed files still ship in lower layers unless "
+                         "squashing is enabled.")
+
+            debloat = self.config.Valkey.Runtime.Debloat
+            if debloat.Strip and debloat.StripPackages:
+                base_distro.install_packages(
+                    packages=debloat.StripPackages,
+                    extra_cache_keys={"step": "debloat-deps", "packages": sorted(debloat.StripPackages)}
+                )
+
+            container.run(["sh", "-c", debloat_script(self.config.Valkey.Prefix, debloat)])
+
+            if debloat.Strip and debloat.StripPackages:
+                base_distro.remove_packages(packages=debloat.StripPackages)
+
+        return current_step
+
+    def _setup_user(self, container: BuildahContainer, current_step: int) -> int:
+        """
+        Create the valkey system user, its data directory and the runtime environment.
+        :param container:
+        :param current_step: number of the last step logged.
+        :return: number of the last step logged.
+        """
+        current_step += 1
+        self.log(
+            f"[bold blue]Step {current_step}[/bold blue]: Setting up system user")
+
+        container.run(
+            command=["groupadd", "-r", "-g", str(self.config.Valkey.Runtime.Gid), "valkey"]
+        )
+
+        container.run(
+            command=["useradd", "-r", "-u", str(self.config.Valkey.Runtime.Uid), "-g",
+                     str(self.config.Valkey.Runtime.Gid), "-d", BASE_VALKEY_DIR, "-s", "/sbin/nologin", "-c",
+                     '"Valkey Server"', "valkey"]
+        )
+
+        container.configure(
+            [
+                ("--label", f"io.valkey.user.uid={self.config.Valkey.Runtime.Uid}"),
+                ("--label", f"io.valkey.user.gid={self.config.Valkey.Runtime.Gid}"),
+                ("--label", f"io.valkey.user.name=valkey"),
+            ]
+        )
+
+        current_step += 1
+        self.log(
+            f"[bold blue]Step {current_step}[/bold blue]: Setting up directories & permissions")
+
+        container.run(["mkdir", "-p", DATA_DIR])
+        container.run(
+            ["chown", "-R", f"{self.config.Valkey.Runtime.Uid}:{self.config.Valkey.Runtime.Gid}", BASE_VALKEY_DIR])
+
+        env_configuration: List[Tuple[str, str]] = []
+        if self.config.Valkey.Runtime.Environment:
+            for env in self.config.Valkey.Runtime.Environment:
+                env_configuration.append(("--env", env))
+
+        container.configure([
+            ("--env", f"VALKEY_DATA={DATA_DIR}"),
+            ("--volume", DATA_DIR),
+            ("--env",
+             f"PATH={self.config.Valkey.Prefix}/bin:/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin")
+        ] + env_configuration)
+        return current_step
+
     def build(self):
+        if self.minimal:
+            if self.layered:
+                self.log("[bold yellow]Warning[/bold yellow]: Minimal images are not layered.")
+            self._build_minimal()
+            return
+        if self.layered:
+            self._build_layered()
+            return
+
         self.log(f"Starting build for Valkey {self.config.Valkey.Version} runtime", style="bold blue")
 
         current_step = 1
 
         with BuildahContainer(
                 base_image=self.config.BaseImage,
-                image_name=self.image_name,
+                image_name=variant_tag(self.image_name, self.march),
                 config=self.config,
-                cache_prefix=self.cache_prefix
+                cache_prefix=self.cache_prefix,
+                batch=self.batch
         ) as container:
             base_distro = init_base_distro(self.config.Distro, container)
 
-            self.log(f"[bold blue]Step {current_step}[/bold blue]: Retrieving valkey binaries")
-
-            self.image_tag = self.config.Valkey.Version
-            container.copy_container_current(f"{self.config.ProjectName}-core:{self.config.Valkey.Version}",
-                                             self.config.Valkey.Prefix, self.config.Valkey.Prefix)
-
-            current_step += 1
-            self.log(
-                f"[bold blue]Step {current_step}[/bold blue]: Installing valkey runtime dependencies")
-
-            base_distro.refresh_package_repository()
-
-            base_distro.install_packages(
-                packages=self.config.Valkey.Runtime.Dependencies,
-                extra_cache_keys={"step": "deps", "packages": sorted(self.config.Valkey.Runtime.Dependencies)}
-            )
-
-            if self.modules:
-                self.log(
-                    f"[bold blue]Step {current_step}[/bold blue]: Installing modules {self.modules}")
-
-                for module in self.modules:
-                    match (module[0]):
-                        case 'valkey-json':
-                            valkeyjson_build = ValkeyJsonRuntime(self.config, container, module[1])
-                            valkeyjson_build.build()
-                        case 'valkey-search':
-                            valkeybloom_build = ValkeySearchRuntime(self.config, container, module[1])
-                            valkeybloom_build.build()
-                        case 'valkey-bloom':
-                            valkeybloom_build = ValkeyBloomRuntime(self.config, container, module[1])
-                            valkeybloom_build.build()
-                        case _:
-                            self.log(f'[bold red]Error[/bold red]: ')
-                            raise RuntimeError(f"Module {module[0]} not found.")
+            current_step = self._install_components(container, base_distro, current_step)
 
             base_distro.clean_package_repository_cache()
 
@@ -100,50 +230,7 @@ class RuntimeBuilder(BaseBuilder):
                 command=["update-ca-certificates"]
             )
 
-            current_step += 1
-            self.log(
-                f"[bold blue]Step {current_step}[/bold blue]: Setting up system user")
-
-            base_valkey_dir = "/var/lib/valkey"
-
-            container.run(
-                command=["groupadd", "-r", "-g", str(self.config.Valkey.Runtime.Gid), "valkey"]
-            )
-
-            container.run(
-                command=["useradd", "-r", "-u", str(self.config.Valkey.Runtime.Uid), "-g",
-                         str(self.config.Valkey.Runtime.Gid), "-d", base_valkey_dir, "-s", "/sbin/nologin", "-c",
-                         '"Valkey Server"', "valkey"]
-            )
-
-            container.configure(
-                [
-                    ("--label", f"io.valkey.user.uid={self.config.Valkey.Runtime.Uid}"),
-                    ("--label", f"io.valkey.user.gid={self.config.Valkey.Runtime.Gid}"),
-                    ("--label", f"io.valkey.user.name=valkey"),
-                ]
-            )
-
-            current_step += 1
-            self.log(
-                f"[bold blue]Step {current_step}[/bold blue]: Setting up directories & permissions")
-
-            data_dir = f"{base_valkey_dir}/data"
-            container.run(["mkdir", "-p", data_dir])
-            container.run(
-                ["chown", "-R", f"{self.config.Valkey.Runtime.Uid}:{self.config.Valkey.Runtime.Gid}", base_valkey_dir])
-
-            env_configuration: List[Tuple[str, str]] = []
-            if self.config.Valkey.Runtime.Environment:
-                for env in self.config.Valkey.Runtime.Environment:
-                    env_configuration.append(("--env", env))
-
-            container.configure([
-                ("--env", f"VALKEY_DATA={data_dir}"),
-                ("--volume", data_dir),
-                ("--env",
-                 f"PATH={self.config.Valkey.Prefix}/bin:/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin")
-            ] + env_configuration)
+            current_step = self._setup_user(container, current_step)
 
             # Config storage folder
             container.run(
@@ -160,6 +247,16 @@ class RuntimeBuilder(BaseBuilder):
             container.copy_host_container(Path(f"{self.config.Valkey.Runtime.Resources}/entrypoint.sh"),
                                           "/usr/local/bin/entrypoint.sh")
 
+            if self.march:
+                # Lets the entrypoint refuse to start on a CPU below the level the binaries were built for
+                container.copy_host_container(Path(f"{self.config.Valkey.Runtime.Resources}/x86-64-level.sh"),
+                                              "/usr/local/bin/x86-64-level")
+                container.run(["chmod", "+x", "/usr/local/bin/x86-64-level"])
+                container.configure([
+                    ("--env", f"VALKEY_MARCH={self.march}"),
+                    ("--label", f"org.valkey.march={self.march}"),
+                ])
+
             # Setup permissions
             container.run(
                 command=[
@@ -186,6 +283,224 @@ class RuntimeBuilder(BaseBuilder):
                 ("--user", str(self.config.Valkey.Runtime.Uid))
             ])
 
+            self._commit(container, current_step, squash=self.squash)
+
+    def _commit(self, container: BuildahContainer, current_step: int, squash: bool):
+        """
+        Add version labels and ports and commit the runtime image.
+        :param container:
+        :param current_step: number of the last step logged.
+        :param squash:
+        :return:
+        """
+        current_step += 1
+        self.log(
+            f"[bold blue]Step {current_step}[/bold blue]: Tagging image and adding metadata.")
+
+        container.configure([
+            ("--label", f"org.valkey.version={self.config.Valkey.Version}"),
+            ("--label", f"org.valkey.prefix={self.config.Valkey.Prefix}"),
+        ])
+        if self.config.Valkey.Runtime.Ports:
+            for port in self.config.Valkey.Runtime.Ports:
+                container.configure([
+                    ("--port", f"{port}")
+                ])
+        image_name_tag = self.image_name + ":" + self.image_tag
+        container.commit(image_name_tag, squash=squash)
+
+        self.log(f"Image tagged as: [green]{image_name_tag}[/green]")
+
+    def _build_layered(self):
+        """
+        Build the runtime as cache layers ordered from least to most volatile: a base layer with the runtime and
+        module dependencies, user and directories, the core binaries, one layer per module, then config and
+        entrypoint. The base is squashed after the package manager is removed, so removed files cost nothing.
+        A config or single module change replaces only the layers from that component up, and nodes pull only those.
+        :return:
+        """
+        self.log(f"Starting layered build for Valkey {self.config.Valkey.Version} runtime", style="bold blue")
+
+        runtime = self.config.Valkey.Runtime
+        owner = f"{runtime.Uid}:{runtime.Gid}"
+        current_step = 1
+
+        with BuildahContainer(
+                base_image=self.config.BaseImage,
+                image_name=variant_tag(self.image_name, self.march),
+                config=self.config,
+                cache_prefix=self.cache_prefix,
+                batch=self.batch
+        ) as container:
+            base_distro = init_base_distro(self.config.Distro, container)
+            module_runtimes = self._module_runtimes(container)
+
+            self.log(f"[bold blue]Step {current_step}[/bold blue]: Installing valkey runtime dependencies")
+
+            base_distro.refresh_package_repository()
+
+            base_distro.install_packages(
+                packages=runtime.Dependencies,
+                extra_cache_keys={"step": "deps", "packages": sorted(runtime.Dependencies)}
+            )
+            for module_runtime in module_runtimes:
+                module_runtime.install_dependencies()
+
+            if self.debloat:
+                # The prefix is not installed yet; strip core and modules at build time with --debuginfo instead
+                self.log("[blue dim]Debloating base layer[/blue dim]")
+                base_debloat = runtime.Debloat.model_copy(update={"Strip": False, "RemovePatterns": []})
+                container.run(["sh", "-c", debloat_script(self.config.Valkey.Prefix, base_debloat)])
+
+            base_distro.clean_package_repository_cache()
+
+            if runtime.RemoveDependencies:
+                base_distro.remove_packages(
+                    packages=runtime.RemoveDependencies
+                )
+
+            container.run(
+                command=["update-ca-certificates"]
+            )
+
+            current_step = self._setup_user(container, current_step)
+
+            if self.remove_package_manager:
+                self.log("[blue dim]Removing package manager[/blue dim]")
+                base_distro.remove_package_manager()
+
+            current_step += 1
+            self.log(f"[bold blue]Step {current_step}[/bold blue]: Squashing base layer")
+            container.squash_layers(extra_cache_keys={"step": "base"})
+
+            current_step += 1
+            self.log(f"[bold blue]Step {current_step}[/bold blue]: Retrieving valkey binaries")
+
+            container.copy_container_current(f"{self.config.ProjectName}-core:"
+                                             f"{variant_tag(self.config.Valkey.Version, self.march)}",
+                                             self.config.Valkey.Prefix, self.config.Valkey.Prefix)
+
+            if module_runtimes:
+                current_step += 1
+                self.log(f"[bold blue]Step {current_step}[/bold blue]: Installing modules {self.modules}")
+                for module_runtime in module_runtimes:
+                    module_runtime.install_files()
+
+            current_step += 1
+            self.log(f"[bold blue]Step {current_step}[/bold blue]: Adding config and entrypoint")
+
+            # Ownership and modes are set by the copies, a later chown or chmod would duplicate the files in a layer
+            container.copy_host_container(Path(f"{runtime.Resources}/valkey.conf"), f"{CONFIG_DIR}/valkey.conf",
+                                          chown=owner)
+            container.copy_host_container(Path(f"{runtime.Resources}/entrypoint.sh"), "/usr/local/bin/entrypoint.sh",
+                                          chown=owner, chmod="755")
+
+            if self.march:
+                # Lets the entrypoint refuse to start on a CPU below the level the binaries were built for
+                container.copy_host_container(Path(f"{runtime.Resources}/x86-64-level.sh"),
+                                              "/usr/local/bin/x86-64-level", chmod="755")
+                container.configure([
+                    ("--env", f"VALKEY_MARCH={self.march}"),
+                    ("--label", f"org.valkey.march={self.march}"),
+                ])
+
+            container.configure([
+                ("--entrypoint", '["/usr/local/bin/entrypoint.sh"]'),
+                ("--cmd", f'["valkey-server", "{CONFIG_DIR}/valkey.conf"]'),
+                ("--user", str(runtime.Uid)),
+                ("--label", "org.valkey.runtime=layered"),
+            ])
+
+            self._commit(container, current_step, squash=False)
+
+    def _build_minimal(self):
+        """
+        Build the runtime from scratch. Components are installed into a staging container from BaseImage as for the
+        regular runtime, then only the prefix, the shared libraries its executables and modules load, the dynamic
+        loader and the Valkey.Runtime.Minimal files are copied into an empty image. There is no shell, so valkey-server
+        is the entrypoint.
+        :return:
+        """
+        self.log(f"Starting minimal build for Valkey {self.config.Valkey.Version} runtime", style="bold blue")
+
+        runtime = self.config.Valkey.Runtime
+        files = list(runtime.Minimal.Files)
+        for env in runtime.Environment or []:
+            if env.startswith("TZ="):
+                files.append(f"/usr/share/zoneinfo/{env[len('TZ='):]}")
+
+        current_step = 1
+
+        with BuildahContainer(
+                base_image=self.config.BaseImage,
+                image_name=variant_tag(f"{self.image_name}-minimal-staging", self.march),
+                config=self.config,
+                cache_prefix=self.cache_prefix,
+                batch=self.batch
+        ) as staging:
+            base_distro = init_base_distro(self.config.Distro, staging)
+
+            current_step = self._install_components(staging, base_distro, current_step)
+
+            staging.run(
+                command=["update-ca-certificates"]
+            )
+
+            current_step += 1
+            self.log(f"[bold blue]Step {current_step}[/bold blue]: Collecting shared library closure")
+
+            staging.run_cached(
+                ["sh", "-c", minimal_root_script(self.config.Valkey.Prefix, files, runtime.Uid, runtime.Gid,
+                                                 BASE_VALKEY_DIR, DATA_DIR)],
+                extra_cache_keys={"step": "minimal-root"}
+            )
+            staging_image = staging.current_image
+
+        current_step += 1
+        self.log(f"[bold blue]Step {current_step}[/bold blue]: Assembling image from scratch")
+
+        with BuildahContainer(
+                base_image="scratch",
+                image_name=variant_tag(self.image_name, self.march),
+                config=self.config,
+                cache_prefix=self.cache_prefix,
+                batch=self.batch
+        ) as container:
+            container.copy_container_current(staging_image, MINIMAL_ROOT, "/")
+            # buildah copy resets ownership and there is no shell to chown afterwards
+            container.copy_container_current(staging_image, f"{MINIMAL_ROOT}{BASE_VALKEY_DIR}", BASE_VALKEY_DIR,
+                                             chown=f"{runtime.Uid}:{runtime.Gid}")
+            container.copy_host_container(Path(f"{runtime.Resources}/valkey.conf"), f"{CONFIG_DIR}/valkey.conf")
+
+            env_configuration: List[Tuple[str, str]] = []
+            if runtime.Environment:
+                for env in runtime.Environment:
+                    env_configuration.append(("--env", env))
+
+            container.configure([
+                ("--label", f"io.valkey.user.uid={runtime.Uid}"),
+                ("--label", f"io.valkey.user.gid={runtime.Gid}"),
+                ("--label", f"io.valkey.user.name=valkey"),
+                ("--env", f"VALKEY_DATA={DATA_DIR}"),
+                ("--volume", DATA_DIR),
+                ("--env", f"PATH={self.config.Valkey.Prefix}/bin")
+            ] + env_configuration)
+
+            if self.march:
+                # Without a shell the entrypoint cannot check the CPU level, the label still documents it
+                self.log("[bold yellow]Warning[/bold yellow]: Minimal images start without checking the CPU "
+                         f"supports {self.march}.")
+                container.configure([
+                    ("--env", f"VALKEY_MARCH={self.march}"),
+                    ("--label", f"org.valkey.march={self.march}"),
+                ])
+
+            container.configure([
+                ("--entrypoint", f'["{self.config.Valkey.Prefix}/bin/valkey-server"]'),
+                ("--cmd", f'["{CONFIG_DIR}/valkey.conf"]'),
+                ("--user", str(runtime.Uid))
+            ])
+
             current_step += 1
             self.log(
                 f"[bold blue]Step {current_step}[/bold blue]: Tagging image and adding metadata.")
@@ -193,9 +508,10 @@ class RuntimeBuilder(BaseBuilder):
             container.configure([
                 ("--label", f"org.valkey.version={self.config.Valkey.Version}"),
                 ("--label", f"org.valkey.prefix={self.config.Valkey.Prefix}"),
+                ("--label", "org.valkey.runtime=minimal"),
             ])
-            if self.config.Valkey.Runtime.Ports:
-                for port in self.config.Valkey.Runtime.Ports:
+            if runtime.Ports:
+                for port in runtime.Ports:
                     container.configure([
                         ("--port", f"{port}")
                     ])
@@ -204,5 +520,76 @@ class RuntimeBuilder(BaseBuilder):
 
             self.log(f"Image tagged as: [green]{image_name_tag}[/green]")
 
+    def bench(self, baseline: Optional[Path] = None, save_baseline: bool = False) -> List[str]:
+        """
+        Benchmark the runtime image with the Benchmark suites of the spec and compare it against a baseline.
+        Results are written to <ResultsDirectory>/<image name>/<tag>.json.
+        :param baseline: results file to compare against. Defaults to <ResultsDirectory>/<image name>/baseline.json.
+        :param save_baseline: store the results as the new default baseline.
+        :return: regressions beyond the spec thresholds; empty if none or if there is no baseline yet.
+        """
+        image = self.image_name + ":" + self.image_tag
+        self.log(f"Benchmarking [green]{image}[/green]", style="bold blue")
+
+        run = run_benchmark(self.config, image)
+        output = results_path(self.config, self.image_name, self.image_tag)
+        current = write_results(output, image, self.config, run)
+        self.log(f"Results written to {output}")
+
+        baseline = baseline or baseline_path(self.config, self.image_name)
+        regressions = []
+        if baseline.exists():
+            with open(baseline) as f:
+                regressions = compare_results(current, json.load(f), self.config)
+        else:
+            self.log(f"[yellow]No baseline at {baseline}, nothing to compare against[/yellow]")
+            compare_results(current, {}, self.config)
+
+        if save_baseline:
+            default = baseline_path(self.config, self.image_name)
+            default.write_text(output.read_text())
+            self.log(f"Saved as baseline {default}")
+
+        return regressions
+
+    def bench_dataset(self, images: Optional[List[str]] = None, variants: Optional[List[str]] = None) -> Path:
+        """
+        Compare cold start time and memory footprint of runtime images on the synthetic dataset of the spec.
+        :param images: images to compare. Defaults to this image, in every variant.
+        :param variants: x86-64 levels to compare when no images are given. Defaults to Variants.Levels.
+        :return: path of the results file.
+        """
+        if not images:
+            tag = self.image_tag if not self.march else self.image_tag[:-len(self.march) - 1]
+            levels = variants if variants is not None else self.config.Variants.Levels
+            images = [f"{self.image_name}:{variant_tag(tag, check_march(march))}" for march in levels or [self.march]]
+
+        return bench_dataset(self.config, images)
+
+    def push(self, destination: str = "", compression: Optional[CompressionConfig] = None):
+        """
+        Push the runtime image with the layer compression of the spec.
+        :param destination: transport and reference. Defaults to <Publish.Registry>/<image name>:<tag>.
+        :param compression: overrides Publish.Compression.
+        :return:
+        """
+        publish = self.config.Publish
+        image = self.image_name + ":" + self.image_tag
+        if not destination:
+            if not publish.Registry:
+                raise RuntimeError("No destination given and Publish.Registry is not set.")
+            destination = f"{publish.Registry.rstrip('/')}/{image}"
+
+        compression = compression or publish.Compression
+        self.log(f"Pushing [green]{image}[/green] to {destination} ({compression.Format})", style="bold blue")
+        push_image(self.config.Buildah.Path, image, destination, compression, publish.TlsVerify)
+
+    def bench_pull(self) -> Path:
+        """
+        Compare the compression formats of Benchmark.Pull by transferred bytes and pull-to-PING time of this image.
+        :return: path of the results file.
+        """
+        return bench_pull(self.config, self.image_name + ":" + self.image_tag)
+
     def prune_cache_images(self):
         prune_cache_images(self.config.Buildah.Path, self.cache_prefix)
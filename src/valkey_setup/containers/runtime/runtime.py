@@ -4,7 +4,7 @@ from typing import Optional, List, Tuple
 import typer
 
 from .builder import RuntimeBuilder
-from valkey_setup.core import BuildSpec, load_spec
+from valkey_setup.core import BuildSpec, load_spec, Compression, CompressionConfig
 
 app = typer.Typer(help="A valkey runtime. Optionally with modules.")
 
@@ -43,11 +43,29 @@ def build(
         remove_package_manager: Optional[bool] = typer.Option(True, "--remove-package-manager", "--rp",
                                                               help="Optional. Remove dependency manager at the end of image build. Slims the image and improves security."),
         squash: Optional[bool] = typer.Option(True, "--squash", "--sq",
-                                              help="Optional. Merge layers into one. Important if remove_package_manager is set to True")
+                                              help="Optional. Merge layers into one. Important if remove_package_manager is set to True"),
+        batch: Optional[bool] = typer.Option(True, "--batch", "--b",
+                                             help="Optional. Run consecutive uncached commands as one script in a single buildah run."),
+        march: Optional[str] = typer.Option("", "--march",
+                                            help="Optional. x86-64 level of the core and module images to use e.g, x86-64-v3. Appended to the image tag."),
+        debloat: Optional[bool] = typer.Option(False, "--debloat",
+                                               help="Optional. Strip binaries and modules and remove headers, static libraries, docs and locales. Reports the bytes saved."),
+        minimal: Optional[bool] = typer.Option(False, "--minimal",
+                                               help="Optional. Build from scratch with only valkey, the shared libraries it loads and the files in Valkey.Runtime.Minimal. No shell."),
+        layered: Optional[bool] = typer.Option(False, "--layered",
+                                               help="Optional. Commit stable layers per component (base, core, each module, config) instead of squashing, so updates pull as small deltas."),
+        reproducible: Optional[bool] = typer.Option(False, "--reproducible",
+                                                    help="Optional. Reproducible build: SOURCE_DATE_EPOCH for compile steps and fixed image and file timestamps without history (see Reproducible in the spec).")
 ):
     """
     Build valkey runtime image with optional modules.
 
+    :param reproducible:
+    :param layered:
+    :param minimal:
+    :param debloat:
+    :param march:
+    :param batch:
     :param squash:
     :param remove_package_manager:
     :param cache_prefix:
@@ -58,15 +76,172 @@ def build(
     :return:
     """
     config = load_spec(spec_file, BuildSpec)
+    config.Reproducible.Enabled = config.Reproducible.Enabled or reproducible
 
     module_list = parse_modules(modules)
 
     builder = RuntimeBuilder(config, cache_prefix, image_name, image_tag, modules=module_list,
-                             remove_package_manager=remove_package_manager, squash=squash)
+                             remove_package_manager=remove_package_manager, squash=squash, batch=batch,
+                             march=march, debloat=debloat, minimal=minimal, layered=layered)
 
     builder.build()
 
 
+@app.command("bench", help="Benchmark a valkey runtime image and fail on regressions against a baseline.")
+def bench(
+        spec_file: Optional[Path] = typer.Option("configs/build.yaml", "--spec", "--s",
+                                                 help="Path to build specification file."),
+        image_name: Optional[str] = typer.Option("valkey", "--image-name", "--n",
+                                                 help="Name of the valkey runtime image."),
+        image_tag: Optional[str] = typer.Option("", "--image-tag", "--t",
+                                                help="Optional. Tag of the valkey runtime image"),
+        march: Optional[str] = typer.Option("", "--march",
+                                            help="Optional. x86-64 level of the image e.g, x86-64-v3. Appended to the image tag."),
+        baseline: Optional[Path] = typer.Option(None, "--baseline",
+                                                help="Optional. Results file to compare against. Defaults to the saved baseline of the image."),
+        save_baseline: Optional[bool] = typer.Option(False, "--save-baseline",
+                                                     help="Optional. Store the results as the new baseline.")
+):
+    """
+    Benchmark valkey runtime image. Exits with 1 if throughput or p99 latency regressed beyond the spec thresholds.
+
+    :param spec_file:
+    :param image_name:
+    :param image_tag:
+    :param march:
+    :param baseline:
+    :param save_baseline:
+    :return:
+    """
+    config = load_spec(spec_file, BuildSpec)
+
+    builder = RuntimeBuilder(config, image_name=image_name, image_tag=image_tag, march=march)
+
+    regressions = builder.bench(baseline, save_baseline)
+    if regressions:
+        for regression in regressions:
+            builder.log(f"[bold red]Regression:[/bold red] {regression}")
+        raise typer.Exit(code=1)
+
+
+@app.command("bench-dataset", help="Compare cold start time and memory of runtime images on a synthetic dataset.")
+def bench_dataset(
+        spec_file: Optional[Path] = typer.Option("configs/build.yaml", "--spec", "--s",
+                                                 help="Path to build specification file."),
+        image_name: Optional[str] = typer.Option("valkey", "--image-name", "--n",
+                                                 help="Name of the valkey runtime image."),
+        image_tag: Optional[str] = typer.Option("", "--image-tag", "--t",
+                                                help="Optional. Tag of the valkey runtime image"),
+        images: Optional[str] = typer.Option("", "--images",
+                                             help="Optional. Comma-separated images to compare e.g, valkey:9.0.1,valkey:9.0.1-libc. Overrides --image-name, --image-tag and --variants."),
+        variants: Optional[str] = typer.Option(None, "--variants",
+                                               help="Optional. Comma-separated x86-64 levels to compare. Defaults to Variants.Levels in the spec.")
+):
+    """
+    Generate the Benchmark.Dataset from the spec, persist it with every image and persistence mode and report the
+    cold-start-to-ready time and INFO memory figures.
+
+    :param spec_file:
+    :param image_name:
+    :param image_tag:
+    :param images:
+    :param variants:
+    :return:
+    """
+    config = load_spec(spec_file, BuildSpec)
+
+    builder = RuntimeBuilder(config, image_name=image_name, image_tag=image_tag)
+
+    image_list = [image.strip() for image in images.split(",") if image.strip()]
+    variant_list = None
+    if variants is not None:
+        variant_list = [march.strip() for march in variants.split(",") if march.strip()]
+
+    builder.bench_dataset(image_list, variant_list)
+
+
+@app.command("push", help="Push a valkey runtime image with zstd, zstd:chunked or gzip compressed layers.")
+def push(
+        spec_file: Optional[Path] = typer.Option("configs/build.yaml", "--spec", "--s",
+                                                 help="Path to build specification file."),
+        image_name: Optional[str] = typer.Option("valkey", "--image-name", "--n",
+                                                 help="Name of the valkey runtime image."),
+        image_tag: Optional[str] = typer.Option("", "--image-tag", "--t",
+                                                help="Optional. Tag of the valkey runtime image"),
+        march: Optional[str] = typer.Option("", "--march",
+                                            help="Optional. x86-64 level of the image e.g, x86-64-v3. Appended to the image tag."),
+        destination: Optional[str] = typer.Option("", "--destination", "--d",
+                                                  help="Optional. Transport and reference e.g, docker://registry.example.com/valkey:9.0.1. Defaults to Publish.Registry in the spec."),
+        compression_format: Optional[Compression] = typer.Option(None, "--compression-format",
+                                                                 help="Optional. Layer compression. Defaults to Publish.Compression.Format in the spec."),
+        compression_level: Optional[int] = typer.Option(None, "--compression-level",
+                                                        help="Optional. Compression level. Defaults to Publish.Compression.Level in the spec.")
+):
+    """
+    Push valkey runtime image. Layers are compressed on push; local storage keeps them uncompressed.
+
+    :param spec_file:
+    :param image_name:
+    :param image_tag:
+    :param march:
+    :param destination:
+    :param compression_format:
+    :param compression_level:
+    :return:
+    """
+    config = load_spec(spec_file, BuildSpec)
+
+    compression = config.Publish.Compression
+    if compression_format is not None or compression_level is not None:
+        compression = CompressionConfig(
+            Format=compression_format if compression_format is not None else compression.Format,
+            Level=compression_level if compression_level is not None else compression.Level
+        )
+
+    builder = RuntimeBuilder(config, image_name=image_name, image_tag=image_tag, march=march)
+
+    builder.push(destination, compression)
+
+
+@app.command("bench-pull", help="Compare layer compression formats by bytes pulled and time from pull to first PING.")
+def bench_pull(
+        spec_file: Optional[Path] = typer.Option("configs/build.yaml", "--spec", "--s",
+                                                 help="Path to build specification file."),
+        image_name: Optional[str] = typer.Option("valkey", "--image-name", "--n",
+                                                 help="Name of the valkey runtime image."),
+        image_tag: Optional[str] = typer.Option("", "--image-tag", "--t",
+                                                help="Optional. Tag of the valkey runtime image"),
+        march: Optional[str] = typer.Option("", "--march",
+                                            help="Optional. x86-64 level of the image e.g, x86-64-v3. Appended to the image tag."),
+        formats: Optional[str] = typer.Option("", "--formats",
+                                              help="Optional. Comma-separated formats e.g, gzip,zstd,zstd:chunked. Defaults to Benchmark.Pull.Formats in the spec."),
+        registry: Optional[str] = typer.Option("", "--registry",
+                                               help="Optional. Registry to push to and pull from e.g, docker://localhost:5000/valkey-bench. Defaults to Benchmark.Pull.Registry; OCI layout directories if empty.")
+):
+    """
+    Push the image once per compression format and measure, with cold storage each time, the transferred bytes and
+    the pull, container creation and start-to-PING times.
+
+    :param spec_file:
+    :param image_name:
+    :param image_tag:
+    :param march:
+    :param formats:
+    :param registry:
+    :return:
+    """
+    config = load_spec(spec_file, BuildSpec)
+
+    if formats:
+        config.Benchmark.Pull.Formats = [Compression(item.strip()) for item in formats.split(",") if item.strip()]
+    if registry:
+        config.Benchmark.Pull.Registry = registry
+
+    builder = RuntimeBuilder(config, image_name=image_name, image_tag=image_tag, march=march)
+
+    builder.bench_pull()
+
+
 @app.command("delete-cache", help="Delete cache images used to build valkey runtime image.")
 def delete_cache(
         spec_file: Optional[Path] = typer.Option("configs/build.yaml", "--spec", "--s",
@@ -1,2 +1,14 @@
-from .spec import BuildSpec, load_spec, Distro
-from .containers import BaseBuilder, BuildahContainer, prune_cache_images, BaseRuntime, init_base_distro
+from .spec import BuildSpec, load_spec, pin_sha256, Distro, Compression, CompressionConfig
+from .containers import BaseBuilder, BuildahContainer, prune_cache_images, BaseRuntime, init_base_distro, BaseDistro, \
+    CompilerCache, Toolchain, CacheUsage, gc_cache_images, parse_size, parse_duration, export_cache_images, \
+    import_cache_images, AsyncBuildah, AsyncBuildahContainer, AsyncCommandError, X86_64_LEVELS, check_march, variant_tag, \
+    march_env, with_march, analyze_image, print_image_analysis, write_image_analysis, format_size, debloat_script, \
+    split_debuginfo_script, commit_debuginfo_image, debuginfo_tag, minimal_root_script, MINIMAL_ROOT, \
+    MANIFEST_LABEL, manifest_label, read_manifest, push_image, compression_args, \
+    source_date_epoch, reproducible_env
+from .pipeline import BuildGraph
+from .artifacts import ArtifactStore, sha256_file
+from .tracing import tracer
+from .planning import planner
+from .bench import run_benchmark, write_results, compare_results, results_path, baseline_path, bench_module, \
+    bench_dataset, bench_pull
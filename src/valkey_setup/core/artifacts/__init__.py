@@ -0,0 +1 @@
+from .store import ArtifactStore, sha256_file
@@ -0,0 +1,141 @@
+import hashlib
+import shutil
+import tempfile
+import urllib.request
+from pathlib import Path
+
+import sh
+from rich.console import Console
+
+from ..planning import planner
+from ..spec import BuildSpec
+
+console = Console()
+
+
+def sha256_file(path: Path) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class ArtifactStore:
+    def __init__(self, config: BuildSpec):
+        self.config = config.ArtifactStore
+        self.directory = Path(self.config.Directory)
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.Enabled
+
+    def path(self, url: str, ref: str, filename: str) -> Path:
+        """
+        Location of an artifact in the store. Keyed by source URL and ref.
+        :param url:
+        :param ref: version, tag or branch.
+        :param filename:
+        :return:
+        """
+        key = hashlib.sha256(f"{url}@{ref}".encode('utf-8')).hexdigest()[:16]
+        return self.directory / key / filename
+
+    def _verify(self, path: Path, sha256: str):
+        """
+        Check the artifact against the checksum recorded in the spec.
+        :param path:
+        :param sha256: expected digest. Unpinned artifacts are rejected unless ArtifactStore.AllowUnpinned is set.
+        :return:
+        """
+        digest = sha256_file(path)
+        if not sha256:
+            if not self.config.AllowUnpinned:
+                raise RuntimeError(f"No Sha256 recorded for {path.name} (computed {digest}). Pin it in the spec, "
+                                   f"e.g. with 'containers fetch --record', or set ArtifactStore.AllowUnpinned.")
+            console.print(f"[yellow]No Sha256 recorded for {path.name}; computed {digest}[/yellow]")
+            return
+
+        if digest != sha256.lower():
+            raise RuntimeError(f"Checksum mismatch for {path}: expected {sha256}, got {digest}")
+
+    def _store(self, path: Path, download):
+        """
+        Download into a temporary file next to the final location and move it into place.
+        :param path:
+        :param download: callable writing the artifact to the given path.
+        :return:
+        """
+        if self.config.Offline:
+            raise RuntimeError(f"Artifact {path} is not in the store and offline mode is enabled. "
+                               f"Run 'containers fetch' on a connected host first.")
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".part")
+        try:
+            download(tmp_path)
+            tmp_path.replace(path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def fetch_archive(self, url: str, ref: str, sha256: str, filename: str) -> Path:
+        """
+        Return the verified archive for url, downloading it if it is not in the store.
+        :param url:
+        :param ref:
+        :param sha256:
+        :param filename:
+        :return:
+        """
+        path = self.path(url, ref, filename)
+
+        if planner.enabled and not path.exists():
+            console.print(f"[yellow]{url} is not in the artifact store and would be downloaded[/yellow]")
+            return path
+
+        if not path.exists():
+            console.print(f"[dim]Downloading {url} -> {path}[/dim]")
+
+            def download(dest: Path):
+                with urllib.request.urlopen(url) as response, open(dest, "wb") as f:
+                    shutil.copyfileobj(response, f)
+
+            self._store(path, download)
+
+        self._verify(path, sha256)
+        return path
+
+    def fetch_git(self, url: str, ref: str, sha256: str, prefix: str) -> Path:
+        """
+        Return a verified tar archive of the git checkout of url at ref, cloning it if it is not in the store.
+        Archives are created with `git archive` so the same commit always yields the same bytes.
+        :param url:
+        :param ref:
+        :param sha256:
+        :param prefix: top level directory of the archive.
+        :return:
+        """
+        path = self.path(url, ref, f"{prefix}.tar")
+
+        if planner.enabled and not path.exists():
+            console.print(f"[yellow]{url} ({ref}) is not in the artifact store and would be cloned[/yellow]")
+            return path
+
+        if not path.exists():
+            console.print(f"[dim]Cloning {url} ({ref}) -> {path}[/dim]")
+
+            try:
+                git_cmd = sh.Command("git")
+            except sh.CommandNotFound:
+                raise RuntimeError("git executable not found; it is required to fetch module sources")
+
+            def download(dest: Path):
+                with tempfile.TemporaryDirectory() as checkout:
+                    git_cmd("clone", "--depth", "1", "--branch", ref, url, checkout)
+                    git_cmd("-C", checkout, "archive", "--format=tar", f"--prefix={prefix}/",
+                            "-o", str(dest.absolute()), "HEAD")
+
+            self._store(path, download)
+
+        self._verify(path, sha256)
+        return path
@@ -0,0 +1,5 @@
+from .valkey_benchmark import run_benchmark, write_results, compare_results, results_path, baseline_path, \
+    server_script, parse_csv, parse_ready, summarize, require_shell
+from .module_benchmark import bench_module, run_module_benchmark, module_results_path
+from .dataset_benchmark import bench_dataset, generate_dataset, run_dataset_benchmark
+from .pull_benchmark import bench_pull, cold_start, layout_size
@@ -0,0 +1,288 @@
+import hashlib
+import json
+import random
+import shlex
+import statistics
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, BinaryIO
+
+from rich.console import Console
+from rich.table import Table
+
+from .valkey_benchmark import BENCH_PORT, require_shell
+from ..containers import BuildahContainer
+from ..spec import BuildSpec
+from ..spec.build.build import DatasetBenchmarkConfig
+
+console = Console()
+
+DATASET_MOUNT = "/tmp/valkey-dataset-input"
+DATA_ROOT = "/tmp/valkey-dataset"
+RUNTIME_CONFIG = "/usr/share/valkey/config/valkey.conf"
+
+COLD_START_MARKER = "#coldstart "
+DISK_MARKER = "#disk "
+KEYS_MARKER = "#keys "
+INFO_MARKER = "#info "
+
+MEMORY_FIELDS = ["used_memory", "used_memory_rss", "used_memory_dataset", "used_memory_peak",
+                 "mem_fragmentation_ratio", "allocator_frag_ratio", "mem_allocator"]
+
+
+def _write_command(f: BinaryIO, *args: Any):
+    """
+    Write one command in RESP, the format `valkey-cli --pipe` expects.
+    :param f:
+    :param args: str or bytes arguments.
+    :return:
+    """
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    f.write(b"".join(parts))
+
+
+def _json_document(rng: random.Random, depth: int) -> Dict[str, Any]:
+    document: Dict[str, Any] = {"id": rng.randrange(1 << 31), "score": rng.random(),
+                                "tags": [rng.randbytes(4).hex() for _ in range(3)]}
+    for level in range(depth, 0, -1):
+        document = {f"l{level}": document, "name": rng.randbytes(8).hex(), "count": rng.randrange(1000)}
+    return document
+
+
+def generate_dataset(settings: DatasetBenchmarkConfig, directory: Path) -> Path:
+    """
+    Write the synthetic dataset as a RESP command stream. The file name is derived from the dataset settings, so an
+    existing file is reused.
+    :param settings:
+    :param directory:
+    :return: path of the command file.
+    """
+    shape = settings.model_dump(exclude={"Repeat", "Persistence"})
+    digest = hashlib.sha256(json.dumps(shape, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    path = directory / f"dataset-{digest}.resp"
+    if path.exists():
+        console.print(f"[dim]Using dataset {path}[/dim]")
+        return path
+
+    console.print(f"Generating dataset {path}")
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(settings.Seed)
+    partial = path.with_suffix(".partial")
+    with open(partial, "wb") as f:
+        for i in range(settings.Strings):
+            _write_command(f, "SET", f"str:{i}", rng.randbytes(settings.StringSize))
+
+        for i in range(settings.Hashes):
+            fields = []
+            for field in range(settings.HashFields):
+                fields.extend([f"f{field}", rng.randbytes(settings.HashFieldSize)])
+            _write_command(f, "HSET", f"hash:{i}", *fields)
+
+        for i in range(settings.JsonDocuments):
+            _write_command(f, "JSON.SET", f"doc:{i}", "$",
+                           json.dumps(_json_document(rng, settings.JsonDepth), separators=(",", ":")))
+
+        if settings.Vectors:
+            # Index first so loading the dataset includes rebuilding it
+            _write_command(f, "FT.CREATE", "vectors", "ON", "HASH", "PREFIX", "1", "vec:", "SCHEMA", "embedding",
+                           "VECTOR", "HNSW", "6", "TYPE", "FLOAT32", "DIM", settings.VectorDimensions,
+                           "DISTANCE_METRIC", "L2")
+            packer = struct.Struct(f"<{settings.VectorDimensions}f")
+            for i in range(settings.Vectors):
+                vector = packer.pack(*(rng.random() for _ in range(settings.VectorDimensions)))
+                _write_command(f, "HSET", f"vec:{i}", "embedding", vector)
+    partial.rename(path)
+
+    return path
+
+
+def dataset_script(prefix: str, dataset: str, persistence: Dict[str, List[str]], repeat: int) -> str:
+    """
+    Shell script that, per persistence mode, loads the dataset into a server configured like the runtime image,
+    shuts it down to persist it and then measures cold starts until the server answers PING.
+    :param prefix: valkey install prefix in the image.
+    :param dataset: path of the RESP command file in the container.
+    :param persistence: mode name -> valkey-server arguments.
+    :param repeat: cold starts per mode.
+    :return:
+    """
+    lines = [f"""
+set -e
+BIN={prefix}/bin
+now() {{ echo $(( $(date +%s%N) / 1000000 )); }}
+start() {{
+    $BIN/valkey-server {RUNTIME_CONFIG} --port {BENCH_PORT} --daemonize yes --dir "$DIR" \\
+        --logfile "$DIR.log" --pidfile "$DIR.pid" "$@"
+}}
+wait_ready() {{
+    i=0
+    until [ "$($BIN/valkey-cli -p {BENCH_PORT} ping 2>/dev/null)" = "PONG" ]; do
+        i=$((i + 1)); [ $i -lt 60000 ] || {{ cat "$DIR.log"; exit 1; }}; sleep 0.01
+    done
+}}
+stop() {{
+    $BIN/valkey-cli -p {BENCH_PORT} shutdown "$@" >/dev/null 2>&1 || true
+    while [ -e "$DIR.pid" ]; do sleep 0.01; done
+}}
+"""]
+    for mode, args in persistence.items():
+        server_args = shlex.join(args)
+        lines.append(f"""
+DIR={DATA_ROOT}/{shlex.quote(mode)}
+rm -rf "$DIR" "$DIR.log" && mkdir -p "$DIR"
+start {server_args}
+wait_ready
+$BIN/valkey-cli -p {BENCH_PORT} --pipe < {dataset}
+stop
+echo "{DISK_MARKER}{mode} $(du -sk "$DIR" | cut -f1)"
+""")
+        for run in range(repeat):
+            lines.append(f"""
+started=$(now)
+start {server_args}
+wait_ready
+echo "{COLD_START_MARKER}{mode} $(( $(now) - started ))"
+""")
+            if run == repeat - 1:
+                lines.append(f"""
+echo "{KEYS_MARKER}{mode} $($BIN/valkey-cli -p {BENCH_PORT} dbsize)"
+echo "{INFO_MARKER}{mode}"
+$BIN/valkey-cli -p {BENCH_PORT} info memory
+""")
+            lines.append("stop nosave")
+
+    return "\n".join(lines)
+
+
+def parse_dataset_output(output: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Collect the markers printed by dataset_script.
+    :param output:
+    :return: {mode: {"cold_start_ms": median, "cold_starts_ms": [..], "disk_kb": .., "keys": .., "memory": {..}}}
+    """
+    modes: Dict[str, Dict[str, Any]] = {}
+    info_mode: Optional[str] = None
+    for line in output.splitlines():
+        line = line.strip()
+        for marker in (COLD_START_MARKER, DISK_MARKER, KEYS_MARKER):
+            if line.startswith(marker):
+                mode, value = line[len(marker):].rsplit(" ", 1)
+                entry = modes.setdefault(mode, {"cold_starts_ms": [], "memory": {}})
+                if marker == COLD_START_MARKER:
+                    entry["cold_starts_ms"].append(float(value))
+                elif marker == DISK_MARKER:
+                    entry["disk_kb"] = int(value)
+                else:
+                    entry["keys"] = int(value)
+                info_mode = None
+                break
+        else:
+            if line.startswith(INFO_MARKER):
+                info_mode = line[len(INFO_MARKER):]
+                modes.setdefault(info_mode, {"cold_starts_ms": [], "memory": {}})
+            elif info_mode and ":" in line:
+                key, value = line.split(":", 1)
+                if key in MEMORY_FIELDS:
+                    try:
+                        modes[info_mode]["memory"][key] = float(value)
+                    except ValueError:
+                        modes[info_mode]["memory"][key] = value
+
+    for entry in modes.values():
+        if entry["cold_starts_ms"]:
+            entry["cold_start_ms"] = statistics.median(entry["cold_starts_ms"])
+
+    return modes
+
+
+def run_dataset_benchmark(config: BuildSpec, image: str, dataset: Path) -> Dict[str, Dict[str, Any]]:
+    """
+    Persist the dataset with image and measure cold starts and memory for every persistence mode of the spec.
+    The server uses the image's valkey.conf, so its modules, allocator and persistence defaults apply.
+    :param config:
+    :param image:
+    :param dataset: RESP command file on the host, mounted into the container.
+    :return: per mode results, see parse_dataset_output.
+    """
+    settings = config.Benchmark.Dataset
+    script = dataset_script(config.Valkey.Prefix, f"{DATASET_MOUNT}/{dataset.name}", settings.Persistence,
+                            settings.Repeat)
+
+    container_name = image.rsplit("/", 1)[-1].replace(":", "-") + "-dataset"
+    with BuildahContainer(base_image=image, image_name=container_name, config=config, cache_prefix="") as container:
+        require_shell(image, container.image_labels(image))
+        start = time.time()
+        output = container.run_get_output(["sh", "-c", script],
+                                          mounts=[(str(dataset.parent.resolve()), f"{DATASET_MOUNT}:ro")])
+        console.print(f"[dim]Dataset benchmark of {image} finished in {time.time() - start:.1f}s[/dim]")
+
+    modes = parse_dataset_output(output)
+    missing = [mode for mode in settings.Persistence if "cold_start_ms" not in modes.get(mode, {})]
+    if missing:
+        raise RuntimeError(f"No cold start measured for {', '.join(missing)}:\n{output[-2000:]}")
+
+    return modes
+
+
+def _mib(value: Optional[float]) -> str:
+    return f"{value / (1 << 20):.1f}" if isinstance(value, float) else "-"
+
+
+def print_dataset_results(results: Dict[str, Dict[str, Dict[str, Any]]]):
+    """
+    Print cold start and memory figures of every image and persistence mode.
+    :param results: {image: {mode: ..}}
+    :return:
+    """
+    table = Table(title="Dataset load time and memory")
+    for column in ["Image", "Persistence", "Keys", "On disk (MiB)", "Cold start (ms)", "used_memory (MiB)",
+                   "RSS (MiB)", "Fragmentation", "Allocator"]:
+        table.add_column(column, justify="left" if column in ("Image", "Persistence", "Allocator") else "right")
+
+    for image, modes in results.items():
+        for mode, entry in modes.items():
+            memory = entry["memory"]
+            fragmentation = memory.get("mem_fragmentation_ratio")
+            table.add_row(image, mode, str(entry.get("keys", "-")),
+                          f"{entry['disk_kb'] / 1024:.1f}" if "disk_kb" in entry else "-",
+                          f"{entry['cold_start_ms']:.0f}",
+                          _mib(memory.get("used_memory")), _mib(memory.get("used_memory_rss")),
+                          f"{fragmentation:.2f}" if isinstance(fragmentation, float) else "-",
+                          str(memory.get("mem_allocator", "-")))
+
+    console.print(table)
+
+
+def bench_dataset(config: BuildSpec, images: List[str]) -> Path:
+    """
+    Generate the synthetic dataset of the spec and measure it with each image.
+    Results are written to <ResultsDirectory>/dataset/<timestamp>.json.
+    :param config:
+    :param images:
+    :return: path of the results file.
+    """
+    directory = Path(config.Benchmark.ResultsDirectory) / "dataset"
+    dataset = generate_dataset(config.Benchmark.Dataset, directory)
+
+    results = {}
+    for image in images:
+        console.print(f"[bold blue]Loading dataset with {image}[/bold blue]")
+        results[image] = run_dataset_benchmark(config, image, dataset)
+
+    print_dataset_results(results)
+
+    output = directory / f"{time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())}.json"
+    with open(output, "w") as f:
+        json.dump({
+            "measured_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "dataset": dataset.name,
+            "settings": config.Benchmark.Dataset.model_dump(),
+            "results": results,
+        }, f, indent=2)
+    console.print(f"Results written to {output}")
+
+    return output
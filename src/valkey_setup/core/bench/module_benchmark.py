@@ -0,0 +1,194 @@
+import json
+import shlex
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from rich.console import Console
+
+from .valkey_benchmark import BENCH_PORT, SUITE_MARKER, server_script, parse_csv, parse_ready, summarize, \
+    compare_results, require_shell
+from ..containers import BuildahContainer, variant_tag
+from ..spec import BuildSpec
+from ..spec.build.build import ModuleBenchmarkConfig
+
+console = Console()
+
+MODULE_DIR = "/tmp/valkey-bench-modules"
+
+# (name, valkey-cli commands run once before the workload, valkey-benchmark command, requests, keyspace)
+Workload = Tuple[str, List[List[str]], List[str], int, int]
+
+
+def _random_blob(size: int) -> str:
+    """
+    Argument of size bytes made of `__rand_int__` placeholders, so every request sends a different value.
+    :param size:
+    :return:
+    """
+    placeholder = "__rand_int__"
+    return (placeholder * (size // len(placeholder))).ljust(size, "A")
+
+
+def json_workloads(settings: ModuleBenchmarkConfig) -> List[Workload]:
+    document: Dict[str, Any] = {"id": 1, "tags": ["a", "b", "c"], "values": [1.5, 2.5, 3.5]}
+    path = "$"
+    for level in range(settings.JsonDepth, 0, -1):
+        document = {f"l{level}": document, "name": f"level {level}", "flag": level % 2 == 0}
+    for level in range(1, settings.JsonDepth + 1):
+        path += f".l{level}"
+
+    doc = json.dumps(document, separators=(",", ":"))
+    return [
+        ("json/JSON.SET", [], ["JSON.SET", "doc:__rand_int__", "$", doc], settings.Requests, settings.KeySpace),
+        ("json/JSON.GET", [], ["JSON.GET", "doc:__rand_int__", f"{path}.values"], settings.Requests, settings.KeySpace),
+    ]
+
+
+def search_workloads(settings: ModuleBenchmarkConfig) -> List[Workload]:
+    workloads = []
+    for dim in settings.VectorDimensions:
+        index = f"idx{dim}"
+        blob = _random_blob(dim * 4)  # FLOAT32
+        create = ["FT.CREATE", index, "ON", "HASH", "PREFIX", "1", f"vec{dim}:", "SCHEMA", "embedding", "VECTOR",
+                  "HNSW", "6", "TYPE", "FLOAT32", "DIM", str(dim), "DISTANCE_METRIC", "L2"]
+        workloads.append((f"search/HSET dim={dim}", [create],
+                          ["HSET", f"vec{dim}:__rand_int__", "embedding", blob], settings.VectorKeys,
+                          settings.VectorKeys))
+        workloads.append((f"search/KNN dim={dim}", [],
+                          ["FT.SEARCH", index, f"*=>[KNN {settings.Knn} @embedding $q]", "PARAMS", "2", "q", blob,
+                           "NOCONTENT", "DIALECT", "2"], settings.Requests, settings.VectorKeys))
+    return workloads
+
+
+def bloom_workloads(settings: ModuleBenchmarkConfig) -> List[Workload]:
+    reserve = ["BF.RESERVE", "filter", "0.01", str(settings.BloomCapacity)]
+    keyspace = settings.BloomCapacity * 10
+    return [
+        ("bloom/BF.ADD", [reserve], ["BF.ADD", "filter", "item:__rand_int__"], settings.BloomCapacity, keyspace),
+        ("bloom/BF.EXISTS", [], ["BF.EXISTS", "filter", "item:__rand_int__"], settings.Requests, keyspace),
+    ]
+
+
+WORKLOADS = {
+    "valkey-json": json_workloads,
+    "valkey-search": search_workloads,
+    "valkey-bloom": bloom_workloads,
+}
+
+
+def workload_commands(workloads: List[Workload], settings: ModuleBenchmarkConfig) -> List[str]:
+    commands = []
+    for name, setup, command, requests, keyspace in workloads:
+        for cli in setup:
+            commands.append(f"$BIN/valkey-cli -p {BENCH_PORT} {shlex.join(cli)} >/dev/null")
+        commands.append(f"echo {shlex.quote(SUITE_MARKER + name)}")
+        args = ["-p", str(BENCH_PORT), "--csv", "-n", str(requests), "-c", str(settings.Clients),
+                "-r", str(keyspace)]
+        commands.append("$BIN/valkey-benchmark " + shlex.join(args + command))
+    return commands
+
+
+def run_module_benchmark(config: BuildSpec, module: str, image: str, module_image: str,
+                         so_file: str) -> Dict[str, Any]:
+    """
+    Load a module into valkey-server and run its workloads.
+    A working container is created from image (a runtime image providing valkey and the module's runtime libraries)
+    and the module is copied in from module_image, so any built version can be measured with the same server.
+    Each repetition starts a fresh server without and with the module to measure the load time.
+    :param config:
+    :param module: valkey-json, valkey-search or valkey-bloom.
+    :param image:
+    :param module_image: module build image holding <Prefix>/modules/<so_file>.
+    :param so_file:
+    :return: {"load_ms": .., "startup_ms": .., "results": {workload: median metrics}}
+    """
+    settings = config.Benchmark.Modules
+    module_path = f"{MODULE_DIR}/{so_file}"
+
+    script = []
+    for _ in range(config.Benchmark.Repeat):
+        # Keys do not persist between servers, so setup commands run against every fresh server
+        script.append(server_script(config.Valkey.Prefix, []))
+        script.append(server_script(config.Valkey.Prefix, workload_commands(WORKLOADS[module](settings), settings),
+                                    ["--loadmodule", module_path]))
+
+    container_name = module_image.rsplit("/", 1)[-1].replace(":", "-") + "-bench"
+    with BuildahContainer(base_image=image, image_name=container_name, config=config, cache_prefix="") as container:
+        require_shell(image, container.image_labels(image))
+        container.copy_container(module_image, f"{config.Valkey.Prefix}/modules/{so_file}", module_path)
+        start = time.time()
+        output = container.run_get_output(["sh", "-c", "\n".join(script)])
+        console.print(f"[dim]Benchmark finished in {time.time() - start:.1f}s[/dim]")
+
+    ready = parse_ready(output)
+    results = summarize(parse_csv(output, by_section=True))
+    if not results or len(ready) < 2:
+        raise RuntimeError(f"Module benchmark produced no results:\n{output[-2000:]}")
+
+    # Alternating bare / with-module startups
+    startup = statistics.median(ready[0::2])
+    loaded = statistics.median(ready[1::2])
+    return {"load_ms": max(loaded - startup, 0.0), "startup_ms": startup, "results": results}
+
+
+def module_results_path(config: BuildSpec, module: str, tag: str) -> Path:
+    return Path(config.Benchmark.ResultsDirectory) / "modules" / module / f"{tag}.json"
+
+
+def bench_module(config: BuildSpec, module: str, version: str, current: str, module_image: str, so_file: str,
+                 image: str, baseline: Optional[Path] = None, march: str = "") -> List[str]:
+    """
+    Benchmark a module version and compare it against the results of the Current version from the spec.
+    Results are written to <ResultsDirectory>/modules/<module>/<valkey version>-<version>.json.
+    :param config:
+    :param module:
+    :param version: module version being measured.
+    :param current: version the spec currently ships, used as the default baseline.
+    :param module_image:
+    :param so_file:
+    :param image: runtime image to load the module into.
+    :param baseline: results file to compare against instead.
+    :param march: x86-64 level of the images, appended to the results file name.
+    :return: regressions beyond the spec thresholds; empty if none or if there is no baseline.
+    """
+    console.print(f"[bold blue]Benchmarking {module} {version} in {image}[/bold blue]")
+    run = run_module_benchmark(config, module, image, module_image, so_file)
+
+    def tag(ext_version: str) -> str:
+        return variant_tag(f"{config.Valkey.Version}-{ext_version}", march)
+
+    document = {
+        "image": module_image,
+        "runtime_image": image,
+        "module": module,
+        "version": version,
+        "valkey_version": config.Valkey.Version,
+        "measured_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "settings": config.Benchmark.Modules.model_dump(),
+        "repeat": config.Benchmark.Repeat,
+        **run,
+    }
+    output = module_results_path(config, module, tag(version))
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(document, f, indent=2)
+    console.print(f"Results written to {output}")
+
+    if baseline is None and version != current:
+        baseline = module_results_path(config, module, tag(current))
+
+    reference: Dict[str, Any] = {}
+    if baseline is not None and baseline.exists():
+        with open(baseline) as f:
+            reference = json.load(f)
+    elif baseline is not None:
+        console.print(f"[yellow]No baseline at {baseline}, benchmark {module} {current} first[/yellow]")
+
+    base_load = reference.get("load_ms")
+    console.print(f"Module load time: [bold]{run['load_ms']:.0f} ms[/bold]"
+                  + (f" (baseline {base_load:.0f} ms)" if base_load is not None else "")
+                  + f", server startup without module {run['startup_ms']:.0f} ms")
+
+    return compare_results(document, reference, config)
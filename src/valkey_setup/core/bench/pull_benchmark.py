@@ -0,0 +1,155 @@
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+import sh
+from rich.console import Console
+from rich.table import Table
+
+from .valkey_benchmark import server_script, parse_ready, require_shell
+from ..containers import push_image, format_size
+from ..spec import BuildSpec, CompressionConfig
+from ..tracing import tracer, TracedCommand
+
+console = Console()
+
+
+def layout_size(layout: Path) -> Dict[str, int]:
+    """
+    Bytes a node downloads for the image in an OCI layout: its manifest, config and compressed layers.
+    :param layout: OCI layout directory holding a single image.
+    :return: {"bytes": .., "layers": ..}
+    """
+    index = json.loads((layout / "index.json").read_text())
+    descriptor = index["manifests"][0]
+    manifest_path = layout / "blobs" / Path(*descriptor["digest"].split(":", 1))
+    manifest = json.loads(manifest_path.read_text())
+    layers = manifest.get("layers", [])
+    size = descriptor.get("size", manifest_path.stat().st_size) + manifest["config"]["size"]
+    return {"bytes": size + sum(layer["size"] for layer in layers), "layers": len(layers)}
+
+
+def _milliseconds(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
+def cold_start(config: BuildSpec, source: str, storage: Path, tls_verify: bool) -> Dict[str, float]:
+    """
+    Pull source into an empty storage, create a container and start valkey-server until it answers PING.
+    The storage is separate from the build storage, otherwise layers already present locally would not be fetched.
+    :param config:
+    :param source: image reference with transport, e.g. oci:<dir>:<tag>.
+    :param storage: empty directory for the storage of this pull.
+    :param tls_verify:
+    :return: {"pull_ms": .., "create_ms": .., "ready_ms": .., "total_ms": ..}
+    """
+    buildah = TracedCommand(sh.Command(config.Buildah.Path), tracer)
+    scoped = ["--root", str(storage / "root"), "--runroot", str(storage / "runroot")]
+    name = "valkey-pull-bench"
+
+    pull_args = ["pull", "--quiet"]
+    if source.startswith("docker://"):
+        pull_args.append(f"--tls-verify={str(tls_verify).lower()}")
+
+    start = time.perf_counter()
+    with tracer.span("pull", image=source):
+        image_id = str(buildah(*scoped, *pull_args, source)).strip().splitlines()[-1]
+    pull_ms = _milliseconds(start)
+
+    start = time.perf_counter()
+    buildah(*scoped, "from", "--name", name, image_id)
+    create_ms = _milliseconds(start)
+
+    try:
+        output = str(buildah(*scoped, "run", name, "--", "sh", "-c", server_script(config.Valkey.Prefix, [])))
+    finally:
+        buildah(*scoped, "rm", name)
+        buildah(*scoped, "rmi", "--all", "--force")
+
+    ready = parse_ready(output)
+    if not ready:
+        raise RuntimeError(f"valkey-server did not answer PING:\n{output[-2000:]}")
+
+    return {"pull_ms": pull_ms, "create_ms": create_ms, "ready_ms": ready[0],
+            "total_ms": pull_ms + create_ms + ready[0]}
+
+
+def bench_pull(config: BuildSpec, image: str) -> Path:
+    """
+    Push image once per compression format of Benchmark.Pull and measure the bytes a node downloads and the time
+    from pull to the first PING reply, cold, Repeat times per format.
+    Results are written to <ResultsDirectory>/pull/<timestamp>.json.
+    :param config:
+    :param image: local runtime image; needs sh, so not a minimal image.
+    :return: path of the results file.
+    """
+    buildah = TracedCommand(sh.Command(config.Buildah.Path), tracer)
+    inspect = json.loads(str(buildah("inspect", "--type", "image", image)))
+    require_shell(image, inspect.get("OCIv1", {}).get("config", {}).get("Labels") or {})
+
+    settings = config.Benchmark.Pull
+    results: Dict[str, Dict[str, Any]] = {}
+
+    with tempfile.TemporaryDirectory(prefix="valkey-pull-", ignore_cleanup_errors=True) as directory:
+        for compression_format in settings.Formats:
+            console.print(f"[bold blue]{compression_format}[/bold blue]: pushing {image}")
+            compression = CompressionConfig(Format=compression_format, Level=settings.Level)
+            tag = image.rsplit(":", 1)[-1] + "-" + str(compression_format).replace(":", "-")
+
+            # The layout gives the transferred size; a registry, if set, is what nodes pull from
+            layout = Path(directory) / "layouts" / tag
+            push_image(config.Buildah.Path, image, f"oci:{layout}:{tag}", compression)
+            source = f"oci:{layout}:{tag}"
+            if settings.Registry:
+                source = f"{settings.Registry}:{tag}"
+                push_image(config.Buildah.Path, image, source, compression, settings.TlsVerify)
+
+            runs: List[Dict[str, float]] = []
+            for run in range(settings.Repeat):
+                storage = Path(directory) / "storage" / f"{tag}-{run}"
+                runs.append(cold_start(config, source, storage, settings.TlsVerify))
+
+            results[str(compression_format)] = {
+                **layout_size(layout),
+                "level": settings.Level,
+                "runs": runs,
+                **{key: statistics.median(run[key] for run in runs) for key in runs[0]},
+            }
+
+    print_pull_results(image, results)
+
+    results_directory = Path(config.Benchmark.ResultsDirectory) / "pull"
+    results_directory.mkdir(parents=True, exist_ok=True)
+    output = results_directory / f"{time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())}.json"
+    with open(output, "w") as f:
+        json.dump({
+            "image": image,
+            "measured_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "settings": settings.model_dump(mode="json"),
+            "results": results,
+        }, f, indent=2)
+    console.print(f"Results written to {output}")
+
+    return output
+
+
+def print_pull_results(image: str, results: Dict[str, Dict[str, Any]]):
+    """
+    Print transferred bytes and median cold start times per compression format.
+    :param image:
+    :param results: {format: ..}, see bench_pull.
+    :return:
+    """
+    table = Table(title=f"Pull and cold start of {image}")
+    for column in ["Format", "Layers", "Transferred", "Pull (ms)", "Create (ms)", "Start to PING (ms)", "Total (ms)"]:
+        table.add_column(column, justify="left" if column == "Format" else "right")
+
+    for compression_format, entry in results.items():
+        table.add_row(compression_format, str(entry["layers"]), format_size(entry["bytes"]),
+                      f"{entry['pull_ms']:.0f}", f"{entry['create_ms']:.0f}", f"{entry['ready_ms']:.0f}",
+                      f"{entry['total_ms']:.0f}")
+
+    console.print(table)
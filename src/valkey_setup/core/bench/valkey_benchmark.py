@@ -0,0 +1,237 @@
+import csv
+import json
+import shlex
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from rich.console import Console
+from rich.table import Table
+
+from ..containers import BuildahContainer
+from ..spec import BuildSpec
+from ..spec.build.build import BenchmarkSuiteConfig
+
+console = Console()
+
+BENCH_PORT = 6390
+SUITE_MARKER = "#suite "
+READY_MARKER = "#ready "
+MINIMAL_LABEL = ("org.valkey.runtime", "minimal")
+
+
+def server_script(prefix: str, commands: List[str], server_args: Optional[List[str]] = None) -> str:
+    """
+    Shell script starting a throwaway valkey-server on localhost, running commands against it and stopping it.
+    Persistence is disabled so the numbers measure the server alone. Prints '#ready <ms>', the time from starting the
+    server until it answers PING.
+    :param prefix: valkey install prefix in the image.
+    :param commands: shell commands run while the server is up.
+    :param server_args: extra valkey-server arguments, e.g. --loadmodule.
+    :return:
+    """
+    args = ["--port", str(BENCH_PORT), "--save", "", "--appendonly", "no", "--daemonize", "yes", "--dir", "/tmp",
+            "--pidfile", "/tmp/valkey-bench.pid", "--logfile", "/tmp/valkey-bench.log"] + (server_args or [])
+    body = "\n".join(commands)
+    return f"""
+set -e
+BIN={prefix}/bin
+started=$(date +%s%N)
+$BIN/valkey-server {shlex.join(args)}
+i=0
+until $BIN/valkey-cli -p {BENCH_PORT} ping >/dev/null 2>&1; do
+    i=$((i + 1)); [ $i -lt 1000 ] || {{ cat /tmp/valkey-bench.log; exit 1; }}; sleep 0.01
+done
+echo "{READY_MARKER}$(( ($(date +%s%N) - started) / 1000000 ))"
+{body}
+$BIN/valkey-cli -p {BENCH_PORT} shutdown nosave >/dev/null 2>&1 || true
+"""
+
+
+def benchmark_command(suite: BenchmarkSuiteConfig) -> str:
+    args = ["-p", str(BENCH_PORT), "--csv", "-n", str(suite.Requests), "-c", str(suite.Clients),
+            "-P", str(suite.Pipeline), "-d", str(suite.DataSize), "-t", ",".join(suite.Tests)]
+    return "$BIN/valkey-benchmark " + shlex.join(args)
+
+
+def parse_csv(output: str, by_section: bool = False) -> Dict[str, List[Dict[str, float]]]:
+    """
+    Parse valkey-benchmark --csv output, split into sections by '#suite <name>' marker lines.
+    :param output:
+    :param by_section: key rows by section name alone, for sections running a single custom command whose CSV
+        test name is the whole command line.
+    :return: {suite/test: [{"rps": .., "p99_latency_ms": .., ...} per run]}
+    """
+    samples: Dict[str, List[Dict[str, float]]] = {}
+    suite = ""
+    header: Optional[List[str]] = None
+    for line in output.splitlines():
+        if line.startswith(SUITE_MARKER):
+            suite = line[len(SUITE_MARKER):].strip()
+            header = None
+            continue
+        if not line.startswith('"'):
+            continue
+
+        row = next(csv.reader([line]))
+        if row[0] == "test":
+            header = row
+            continue
+        if header is None:
+            continue
+
+        values = {}
+        for key, value in zip(header[1:], row[1:]):
+            try:
+                values[key] = float(value)
+            except ValueError:
+                pass
+        samples.setdefault(suite if by_section else f"{suite}/{row[0]}", []).append(values)
+
+    return samples
+
+
+def parse_ready(output: str) -> List[float]:
+    """
+    Startup times in milliseconds printed by server_script, in order.
+    :param output:
+    :return:
+    """
+    return [float(line[len(READY_MARKER):]) for line in output.splitlines() if line.startswith(READY_MARKER)]
+
+
+def summarize(samples: Dict[str, List[Dict[str, float]]]) -> Dict[str, Dict[str, float]]:
+    """
+    Median of every metric over the runs of each test.
+    :param samples:
+    :return:
+    """
+    summary = {}
+    for name, runs in samples.items():
+        keys = set().union(*runs)
+        summary[name] = {key: statistics.median(run[key] for run in runs if key in run) for key in sorted(keys)}
+        summary[name]["runs"] = len(runs)
+    return summary
+
+
+def require_shell(image: str, labels: Dict[str, str]):
+    """
+    Reject minimal runtime images: the benchmarks start valkey-server through sh, which they do not contain.
+    :param image:
+    :param labels: labels of image.
+    :return:
+    """
+    key, value = MINIMAL_LABEL
+    if labels.get(key) == value:
+        raise RuntimeError(f"{image} is a minimal image without a shell and cannot be benchmarked; benchmark the "
+                           f"regular runtime image built from the same core and modules instead.")
+
+
+def run_benchmark(config: BuildSpec, image: str) -> Dict[str, Any]:
+    """
+    Run the Benchmark suites from the spec against a server started from image.
+    Server and valkey-benchmark both run inside one `buildah run` of a working container from the image.
+    :param config:
+    :param image:
+    :return: {"labels": image labels, "results": {suite/test: median metrics}}
+    """
+    bench = config.Benchmark
+    commands = []
+    for suite in bench.Suites:
+        for _ in range(bench.Repeat):
+            commands.append(f"echo {shlex.quote(SUITE_MARKER + suite.Name)}")
+            commands.append(benchmark_command(suite))
+
+    container_name = image.rsplit("/", 1)[-1].replace(":", "-") + "-bench"
+    with BuildahContainer(base_image=image, image_name=container_name, config=config, cache_prefix="") as container:
+        labels = container.image_labels(image)
+        require_shell(image, labels)
+        start = time.time()
+        output = container.run_get_output(["sh", "-c", server_script(config.Valkey.Prefix, commands)])
+        console.print(f"[dim]Benchmark finished in {time.time() - start:.1f}s[/dim]")
+
+    results = summarize(parse_csv(output))
+    if not results:
+        raise RuntimeError(f"valkey-benchmark produced no results:\n{output[-2000:]}")
+
+    return {"labels": labels, "results": results}
+
+
+def results_path(config: BuildSpec, image_name: str, image_tag: str) -> Path:
+    return Path(config.Benchmark.ResultsDirectory) / image_name / f"{image_tag}.json"
+
+
+def baseline_path(config: BuildSpec, image_name: str) -> Path:
+    return Path(config.Benchmark.ResultsDirectory) / image_name / "baseline.json"
+
+
+def write_results(path: Path, image: str, config: BuildSpec, run: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Store results with the image, valkey version and build flags they were measured with.
+    :param path:
+    :param image:
+    :param config:
+    :param run: output of run_benchmark.
+    :return: the stored document.
+    """
+    document = {
+        "image": image,
+        "measured_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "version": config.Valkey.Version,
+        "flags": config.Valkey.Build.Flags,
+        "labels": run["labels"],
+        "suites": [suite.model_dump() for suite in config.Benchmark.Suites],
+        "repeat": config.Benchmark.Repeat,
+        "results": run["results"],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+    return document
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any], config: BuildSpec) -> List[str]:
+    """
+    Print current results against the baseline and list the tests that regressed beyond the thresholds.
+    Tests missing from either side are shown but not judged.
+    :param current:
+    :param baseline:
+    :param config:
+    :return: descriptions of regressions; empty if none.
+    """
+    threshold = config.Benchmark.Threshold
+    regressions = []
+
+    table = Table(title=f"{current['image']} vs baseline {baseline.get('image', '')}")
+    for column in ["Test", "Req/s", "Baseline", "Δ", "p99 (ms)", "Baseline", "Δ", "Status"]:
+        table.add_column(column, justify="left" if column in ("Test", "Status") else "right")
+
+    def change(new: Optional[float], old: Optional[float]) -> Tuple[Optional[float], str]:
+        if new is None or not old:
+            return None, "-"
+        delta = (new - old) / old * 100
+        return delta, f"{delta:+.1f}%"
+
+    for name, metrics in current["results"].items():
+        base = baseline.get("results", {}).get(name, {})
+        rps, base_rps = metrics.get("rps"), base.get("rps")
+        p99, base_p99 = metrics.get("p99_latency_ms"), base.get("p99_latency_ms")
+        rps_delta, rps_text = change(rps, base_rps)
+        p99_delta, p99_text = change(p99, base_p99)
+
+        status = "[green]ok[/green]" if base else "[dim]new[/dim]"
+        if rps_delta is not None and -rps_delta > threshold.Throughput:
+            regressions.append(f"{name}: throughput {rps_text} (limit -{threshold.Throughput}%)")
+            status = "[bold red]regressed[/bold red]"
+        if p99_delta is not None and p99_delta > threshold.P99Latency:
+            regressions.append(f"{name}: p99 latency {p99_text} (limit +{threshold.P99Latency}%)")
+            status = "[bold red]regressed[/bold red]"
+
+        def fmt(value: Optional[float], digits: int) -> str:
+            return f"{value:.{digits}f}" if value is not None else "-"
+
+        table.add_row(name, fmt(rps, 0), fmt(base_rps, 0), rps_text, fmt(p99, 3), fmt(base_p99, 3), p99_text, status)
+
+    console.print(table)
+    return regressions
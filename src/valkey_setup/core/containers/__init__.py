@@ -1,3 +1,18 @@
-from .buildah import BuildahContainer, prune_cache_images
+from .buildah import BuildahContainer, prune_cache_images, layer_hash
+from .async_buildah import AsyncBuildah, AsyncBuildahContainer, AsyncCommandError
 from .builder_base import BaseBuilder, BaseRuntime
-from .distro import init_base_distro
\ No newline at end of file
+from .distro import init_base_distro
+from .distro_base import BaseDistro
+from .image_index import ImageIndex, normalize_image_name, parse_image_list
+from .compiler_cache import CompilerCache, Toolchain
+from .cache_usage import CacheUsage
+from .cache_gc import gc_cache_images, parse_size, parse_duration
+from .cache_transfer import export_cache_images, import_cache_images
+from .variants import X86_64_LEVELS, check_march, variant_tag, march_env, with_march
+from .image_analysis import analyze_image, print_image_analysis, write_image_analysis, format_size
+from .debloat import debloat_script
+from .minimal import minimal_root_script, MINIMAL_ROOT
+from .module_manifest import MANIFEST_LABEL, manifest_label, read_manifest
+from .publish import push_image, compression_args
+from .reproducible import source_date_epoch, reproducible_env, reproducible_commit_args, reproducible_copy_args
+from .debuginfo import split_debuginfo_script, commit_debuginfo_image, debuginfo_tag
@@ -0,0 +1,225 @@
+import asyncio
+import concurrent.futures
+import os
+import shutil
+import signal
+from typing import Any, List, Optional, Dict, Set, Callable
+
+import sh
+from rich.console import Console
+from rich.markup import escape
+
+from .buildah import BuildahContainer
+from ..spec import BuildSpec
+from ..tracing import tracer
+
+console = Console()
+
+PREFIX_STYLES = ["cyan", "magenta", "green", "yellow", "blue", "bright_cyan", "bright_magenta", "bright_green"]
+
+
+class AsyncCommandError(sh.ErrorReturnCode):
+    def __init__(self, args: List[str], exit_code: int, stderr: str):
+        """
+        Failed buildah call. An sh.ErrorReturnCode, so BuildahContainer handles it like a failed sh.Command.
+        :param args:
+        :param exit_code:
+        :param stderr:
+        """
+        self.exit_code = exit_code
+        super().__init__(f"buildah {' '.join(args)}", b"", stderr.encode('utf-8'))
+
+
+class AsyncBuildah:
+    def __init__(self, buildah_path: str, max_concurrency: int = 4):
+        """
+        Runs buildah as asyncio subprocesses.
+        :param buildah_path:
+        :param max_concurrency: maximum number of buildah processes running at the same time.
+        """
+        if max_concurrency < 1:
+            raise RuntimeError("max_concurrency must be at least 1")
+
+        path = shutil.which(buildah_path)
+        if path is None:
+            raise RuntimeError(f"Buildah executable not found at {buildah_path}")
+
+        self.path = path
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._styles: Dict[str, str] = {}
+        # Working containers not yet removed, cleaned up by close()
+        self.containers: Set[str] = set()
+
+    def _style(self, prefix: str) -> str:
+        return self._styles.setdefault(prefix, PREFIX_STYLES[len(self._styles) % len(PREFIX_STYLES)])
+
+    def print_line(self, prefix: str, line: str, err: bool = False):
+        if prefix:
+            line = f"[{self._style(prefix)}]{escape(prefix)} |[/] {escape(line)}"
+        else:
+            line = escape(line)
+        console.print(f"[red]{line}[/red]" if err else line, highlight=False, soft_wrap=True)
+
+    async def _pump(self, stream: asyncio.StreamReader, lines: List[str], prefix: str, echo: bool, err: bool):
+        while True:
+            raw = await stream.readline()
+            if not raw:
+                return
+            line = raw.decode('utf-8', errors="replace").rstrip("\n")
+            lines.append(line)
+            if echo:
+                self.print_line(prefix, line, err)
+
+    async def __call__(self, *args: str, prefix: str = "", echo: bool = False) -> str:
+        """
+        Run buildah with args once a concurrency slot is free.
+        Output lines are collected and, with echo, printed as they arrive prefixed with prefix so
+        concurrent tasks stay readable. The process is killed if the calling task is cancelled.
+        :param args:
+        :param prefix: label of the task, e.g. the working container.
+        :param echo: stream output to the console.
+        :return: stdout.
+        :raises AsyncCommandError: on a non-zero exit code.
+        """
+        async with self._semaphore:
+            name = f"buildah {args[0]}" if args else "buildah"
+            with tracer.span(name, "subprocess", detail=" ".join(str(a) for a in args[1:])[:200]):
+                # Own process group, so cancelling also kills what buildah started (e.g. the command of a run)
+                process = await asyncio.create_subprocess_exec(self.path, *args, stdout=asyncio.subprocess.PIPE,
+                                                               stderr=asyncio.subprocess.PIPE,
+                                                               start_new_session=True)
+                stdout: List[str] = []
+                stderr: List[str] = []
+                try:
+                    await asyncio.gather(self._pump(process.stdout, stdout, prefix, echo, False),
+                                         self._pump(process.stderr, stderr, prefix, echo, True))
+                    exit_code = await process.wait()
+                except asyncio.CancelledError:
+                    if process.returncode is None:
+                        try:
+                            os.killpg(process.pid, signal.SIGKILL)
+                        except ProcessLookupError:
+                            pass
+                    # Read the pipes to their end so the subprocess transport is closed
+                    await process.communicate()
+                    raise
+
+        if exit_code != 0:
+            raise AsyncCommandError(list(args), exit_code, "\n".join(stderr))
+
+        return "\n".join(stdout)
+
+    async def close(self):
+        """
+        Remove working containers left behind by cancelled or failed tasks.
+        :return:
+        """
+        for name in list(self.containers):
+            try:
+                await self("rm", name)
+            except AsyncCommandError:
+                pass
+            self.containers.discard(name)
+
+
+class AsyncBuildahContainer:
+    def __init__(self, base_image: str, image_name: str, config: BuildSpec, cache_prefix: str,
+                 buildah: AsyncBuildah, batch: bool = False):
+        """
+        Async front of BuildahContainer, for use as `async with`.
+        Every method of BuildahContainer (run_cached, run, configure, commit, the copy helpers, ...) is available
+        as a coroutine. It runs on a worker thread and sends its buildah calls to the event loop, where buildah
+        bounds their concurrency and streams their output prefixed with image_name. Layer hashing, batching and
+        planning are those of BuildahContainer, so both build the same cache layers.
+        Cancelling the awaiting task kills the running buildah call and removes the working container.
+        :param base_image:
+        :param image_name:
+        :param config:
+        :param cache_prefix:
+        :param buildah: shared executor bounding the number of concurrent buildah processes.
+        :param batch: see BuildahContainer.
+        """
+        self.image_name = image_name
+        self.buildah = buildah
+        self.container = BuildahContainer(base_image, image_name, config, cache_prefix, batch=batch,
+                                          buildah_cmd=self._command)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._calls: Set[concurrent.futures.Future] = set()
+        self._cancelled = False
+
+    def _command(self, *args: Any, _out: Any = None, _err: Any = None) -> str:
+        """
+        Run buildah from the worker thread on the event loop and wait for the result.
+        :param args:
+        :param _out: stream output, like sh.Command.
+        :param _err:
+        :return: stdout.
+        """
+        if self._cancelled:
+            raise concurrent.futures.CancelledError()
+
+        echo = _out is not None or _err is not None
+        call = asyncio.run_coroutine_threadsafe(
+            self.buildah(*[str(arg) for arg in args], prefix=self.image_name, echo=echo), self._loop)
+        self._calls.add(call)
+        if self._cancelled:
+            # Cancelled while the call was being scheduled
+            call.cancel()
+        try:
+            return call.result()
+        finally:
+            self._calls.discard(call)
+
+    async def _call(self, method: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        worker = asyncio.ensure_future(asyncio.to_thread(method, *args, **kwargs))
+        try:
+            return await asyncio.shield(worker)
+        except asyncio.CancelledError:
+            # Stop the worker at its current or next buildah call before the container is removed
+            self._cancelled = True
+            for call in list(self._calls):
+                call.cancel()
+            await asyncio.wait([worker])
+            raise
+
+    def __getattr__(self, name: str):
+        # Only reached for names not set on self
+        method = getattr(self.container, name, None) if not name.startswith("_") and name != "container" else None
+        if not callable(method):
+            raise AttributeError(f"{type(self).__name__} has no method '{name}'")
+
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return await self._call(method, *args, **kwargs)
+
+        call.__doc__ = method.__doc__
+        return call
+
+    async def __aenter__(self):
+        self._loop = asyncio.get_running_loop()
+        self.buildah.containers.add(self.image_name)
+        try:
+            await self._call(self.container.__enter__)
+        except BaseException:
+            await asyncio.shield(self._remove())
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            try:
+                # Runs queued steps, then removes the container
+                await self._call(self.container.__exit__, None, None, None)
+                return
+            except asyncio.CancelledError:
+                pass
+
+        # Shielded so a cancelled task still removes its container
+        await asyncio.shield(self._remove())
+
+    async def _remove(self):
+        try:
+            await self.buildah("rm", self.image_name, prefix=self.image_name)
+        except AsyncCommandError:
+            pass
+        self.buildah.containers.discard(self.image_name)
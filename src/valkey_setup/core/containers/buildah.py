@@ -1,13 +1,21 @@
 import hashlib
 import json
+import shlex
 import sys
 from pathlib import Path
-from typing import Any, List, Optional, Dict, Tuple
+from typing import Any, List, Optional, Dict, Tuple, Callable, Union
 
 import sh
 from rich.console import Console
 
+from .cache_gc import list_images, matches_cache_prefix, remove_images
+from .cache_usage import CacheUsage
+from .image_index import ImageIndex
+from .reproducible import reproducible_commit_args, reproducible_copy_args
+from ..pipeline.output import bound_stream
+from ..planning import planner
 from ..spec import BuildSpec
+from ..tracing import tracer, TracedCommand
 
 console = Console()
 
@@ -20,33 +28,17 @@ def prune_cache_images(buildah_path: str, cache_prefix: str):
     except sh.CommandNotFound:
         raise RuntimeError(f"Buildah executable not found at {buildah_path}")
 
-    try:
-        output = buildah_cmd("images", "--json")
-    except sh.ErrorReturnCode:
-        console.print("[red]Failed to list images.[/red]")
-        return
-
-    try:
-        images_list = json.loads(output)
-    except json.JSONDecodeError:
-        console.print("[red]Failed to parse Buildah output.[/red]")
+    images_list = list_images(buildah_cmd)
+    if images_list is None:
         return
 
     targets = []
 
-    if images_list:
-        for img_data in images_list:
-            # The 'names' field is a list of strings like "localhost/my-image:tag"
-            # Some images (dangling) might not have names, so we check existence
-            names = img_data.get("names", [])
-            if not names:
-                continue
-
-            for name in names:
-                # Buildah sometimes adds 'localhost/' prefix automatically
-                # We check if the name contains our cache prefix
-                if cache_prefix in name:
-                    targets.append(name)
+    for img_data in images_list:
+        # Some images (dangling) might not have names
+        for name in img_data.get("names") or []:
+            if matches_cache_prefix(name, cache_prefix):
+                targets.append(name)
 
     if not targets:
         console.print(f"[yellow]No cache layers found for prefix '{cache_prefix}'[/yellow]")
@@ -54,42 +46,243 @@ def prune_cache_images(buildah_path: str, cache_prefix: str):
 
     console.print(f"[bold red]Found {len(targets)} cache layers to remove...[/bold red]")
 
-    for img in targets:
-        try:
-            console.print(f" -> Deleting {img}")
-            buildah_cmd("rmi", img)
-        except sh.ErrorReturnCode as e:
-            console.print(f"[dim]Failed to remove {img} (might be in use or dependent): {e}[/dim]")
+    removed = remove_images(buildah_cmd, targets)
 
-    for tag in targets:
-        try:
-            console.print(f" -> Deleting {tag}")
-            buildah_cmd("rmi", tag)
-        except sh.ErrorReturnCode as e:
-            # Often images are deleted in a cascade; ignore 'image not known' errors
-            if "image not known" not in str(e):
-                console.print(f"[dim]Warning: {e}[/dim]")
+    console.print(f"[green]Removed {len(removed)}/{len(targets)} cache layers.[/green]")
+
+
+def hash_host_path(src: Path) -> str:
+    """
+    Content digest of a host file or directory.
+    Covers relative paths, file modes, symlink targets and file contents, but not timestamps or ownership.
+    :param src:
+    :return:
+    """
+    hasher = hashlib.sha256()
+
+    def add_entry(path: Path, rel: str):
+        st = path.lstat()
+        hasher.update(f"{rel}\0{st.st_mode:o}\0".encode('utf-8'))
+        if path.is_symlink():
+            hasher.update(str(path.readlink()).encode('utf-8'))
+        elif path.is_file():
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    hasher.update(chunk)
+        hasher.update(b"\0")
+
+    add_entry(src, ".")
+    if src.is_dir() and not src.is_symlink():
+        for path in sorted(src.rglob("*")):
+            add_entry(path, path.relative_to(src).as_posix())
+
+    return hasher.hexdigest()
+
+
+def layer_hash(current_image: str, layer_steps: List[Any], inputs: List[Any]) -> str:
+    """
+    Cache key of a layer: the image it is built on, the uncached steps applied since and the step inputs.
+    :param current_image:
+    :param layer_steps:
+    :param inputs:
+    :return:
+    """
+    hasher = hashlib.sha256()
+
+    hasher.update(current_image.encode('utf-8'))  # Add current image for chain integrity
+
+    if layer_steps:
+        # Uncached steps applied since current_image end up in the committed layer too
+        hasher.update(json.dumps(layer_steps, sort_keys=True).encode('utf-8'))
+
+    for inpt in inputs:
+        if isinstance(inpt, dict):
+            # Sort keys to ensure {'a':1, 'b':2} always hashes the same as {'b':2, 'a':1}
+            s = json.dumps(inpt, sort_keys=True)
+        else:
+            s = str(inpt)
+        hasher.update(s.encode('utf-8'))
+
+    return hasher.hexdigest()[:12]
 
 
 class BuildahContainer:
-    def __init__(self, base_image: str, image_name: str, config: BuildSpec, cache_prefix: str):
+    def __init__(self, base_image: str, image_name: str, config: BuildSpec, cache_prefix: str,
+                 batch: bool = False, buildah_cmd: Optional[Callable[..., Any]] = None):
+        """
+        :param base_image:
+        :param image_name:
+        :param config:
+        :param cache_prefix:
+        :param batch: queue consecutive `run` calls and execute them as one script in a single `buildah run`.
+            The queue is flushed before any other step that reads or writes the container (cached runs, copies,
+            commits) so the order of operations is preserved.
+        :param buildah_cmd: runs buildah like sh.Command: returns stdout, raises sh.ErrorReturnCode and streams
+            output when given _out/_err. Defaults to the Buildah.Path executable.
+        """
         self.base_image = base_image
         self.current_image = base_image  # Image currently being worked on
         self.image_name = image_name
         self.config = config
         self.cache_prefix = cache_prefix
 
-        try:
-            self._buildah_cmd = sh.Command(config.Buildah.Path)
-        except sh.CommandNotFound:
-            raise RuntimeError(f"Buildah executable not found at {config.Buildah.Path}")
+        if buildah_cmd is not None:
+            self._buildah_cmd = buildah_cmd
+        else:
+            try:
+                self._buildah_cmd = TracedCommand(sh.Command(config.Buildah.Path), tracer)
+            except sh.CommandNotFound:
+                raise RuntimeError(f"Buildah executable not found at {config.Buildah.Path}")
+
+        self.image_index = ImageIndex(self._buildah_cmd)
+        self.cache_usage = CacheUsage(Path(config.Cache.UsageFile))
+        self.batch = batch
+        self._queue: List[Tuple[List[str], Optional[Dict[str, str]]]] = []
+
+        # Uncached steps applied on top of current_image: descriptions feed the next layer hash,
+        # actions are replayed if the container has to be re-created from current_image.
+        self._layer_steps: List[Any] = []
+        self._replay: List[Callable[[], None]] = []
 
     def __enter__(self):
         self._create_container(self.current_image)
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if exc_type is None:
+                self._flush()
+        finally:
+            self._queue = []
+            self._cleanup()
+
+    def _flush(self):
+        """
+        Execute queued `run` calls as one shell script.
+        Each command reports its position and exit code on failure and aborts the remaining commands.
+        :return:
+        """
+        if not self._queue or planner.enabled:
+            self._queue = []
+            return
+
+        steps = self._queue
+        self._queue = []
+
+        if len(steps) == 1:
+            self._run(*steps[0])
+            return
+
+        script = []
+        for index, (command, env) in enumerate(steps, start=1):
+            line = shlex.join(command)
+            if env:
+                line = shlex.join(["env"] + [f"{k}={v}" for k, v in env.items()]) + " " + line
+
+            message = shlex.quote(f"Batched step {index}/{len(steps)} failed: {shlex.join(command)}")
+            script.append(f"{line} || {{ rc=$?; echo {message} \"(exit $rc)\" >&2; exit $rc; }}")
+
+        console.print(f"[dim]buildah run {self.image_name} -- (batch of {len(steps)} commands)[/dim]")
+        for command, _ in steps:
+            console.print(f"[dim]  {' '.join(command)}[/dim]")
+
+        def execute():
+            self._buildah_cmd("run", self.image_name, "--", "sh", "-c", "\n".join(script),
+                              _out=bound_stream(sys.stdout), _err=bound_stream(sys.stderr))
+
+        try:
+            with tracer.span("run (batch)", image=self.image_name,
+                             detail="; ".join(" ".join(command) for command, _ in steps)):
+                execute()
+        except sh.ErrorReturnCode as e:
+            console.print(f"[bold red]Batched run failed with exit code {e.exit_code}[/bold red]")
+            raise
+
+        self._replay.append(execute)
+
+    def _set_layer(self, image: str):
+        """
+        Make image the new base of the layer chain.
+        :param image:
+        :return:
+        """
+        self.current_image = image
+        self._layer_steps = []
+        self._replay = []
+
+    def _use_cached_layer(self, cache_tag: str) -> bool:
+        """
+        Re-create the working container from cache_tag if it exists.
+        Queued run steps are dropped since their effect is part of the cached layer.
+        :param cache_tag:
+        :return: True on cache hit.
+        """
+        if not self._check_image_exists(cache_tag):
+            return False
+
+        console.print(f"[bold green] Using cached layer {cache_tag.rsplit(':', 1)[-1]}[/bold green]")
+
         self._cleanup()
+        try:
+            self._create_container(cache_tag)
+        except sh.ErrorReturnCode:
+            # Index is stale (layer removed since it was loaded); restore the container and rebuild the layer
+            console.print(f"[yellow]Cached layer {cache_tag} no longer available, rebuilding[/yellow]")
+            self.image_index.remove(cache_tag)
+            self._create_container(self.current_image)
+
+            replay = self._replay
+            self._replay = []
+            for action in replay:
+                action()
+            return False
+
+        self._queue = []
+        self._set_layer(cache_tag)
+        self.cache_usage.touch(cache_tag)
+        return True
+
+    def _cached_step(self, hash_inputs: List[Any], step: Callable[[], None], operation: str, detail: str = "",
+                     squash: bool = False):
+        """
+        Run step and commit the result as a cache layer, or reuse the layer if it already exists.
+        :param hash_inputs: inputs identifying the step.
+        :param step: performs the step on the working container.
+        :param operation: name of the step for tracing.
+        :param detail: description of the step for tracing.
+        :param squash: commit the whole container as a single layer and continue from it.
+        :return:
+        """
+        layer_hash = self._calculate_hash(hash_inputs)
+        cache_tag = self.cache_prefix + ":" + layer_hash
+
+        if planner.enabled:
+            # Dry run: a missing layer would be built and committed under the same tag
+            status = "hit" if self._check_image_exists(cache_tag) else "miss"
+            planner.record(self.image_name, operation, status, detail, cache_tag)
+            if status == "miss":
+                # Later copies from this layer (e.g. a staging image) can then resolve it
+                planner.mark_committed(cache_tag)
+            self._set_layer(cache_tag)
+            return
+
+        with tracer.span(operation, image=self.image_name, hash=layer_hash, detail=detail) as span:
+            if self._use_cached_layer(cache_tag):
+                span["cache"] = "hit"
+                return
+
+            span["cache"] = "miss"
+            self._flush()
+
+            step()
+
+            self._commit(cache_tag, squash=squash)
+            if squash:
+                # The working container still stacks the unsquashed layers
+                self._cleanup()
+                self._create_container(cache_tag)
+
+            self._set_layer(cache_tag)
 
     def _create_container(self, from_image: str):
         """
@@ -97,6 +290,9 @@ class BuildahContainer:
         :param from_image:
         :return:
         """
+        if planner.enabled:
+            return
+
         console.print(f"[dim]Spawning container image from {from_image}[/dim]")
 
         try:
@@ -113,6 +309,9 @@ class BuildahContainer:
         Remove image_name
         :return:
         """
+        if planner.enabled:
+            return
+
         try:
             self._buildah_cmd("rm", self.image_name)
         except Exception:
@@ -121,14 +320,12 @@ class BuildahContainer:
     def _check_image_exists(self, tag: str) -> bool:
         """
         Return True if image with tag exists.
+        Looks the tag up in the local image index, which is loaded once and kept current on commit.
         :param tag:
         :return:
         """
-        try:
-            output = self._buildah_cmd("images", "-q", tag)  # returns ID if found else empty.
-            return bool(output.strip())
-        except sh.ErrorReturnCode:
-            return False
+        with tracer.span("image_check", image=self.image_name, detail=tag):
+            return self.image_index.exists(tag)
 
     def _calculate_hash(self, inputs: List[Any]) -> str:
         """
@@ -136,66 +333,77 @@ class BuildahContainer:
         :param inputs:
         :return:
         """
-        hasher = hashlib.sha256()
-
-        hasher.update(self.current_image.encode('utf-8'))  # Add current image for chain integrity
-
-        for inpt in inputs:
-            if isinstance(inpt, dict):
-                # Sort keys to ensure {'a':1, 'b':2} always hashes the same as {'b':2, 'a':1}
-                s = json.dumps(inpt, sort_keys=True)
-            else:
-                s = str(inpt)
-            hasher.update(s.encode('utf-8'))
-
-        return hasher.hexdigest()[:12]
+        commit_args = reproducible_commit_args(self.config)
+        if commit_args:
+            # Layers committed with normalized timestamps differ from regular ones
+            inputs = inputs + [commit_args]
+        return layer_hash(self.current_image, self._layer_steps, inputs)
 
     def run_cached(self, command: List[str], env: Optional[Dict[str, str]] = None,
-                   extra_cache_keys: Optional[Dict[str, str]] = None):
+                   extra_cache_keys: Optional[Dict[str, str]] = None, mounts: Optional[List[Tuple[str, str]]] = None):
         """
         Executes command and caches the layer.
         Will first check if the layer cache exists.
         :param command:
         :param env:
         :param extra_cache_keys:
+        :param mounts: (host path, container path) bind mounts for the command. Not part of the layer hash.
         :return:
         """
 
         hash_inputs = [command, env, extra_cache_keys]
-        layer_hash = self._calculate_hash(hash_inputs)
-        cache_tag = self.cache_prefix + ":" + layer_hash
-
-        if self._check_image_exists(cache_tag):
-            console.print(f"[bold green] Using cached layer {layer_hash}[/bold green]")
-
-            self._cleanup()
-            self._create_container(cache_tag)
-
-            self.current_image = cache_tag
-            return
-
-        self.run(command, env)
-
-        self.commit(cache_tag)
-
-        self.current_image = cache_tag
+        self._cached_step(hash_inputs, lambda: self._run(command, env, mounts), "run_cached", " ".join(command))
 
     def run(self, command: List[str], env: Optional[Dict[str, str]] = None):
         """
         Executes command with no caching.
+        In batch mode the command is queued instead.
         :param command: buildah command
         :param env: environment variables for the command
         :return:
         """
-        env_args = []
+        self._layer_steps.append(["run", command, env])
+
+        if planner.enabled:
+            planner.record(self.image_name, "run", "run", " ".join(command))
+            return
+
+        if self.batch:
+            self._queue.append((command, env))
+            return
+
+        with tracer.span("run", image=self.image_name, detail=" ".join(command)):
+            self._run(command, env)
+
+    def _run(self, command: List[str], env: Optional[Dict[str, str]] = None,
+             mounts: Optional[List[Tuple[str, str]]] = None):
+        run_args = []
         if env:
             for k, v in env.items():
-                env_args.extend(["-e", f"{k}={v}"])
+                run_args.extend(["-e", f"{k}={v}"])
+
+        if mounts:
+            for host_path, container_path in mounts:
+                run_args.extend(["-v", f"{host_path}:{container_path}"])
+
+        console.print(f"[dim]buildah run {' '.join(run_args)} {self.image_name} -- {' '.join(command)}[/dim]")
 
-        console.print(f"[dim]buildah run {' '.join(env_args)} {self.image_name} -- {' '.join(command)}[/dim]")
-        self._buildah_cmd("run", *env_args, self.image_name, "--", *command, _out=sys.stdout, _err=sys.stderr)
+        def execute():
+            self._buildah_cmd("run", *run_args, self.image_name, "--", *command,
+                              _out=bound_stream(sys.stdout), _err=bound_stream(sys.stderr))
+
+        execute()
+        self._replay.append(execute)
 
     def configure(self, configs: List[Tuple[str, str]]):
+        """
+        Apply `buildah config` options, e.g. ("--user", "999"), with no caching.
+        Queued run steps are executed first, otherwise they would run with the new settings.
+        :param configs: (option, value) pairs.
+        :return:
+        """
+        self._flush()
+
         args = ["config"]
 
         for config in configs:
@@ -203,16 +411,73 @@ class BuildahContainer:
 
         args.append(self.image_name)
 
+        if planner.enabled:
+            planner.record(self.image_name, "configure", "run", " ".join(args[1:-1]))
+            self._layer_steps.append(["config", configs])
+            return
+
         console.print(f"[dim]buildah {' '.join(args)}[/dim]")
-        self._buildah_cmd(*args)
+        with tracer.span("configure", image=self.image_name, detail=" ".join(args[1:-1])):
+            self._buildah_cmd(*args)
+
+        self._layer_steps.append(["config", configs])
+        self._replay.append(lambda: self._buildah_cmd(*args))
 
     def commit(self, tag: str, cmd: Optional[List[str]] = None, changes: Optional[List[str]] = None,
                squash: bool = False):
+        """
+        Commit the working container as image tag.
+        The image is committed once per layer chain, as a cache layer keyed like any other step, and tag points at
+        it. An unchanged rebuild only moves tag back to that layer, so the image ID stays the same and layers of
+        other images copied from it stay valid.
+        :param tag:
+        :param cmd: default command of the image.
+        :param changes: `buildah commit --change` instructions.
+        :param squash:
+        :return:
+        """
+        if not self.cache_prefix:
+            self._commit(tag, cmd, changes, squash)
+            return
+
+        layer_hash = self._calculate_hash([["commit", cmd, changes, squash]])
+        cache_tag = self.cache_prefix + ":" + layer_hash
+
+        if planner.enabled:
+            if self._check_image_exists(cache_tag):
+                planner.record(self.image_name, "commit", "hit", tag, cache_tag)
+                if self._resolve_image_id(tag) != self._resolve_image_id(cache_tag):
+                    # tag moves to an older image, which copies of it have not necessarily been cached from
+                    planner.mark_committed(tag)
+            else:
+                planner.record(self.image_name, "commit", "commit", tag, cache_tag)
+                planner.mark_committed(cache_tag)
+                planner.mark_committed(tag)
+            return
+
+        with tracer.span("commit", image=self.image_name, hash=layer_hash, detail=tag) as span:
+            if self._use_cached_layer(cache_tag):
+                span["cache"] = "hit"
+            else:
+                span["cache"] = "miss"
+                self._commit(cache_tag, cmd, changes, squash)
+                self._set_layer(cache_tag)
+
+            self._tag(cache_tag, tag)
+
+        self.cache_usage.touch(tag, parent=cache_tag)
+
+    def _commit(self, tag: str, cmd: Optional[List[str]] = None, changes: Optional[List[str]] = None,
+                squash: bool = False):
+        self._flush()
+
         args = ["commit"]
 
         if squash:
             args.append("--squash")
 
+        args.extend(reproducible_commit_args(self.config))
+
         if cmd:
             args.extend(["--cmd", json.dumps(cmd)])
 
@@ -223,13 +488,41 @@ class BuildahContainer:
         args.extend([self.image_name, tag])
 
         console.print(f"[dim]buildah {' '.join(args)}[/dim]")
-        self._buildah_cmd(*args)
+        with tracer.span("commit", image=self.image_name, detail=tag):
+            output = self._buildah_cmd(*args)
+
+        # buildah prints the new image ID as the last line
+        lines = str(output).strip().splitlines()
+        self.image_index.add(tag, lines[-1].strip() if lines else "")
+        self.cache_usage.touch(tag, parent=self.current_image)
 
-    def run_get_output(self, command: List[str]) -> str:
+    def _tag(self, image: str, tag: str):
+        """
+        Add tag to a local image, moving it away from the image it pointed at before.
+        :param image:
+        :param tag:
+        :return:
+        """
+        console.print(f"[dim]buildah tag {image} {tag}[/dim]")
+        self._buildah_cmd("tag", image, tag)
+        self.image_index.add(tag, self._resolve_image_id(image) or "")
+
+    def run_get_output(self, command: List[str], mounts: Optional[List[Tuple[str, str]]] = None) -> str:
         """
         Runs command and returns stdout as a string.
+        :param command:
+        :param mounts: (host path, container path) bind mounts for this run only.
         """
-        result = self._buildah_cmd("run", self.image_name, "--", *command)
+        if planner.enabled:
+            return ""
+
+        self._flush()
+
+        run_args = []
+        for host_path, container_path in mounts or []:
+            run_args.extend(["-v", f"{host_path}:{container_path}"])
+
+        result = self._buildah_cmd("run", *run_args, self.image_name, "--", *command)
 
         # Case A: _buildah_cmd returned the output string directly
         if isinstance(result, str):
@@ -243,23 +536,163 @@ class BuildahContainer:
         # Fallback: Try converting whatever it is to a string
         return str(result).strip()
 
-    def copy_host_container(self, src: Path, dest: str):
+    def squash_layers(self, extra_cache_keys: Optional[Dict[str, str]] = None):
         """
-        Copies a file or directory from the host into the container.
+        Flatten the container into a single cache layer and continue from it.
+        Files deleted by earlier steps are dropped instead of shipping in lower layers under whiteouts, and the
+        layers added afterwards stack on one base layer that stays the same as long as its inputs do.
+        :param extra_cache_keys:
+        :return:
         """
-        if not src.exists():
+        self._cached_step([["squash"], extra_cache_keys], lambda: None, "squash", "squash layers", squash=True)
+
+    def copy_host_container(self, src: Path, dest: str, extra_cache_keys: Optional[Dict[str, str]] = None,
+                            extract: bool = False, chown: str = "", chmod: str = ""):
+        """
+        Copies a file or directory from the host into the container and caches the layer.
+        The layer hash covers the content and modes of the source, so only a changed source invalidates it.
+        :param src:
+        :param dest:
+        :param extra_cache_keys:
+        :param extract: extract src into dest if it is a tar archive (`buildah add`).
+        :param chown: owner of the copied files as uid:gid; root if empty.
+        :param chmod: mode of the copied files, e.g. 755; the mode of src if empty.
+        :return:
+        """
+        if not src.exists() and not planner.enabled:
             raise FileNotFoundError(f"Source file {src} does not exist.")
 
-        console.print(f"[dim]buildah copy {self.image_name} {str(src)} {dest}[/dim]")
-        self._buildah_cmd("copy", self.image_name, str(src), dest)
+        action = "add" if extract else "copy"
+        options = (["--chown", chown] if chown else []) + (["--chmod", chmod] if chmod else []) + \
+            reproducible_copy_args(self.config)
+
+        def copy():
+            console.print(f"[dim]buildah {action} {' '.join(options + [self.image_name, str(src), dest])}[/dim]")
+            self._buildah_cmd(action, *options, self.image_name, str(src), dest)
+
+        # Planning tolerates sources that are not fetched yet; their step can only miss
+        content_hash = hash_host_path(src) if src.exists() else f"missing:{src}"
+        hash_inputs = [[action, dest] + options, content_hash, extra_cache_keys]
+        self._cached_step(hash_inputs, copy, action, f"{src} {dest}")
+
+    def _resolve_image_id(self, image: str) -> Optional[str]:
+        """
+        Return the local image ID for image, reloading the image index once if it is not known.
+        When planning, images committed earlier in the plan get a placeholder since their new ID is not known yet.
+        :param image:
+        :return:
+        """
+        if planner.enabled and planner.is_pending(image):
+            return f"pending:{image}"
+
+        image_id = self.image_index.image_id(image)
+        if not image_id:
+            self.image_index.refresh()
+            image_id = self.image_index.image_id(image)
+        return image_id
+
+    def _source_image_id(self, image: str) -> str:
+        """
+        ID of an image files are copied from, pulling it if it is not local.
+        Copies are keyed on the ID rather than the name, since a tag can move to different content.
+        When planning nothing is pulled; a remote image gets a placeholder, so its copy can only miss.
+        :param image:
+        :return:
+        """
+        image_id = self._resolve_image_id(image)
+        if image_id:
+            return image_id
+
+        if planner.enabled:
+            return f"remote:{image}"
+
+        console.print(f"[dim]Image {image} not found locally, pulling it[/dim]")
+        try:
+            with tracer.span("pull", image=self.image_name, detail=image):
+                self._buildah_cmd("pull", "--quiet", image)
+        except sh.ErrorReturnCode as e:
+            raise RuntimeError(f"Image {image} is not available locally and could not be pulled: "
+                               f"{e.stderr.decode('utf-8', 'replace').strip()}") from e
+
+        image_id = self._resolve_image_id(image)
+        if not image_id:
+            raise RuntimeError(f"Image {image} was pulled but cannot be resolved to a local image ID")
+        return image_id
+
+    def image_labels(self, image: str) -> Dict[str, str]:
+        """
+        Labels of a local image.
+        :param image:
+        :return:
+        """
+        try:
+            output = self._buildah_cmd("inspect", "--type", "image", image)
+            return json.loads(str(output)).get("OCIv1", {}).get("config", {}).get("Labels") or {}
+        except (sh.ErrorReturnCode, json.JSONDecodeError):
+            return {}
+
+    def current_image_id(self) -> Optional[str]:
+        """
+        ID of the image the working container is based on, i.e. the last cached layer.
+        :return:
+        """
+        return self._resolve_image_id(self.current_image)
+
+    def _copy_args(self, src_container: str, src: Union[str, List[str]], dest: str, chown: str) -> List[str]:
+        args = ["copy", "--from", src_container] + reproducible_copy_args(self.config)
+        if chown:
+            args.extend(["--chown", chown])
+        return args + [self.image_name] + ([src] if isinstance(src, str) else src) + [dest]
 
-    def copy_container_current(self, src_container: str, src: str, dest: str):
+    def copy_container(self, src_container: str, src: Union[str, List[str]], dest: str, chown: str = ""):
         """
-        Copies a files from container to current container
+        Copies files from container to current container with no caching.
+        Later layer hashes include the image ID of src_container.
         :param src_container:
         :param src:
         :param dest:
+        :param chown: owner of the copied files as uid:gid; root if empty.
         :return:
         """
-        console.print(f"[dim]buildah copy --from {src_container} {self.image_name} {src} {dest}[/dim]")
-        self._buildah_cmd("copy", "--from", src_container, self.image_name, src, dest)
+        image_id = self._source_image_id(src_container)
+        self._layer_steps.append(["copy", src_container, image_id, src, dest] + ([chown] if chown else []))
+
+        if planner.enabled:
+            planner.record(self.image_name, "copy", "run", f"{src_container}:{src} {dest}")
+            return
+
+        args = self._copy_args(src_container, src, dest, chown)
+
+        def copy():
+            console.print(f"[dim]buildah {' '.join(args)}[/dim]")
+            self._buildah_cmd(*args)
+
+        self._flush()
+        with tracer.span("copy", image=self.image_name, cache="uncached", detail=f"{src_container}:{src} {dest}"):
+            copy()
+        self._replay.append(copy)
+
+    def copy_container_current(self, src_container: str, src: Union[str, List[str]], dest: str,
+                               extra_cache_keys: Optional[Dict[str, str]] = None, chown: str = ""):
+        """
+        Copies a files from container to current container and caches the layer.
+        The layer hash includes the image ID of src_container, so a changed source image invalidates it. Rebuilding
+        an unchanged source keeps its ID, see commit.
+        An image that is not local is pulled first.
+        :param src_container:
+        :param src: path, or paths copied together into the dest directory.
+        :param dest:
+        :param extra_cache_keys:
+        :param chown: owner of the copied files as uid:gid; root if empty.
+        :return:
+        """
+        args = self._copy_args(src_container, src, dest, chown)
+
+        def copy():
+            console.print(f"[dim]buildah {' '.join(args)}[/dim]")
+            self._buildah_cmd(*args)
+
+        image_id = self._source_image_id(src_container)
+        hash_inputs = [["copy", src_container, src, dest] + ([chown] if chown else []), image_id, extra_cache_keys]
+        sources = src if isinstance(src, str) else " ".join(src)
+        self._cached_step(hash_inputs, copy, "copy", f"{src_container}:{sources} {dest}")
@@ -1,8 +1,10 @@
 from abc import ABC, abstractmethod
+from typing import List
 
 from rich.console import Console
 
 from .buildah import BuildahContainer
+from .module_manifest import read_manifest, group_by_directory
 from ..spec import BuildSpec
 
 console = Console()
@@ -26,9 +28,16 @@ class BaseBuilder(ABC):
 
 
 class BaseRuntime(ABC):
-    def __init__(self, config: BuildSpec, src_container: BuildahContainer, ext_version: str = ''):
+    def __init__(self, config: BuildSpec, src_container: BuildahContainer, ext_version: str = '', march: str = ''):
+        """
+        :param config:
+        :param src_container: runtime container the module is installed into.
+        :param ext_version:
+        :param march: x86-64 level of the module image to install from.
+        """
         self.config = config
         self.src_container = src_container
+        self.march = march
         self._init_ext_version(ext_version)
 
     @abstractmethod
@@ -39,5 +48,34 @@ class BaseRuntime(ABC):
     def build(self):
         pass
 
+    @abstractmethod
+    def install_dependencies(self):
+        """
+        Install the runtime packages the module needs.
+        :return:
+        """
+        pass
+
+    @abstractmethod
+    def install_files(self):
+        """
+        Copy the module files from its build image.
+        :return:
+        """
+        pass
+
     def log(self, message: str, style: str = "white"):
         console.print(f"[{style}]{message}[/{style}]")
+
+    def install_module(self, source_image: str, default_files: List[str]):
+        """
+        Copy the files a module image lists in its manifest label into the same paths of the runtime container.
+        Files sharing a directory are copied in one cached step.
+        :param source_image: module build image.
+        :param default_files: files to copy if the image has no manifest, e.g. an image built before manifests.
+        :return:
+        """
+        files = read_manifest(self.src_container.image_labels(source_image)) or default_files
+        for directory, paths in group_by_directory(files).items():
+            self.log(f"[bold blue]Installing[/bold blue] {', '.join(paths)}")
+            self.src_container.copy_container_current(source_image, paths, f"{directory}/")
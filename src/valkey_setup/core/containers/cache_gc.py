@@ -0,0 +1,238 @@
+import json
+import re
+import time
+from typing import List, Optional, Dict, Any, Set
+
+import sh
+from rich.console import Console
+
+from .cache_usage import CacheUsage
+from .image_index import normalize_image_name
+
+console = Console()
+
+SIZE_UNITS = {"": 1, "b": 1, "k": 1000, "m": 1000 ** 2, "g": 1000 ** 3, "t": 1000 ** 4}
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+
+def parse_size(value: Any) -> int:
+    """
+    Parse a size in bytes. Accepts numbers and decimal units as printed by buildah, e.g. '229 MB', '50G'.
+    :param value:
+    :return:
+    """
+    if isinstance(value, (int, float)):
+        return int(value)
+
+    match = re.fullmatch(r"\s*([\d.]+)\s*([kmgt]?)i?b?\s*", str(value), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid size '{value}'")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).lower()])
+
+
+def parse_duration(value: str) -> float:
+    """
+    Parse a duration in seconds, e.g. '14d', '12h', '30m'.
+    :param value:
+    :return:
+    """
+    match = re.fullmatch(r"\s*([\d.]+)\s*([smhdw]?)\s*", value, re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid duration '{value}'")
+    return float(match.group(1)) * DURATION_UNITS[(match.group(2) or "s").lower()]
+
+
+def matches_cache_prefix(name: str, cache_prefix: str) -> bool:
+    """
+    Return True if image name lives under the cache_prefix repository namespace.
+    :param name:
+    :param cache_prefix:
+    :return:
+    """
+    repository = normalize_image_name(cache_prefix).rsplit(":", 1)[0]
+    name = normalize_image_name(name)
+    return name.startswith(repository) and name[len(repository):len(repository) + 1] in ("/", ":")
+
+
+def list_images(buildah_cmd: sh.Command) -> Optional[List[Dict[str, Any]]]:
+    try:
+        output = buildah_cmd("images", "--json")
+    except sh.ErrorReturnCode:
+        console.print("[red]Failed to list images.[/red]")
+        return None
+
+    try:
+        return json.loads(str(output)) or []
+    except json.JSONDecodeError:
+        console.print("[red]Failed to parse Buildah output.[/red]")
+        return None
+
+
+def remove_images(buildah_cmd: sh.Command, names: List[str], chunk_size: int = 100) -> List[str]:
+    """
+    Remove images with as few `buildah rmi` calls as possible.
+    A failing chunk is retried one image at a time so one busy image does not block the rest.
+    :param buildah_cmd:
+    :param names:
+    :param chunk_size:
+    :return: names that were removed.
+    """
+    removed = []
+    for start in range(0, len(names), chunk_size):
+        chunk = names[start:start + chunk_size]
+        try:
+            buildah_cmd("rmi", *chunk)
+            removed.extend(chunk)
+            continue
+        except sh.ErrorReturnCode:
+            pass
+
+        for name in chunk:
+            try:
+                buildah_cmd("rmi", name)
+                removed.append(name)
+            except sh.ErrorReturnCode as e:
+                # Already removed by the failed chunk call
+                if "image not known" in str(e.stderr):
+                    removed.append(name)
+                else:
+                    console.print(f"[dim]Failed to remove {name} (might be in use or dependent): {e}[/dim]")
+
+    return removed
+
+
+def _container_image_ids(buildah_cmd: sh.Command) -> Set[str]:
+    """
+    IDs of images used by working containers, e.g. of builds currently running.
+    :param buildah_cmd:
+    :return:
+    """
+    try:
+        containers = json.loads(str(buildah_cmd("containers", "--json"))) or []
+    except (sh.ErrorReturnCode, json.JSONDecodeError):
+        return set()
+    return {c.get("imageid", "") for c in containers}
+
+
+def gc_cache_images(buildah_path: str, cache_prefix: str, usage: CacheUsage, max_size: Optional[int] = None,
+                    max_age: Optional[float] = None, dry_run: bool = False):
+    """
+    Evict least recently used cache layers until the cache fits in max_size and no layer is older than max_age.
+    Layers that a live (non-cache) image or a working container was built on are never removed.
+    :param buildah_path:
+    :param cache_prefix:
+    :param usage: journal of last-used times and parents.
+    :param max_size: disk budget in bytes for all cache layers.
+    :param max_age: seconds since last use after which a layer is evicted.
+    :param dry_run: only report what would be removed.
+    :return:
+    """
+    if len(cache_prefix) == 0:
+        raise RuntimeError("cache_prefix is empty")
+    try:
+        buildah_cmd = sh.Command(buildah_path)
+    except sh.CommandNotFound:
+        raise RuntimeError(f"Buildah executable not found at {buildah_path}")
+
+    images_list = list_images(buildah_cmd)
+    if images_list is None:
+        return
+
+    journal = usage.load()
+    in_use = _container_image_ids(buildah_cmd)
+
+    name_to_id: Dict[str, str] = {}
+    sizes: Dict[str, int] = {}
+    created: Dict[str, float] = {}
+    cache_names: Dict[str, List[str]] = {}
+    live_names = []
+    for img_data in images_list:
+        image_id = img_data.get("id", "")
+        sizes[image_id] = parse_size(img_data.get("size", 0))
+        created[image_id] = float(img_data.get("created", 0) or 0)
+        for name in img_data.get("names") or []:
+            name = normalize_image_name(name)
+            name_to_id[name] = image_id
+            if matches_cache_prefix(name, cache_prefix):
+                cache_names.setdefault(image_id, []).append(name)
+            else:
+                live_names.append(name)
+
+    if not cache_names:
+        console.print(f"[yellow]No cache layers found for prefix '{cache_prefix}'[/yellow]")
+        return
+
+    def parent_id(image_id: str) -> Optional[str]:
+        for name in cache_names.get(image_id, []):
+            parent = journal.get(name, {}).get("parent")
+            if parent in name_to_id:
+                return name_to_id[parent]
+        return None
+
+    # Protect the ancestry of live images and working containers
+    protected = set()
+    roots = [name_to_id[name] for name in live_names] + [image_id for image_id in in_use if image_id in sizes]
+    for name in live_names:
+        parent = journal.get(name, {}).get("parent")
+        if parent in name_to_id:
+            roots.append(name_to_id[parent])
+    for image_id in roots:
+        while image_id and image_id not in protected:
+            protected.add(image_id)
+            image_id = parent_id(image_id)
+
+    # A layer is as recent as the most recently used layer built on top of it, so children are evicted first
+    last_used: Dict[str, float] = {}
+    depth: Dict[str, int] = {}
+    for image_id, names in cache_names.items():
+        used = [journal[name]["last_used"] for name in names if "last_used" in journal.get(name, {})]
+        last_used[image_id] = max(used) if used else created[image_id]
+        depth[image_id] = 0
+    for image_id in list(cache_names):
+        child_used = last_used[image_id]
+        ancestor, level = parent_id(image_id), 1
+        while ancestor in last_used:
+            last_used[ancestor] = max(last_used[ancestor], child_used)
+            depth[image_id] = max(depth[image_id], level)
+            ancestor, level = parent_id(ancestor), level + 1
+
+    # Image sizes include every parent layer; count only what each layer adds
+    own_size: Dict[str, int] = {}
+    for image_id in cache_names:
+        parent = parent_id(image_id)
+        own_size[image_id] = max(sizes[image_id] - sizes.get(parent, 0), 0) if parent else sizes[image_id]
+
+    total = sum(own_size.values())
+    now = time.time()
+    console.print(f"[bold]Cache '{cache_prefix}': {len(cache_names)} layers, ~{total / 1000 ** 2:.1f} MB, "
+                  f"{len(protected & set(cache_names))} protected[/bold]")
+
+    evict = []
+    for image_id in sorted(set(cache_names) - protected, key=lambda i: (last_used[i], -depth[i])):
+        too_old = max_age is not None and now - last_used[image_id] > max_age
+        over_budget = max_size is not None and total > max_size
+        if not too_old and not over_budget:
+            break
+        evict.append(image_id)
+        total -= own_size[image_id]
+
+    if not evict:
+        console.print("[green]Cache is within budget, nothing to remove.[/green]")
+        return
+
+    targets = [name for image_id in evict for name in cache_names[image_id]]
+    freed = sum(own_size[image_id] for image_id in evict)
+    console.print(f"[bold red]Evicting {len(evict)} cache layers (~{freed / 1000 ** 2:.1f} MB)...[/bold red]")
+    for name in targets:
+        console.print(f" -> {'Would delete' if dry_run else 'Deleting'} {name}")
+
+    if dry_run:
+        return
+
+    removed = remove_images(buildah_cmd, targets)
+
+    # Also drop journal entries of cache layers that no longer exist
+    stale = [name for name in journal if matches_cache_prefix(name, cache_prefix) and name not in name_to_id]
+    usage.forget(removed + stale)
+
+    console.print(f"[green]Removed {len(removed)}/{len(targets)} cache layers.[/green]")
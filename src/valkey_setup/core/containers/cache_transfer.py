@@ -0,0 +1,173 @@
+import json
+import tarfile
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Iterator
+
+import sh
+from rich.console import Console
+
+from .cache_gc import list_images, matches_cache_prefix
+from .cache_usage import CacheUsage
+from .image_index import normalize_image_name, ImageIndex
+
+console = Console()
+
+REF_NAME_ANNOTATION = "org.opencontainers.image.ref.name"
+# Written next to index.json; OCI tools ignore files they do not know
+PARENTS_FILE = "valkey-setup-cache.json"
+
+
+def is_archive(path: Path) -> bool:
+    return path.suffix == ".tar"
+
+
+def _buildah(buildah_path: str) -> sh.Command:
+    try:
+        return sh.Command(buildah_path)
+    except sh.CommandNotFound:
+        raise RuntimeError(f"Buildah executable not found at {buildah_path}")
+
+
+def layout_refs(layout: Path) -> List[str]:
+    """
+    Image names stored in an OCI image layout.
+    :param layout:
+    :return:
+    """
+    try:
+        with open(layout / "index.json", "r") as f:
+            manifests = json.load(f).get("manifests") or []
+    except FileNotFoundError:
+        return []
+
+    return [m["annotations"][REF_NAME_ANNOTATION] for m in manifests
+            if REF_NAME_ANNOTATION in (m.get("annotations") or {})]
+
+
+def _read_parents(layout: Path) -> Dict[str, str]:
+    try:
+        with open(layout / PARENTS_FILE, "r") as f:
+            return json.load(f).get("parents", {})
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _write_parents(layout: Path, parents: Dict[str, str]):
+    with open(layout / PARENTS_FILE, "w") as f:
+        json.dump({"parents": parents}, f, indent=1, sort_keys=True)
+
+
+@contextmanager
+def _layout_dir(path: Path, write: bool) -> Iterator[Path]:
+    """
+    Yield the OCI layout directory for path. A .tar archive is unpacked into a temporary directory and,
+    when writing, packed again afterwards.
+    :param path:
+    :param write:
+    :return:
+    """
+    if not is_archive(path):
+        if write:
+            path.mkdir(parents=True, exist_ok=True)
+        elif not (path / "index.json").exists():
+            raise FileNotFoundError(f"{path} is not an OCI image layout")
+        yield path
+        return
+
+    with tempfile.TemporaryDirectory(dir=path.parent if write else None) as tmp:
+        layout = Path(tmp)
+        if path.exists():
+            with tarfile.open(path, "r") as archive:
+                archive.extractall(layout, filter="data")
+        elif not write:
+            raise FileNotFoundError(f"{path} does not exist")
+
+        yield layout
+
+        if write:
+            tmp_path = path.with_name(path.name + ".part")
+            with tarfile.open(tmp_path, "w") as archive:
+                for entry in sorted(layout.iterdir()):
+                    archive.add(entry, arcname=entry.name)
+            tmp_path.replace(path)
+
+
+def export_cache_images(buildah_path: str, cache_prefix: str, destination: Path, usage: CacheUsage):
+    """
+    Write every cache layer under cache_prefix to an OCI image layout directory, or a .tar archive of one.
+    Layers are stored once per digest, so layers shared along a cache chain take no extra space. Images
+    already in the layout are skipped, which makes repeated exports to the same destination incremental.
+    :param buildah_path:
+    :param cache_prefix:
+    :param destination: directory, or file ending in .tar.
+    :param usage: journal providing each layer's parent, which is exported along with the images.
+    :return:
+    """
+    if len(cache_prefix) == 0:
+        raise RuntimeError("cache_prefix is empty")
+    buildah_cmd = _buildah(buildah_path)
+
+    images_list = list_images(buildah_cmd)
+    if images_list is None:
+        return
+
+    names = sorted({normalize_image_name(name) for img_data in images_list for name in img_data.get("names") or []
+                    if matches_cache_prefix(name, cache_prefix)})
+    if not names:
+        console.print(f"[yellow]No cache layers found for prefix '{cache_prefix}'[/yellow]")
+        return
+
+    journal = usage.load()
+
+    with _layout_dir(destination, write=True) as layout:
+        existing = set(layout_refs(layout))
+        pending = [name for name in names if name not in existing]
+        console.print(f"[bold]Exporting {len(pending)} cache layers to {destination} "
+                      f"({len(names) - len(pending)} already present)...[/bold]")
+
+        for index, name in enumerate(pending, start=1):
+            console.print(f"[dim]({index}/{len(pending)}) buildah push {name} oci:{layout}:{name}[/dim]")
+            buildah_cmd("push", "--quiet", name, f"oci:{layout}:{name}")
+
+        parents = _read_parents(layout)
+        for name in names:
+            parent = journal.get(name, {}).get("parent")
+            if parent:
+                parents[name] = parent
+        _write_parents(layout, parents)
+
+    console.print(f"[green]Exported {len(pending)} cache layers to {destination}.[/green]")
+
+
+def import_cache_images(buildah_path: str, source: Path, usage: CacheUsage):
+    """
+    Load cache layers from an OCI image layout directory or .tar archive written by export_cache_images.
+    Images keep their original names; names that already exist locally are skipped.
+    :param buildah_path:
+    :param source:
+    :param usage: journal the imported layers and their parents are recorded in.
+    :return:
+    """
+    buildah_cmd = _buildah(buildah_path)
+    image_index = ImageIndex(buildah_cmd)
+
+    with _layout_dir(source, write=False) as layout:
+        refs = layout_refs(layout)
+        parents = _read_parents(layout)
+
+        pending = [ref for ref in refs if not image_index.exists(ref)]
+        console.print(f"[bold]Importing {len(pending)} cache layers from {source} "
+                      f"({len(refs) - len(pending)} already present)...[/bold]")
+
+        for index, ref in enumerate(pending, start=1):
+            console.print(f"[dim]({index}/{len(pending)}) buildah pull oci:{layout}:{ref}[/dim]")
+            output = buildah_cmd("pull", "--quiet", f"oci:{layout}:{ref}")
+            lines = str(output).strip().splitlines()
+            image_id = lines[-1].strip() if lines else ""
+            # Images pulled from a layout are not reliably named after their reference
+            buildah_cmd("tag", image_id, ref)
+            usage.touch(ref, parent=parents.get(ref))
+
+    console.print(f"[green]Imported {len(pending)} cache layers from {source}.[/green]")
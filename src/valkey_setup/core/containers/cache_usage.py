@@ -0,0 +1,71 @@
+import fcntl
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from .image_index import normalize_image_name
+
+
+class CacheUsage:
+    def __init__(self, path: Path):
+        """
+        Journal of committed images: when each was last used and which image it was built on.
+        Shared between concurrent builds through a lock file.
+        :param path: JSON file on the host.
+        """
+        self.path = path
+
+    @contextmanager
+    def _locked(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_name(self.path.name + ".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f).get("images", {})
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write(self, images: Dict[str, Dict[str, Any]]):
+        tmp_path = self.path.with_name(self.path.name + f".{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"images": images}, f, indent=1, sort_keys=True)
+        tmp_path.replace(self.path)
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """
+        :return: normalized image name -> {"last_used": unix time, "parent": normalized image name}
+        """
+        with self._locked():
+            return self._read()
+
+    def touch(self, tag: str, parent: Optional[str] = None):
+        """
+        Mark tag as used now. Records parent when given.
+        :param tag:
+        :param parent: image tag was committed on top of.
+        :return:
+        """
+        with self._locked():
+            images = self._read()
+            entry = images.setdefault(normalize_image_name(tag), {})
+            entry["last_used"] = time.time()
+            if parent:
+                entry["parent"] = normalize_image_name(parent)
+            self._write(images)
+
+    def forget(self, tags):
+        with self._locked():
+            images = self._read()
+            for tag in tags:
+                images.pop(normalize_image_name(tag), None)
+            self._write(images)
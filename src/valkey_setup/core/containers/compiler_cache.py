@@ -0,0 +1,81 @@
+from enum import StrEnum
+from pathlib import Path
+from typing import List, Tuple, Optional, Dict
+
+from ..spec import BuildSpec
+
+
+class Toolchain(StrEnum):
+    MAKE = "make"
+    CMAKE = "cmake"
+    CARGO = "cargo"
+
+
+class CompilerCache:
+    CCACHE_DIR = "/var/cache/ccache"
+    CARGO_HOME = "/var/cache/cargo/home"
+    CARGO_TARGET_DIR = "/var/cache/cargo/target"
+
+    def __init__(self, config: BuildSpec, toolchain: Toolchain, scope: str = ""):
+        """
+        :param config:
+        :param toolchain:
+        :param scope: build the cargo target directory belongs to, e.g. <module>-<version>-<march>. Builds with
+            different flags must not share a target directory; the cargo registry and ccache are shared.
+        """
+        self.config = config.CompilerCache
+        self.toolchain = toolchain
+        self.scope = scope
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.Enabled
+
+    def packages(self) -> List[str]:
+        """
+        Extra build dependencies needed by the compiler cache.
+        :return:
+        """
+        if not self.enabled or self.toolchain == Toolchain.CARGO:
+            return []
+        return ["ccache"]
+
+    def mounts(self) -> Optional[List[Tuple[str, str]]]:
+        """
+        Host directories to bind mount into the compile step. Host directories are created if missing.
+        :return: list of (host path, container path)
+        """
+        if not self.enabled:
+            return None
+
+        host_dir = Path(self.config.Directory).absolute()
+        match self.toolchain:
+            case Toolchain.CARGO:
+                target_dir = host_dir / "cargo" / "target"
+                mounts = [(host_dir / "cargo" / "home", self.CARGO_HOME),
+                          (target_dir / self.scope if self.scope else target_dir, self.CARGO_TARGET_DIR)]
+            case _:
+                mounts = [(host_dir / "ccache", self.CCACHE_DIR)]
+
+        for host_path, _ in mounts:
+            host_path.mkdir(parents=True, exist_ok=True)
+
+        return [(str(host_path), container_path) for host_path, container_path in mounts]
+
+    def env(self) -> Optional[Dict[str, str]]:
+        """
+        Environment variables pointing the toolchain at the mounted cache.
+        :return:
+        """
+        if not self.enabled:
+            return None
+
+        match self.toolchain:
+            case Toolchain.CARGO:
+                return {"CARGO_HOME": self.CARGO_HOME, "CARGO_TARGET_DIR": self.CARGO_TARGET_DIR}
+            case Toolchain.CMAKE:
+                return {"CCACHE_DIR": self.CCACHE_DIR, "CCACHE_MAXSIZE": self.config.MaxSize,
+                        "CMAKE_C_COMPILER_LAUNCHER": "ccache", "CMAKE_CXX_COMPILER_LAUNCHER": "ccache"}
+            case _:
+                return {"CCACHE_DIR": self.CCACHE_DIR, "CCACHE_MAXSIZE": self.config.MaxSize,
+                        "CC": "ccache gcc", "CXX": "ccache g++"}
@@ -0,0 +1,29 @@
+import shlex
+
+from ..spec.build.valkey.valkey import DebloatConfig
+
+def debloat_script(prefix: str, config: DebloatConfig) -> str:
+    """
+    Shell script that strips the ELF files under prefix, deletes files matching the remove patterns under prefix
+    and the remove paths, and prints the bytes saved on the container file system.
+    :param prefix: valkey install prefix.
+    :param config:
+    :return:
+    """
+    lines = [
+        "set -e",
+        "size() { du -sxb / 2>/dev/null | cut -f1; }",
+        "before=$(size)",
+    ]
+    if config.Strip:
+        lines.append(f"""find {shlex.quote(prefix)} -type f | while read -r f; do
+    if [ "$(head -c 4 "$f" | tail -c 3)" = "ELF" ]; then strip --strip-unneeded "$f"; fi
+done""")
+    if config.RemovePatterns:
+        patterns = " -o ".join(f"-name {shlex.quote(pattern)}" for pattern in config.RemovePatterns)
+        lines.append(f"find {shlex.quote(prefix)} -type f \\( {patterns} \\) -delete")
+    if config.RemovePaths:
+        lines.append(f"rm -rf {shlex.join(config.RemovePaths)}")
+    lines.append("after=$(size)")
+    lines.append('echo "Debloat saved $((before - after)) bytes ($before -> $after)"')
+    return "\n".join(lines)
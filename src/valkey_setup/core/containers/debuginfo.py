@@ -0,0 +1,63 @@
+import shlex
+from typing import List, Tuple
+
+from .buildah import BuildahContainer
+from ..spec import BuildSpec
+
+DEBUGINFO_SUFFIX = "-debuginfo"
+
+
+def debuginfo_tag(image_tag: str) -> str:
+    return image_tag + DEBUGINFO_SUFFIX
+
+
+def split_debuginfo_script(paths: List[str], directory: str) -> str:
+    """
+    Shell script moving the debug sections of every ELF file under paths into a separate file and stripping it.
+    Debug files are named by build ID (<directory>/.build-id/xx/yyyy.debug), where gdb, perf and systemd-coredump
+    look them up; files without a build ID fall back to <directory>/<path>.debug. The stripped file keeps a
+    .gnu_debuglink to its debug file.
+    :param paths: files or directories to process.
+    :param directory: root of the debug files, usually /usr/lib/debug.
+    :return:
+    """
+    directory = shlex.quote(directory)
+    return f"""
+set -e
+find {shlex.join(paths)} -type f | while read -r f; do
+    [ "$(head -c 4 "$f" | tail -c 3)" = "ELF" ] || continue
+    id=$(readelf -n "$f" | sed -n 's/.*Build ID: *//p' | head -n 1)
+    if [ -n "$id" ]; then
+        debug={directory}/.build-id/$(echo "$id" | cut -c1-2)/$(echo "$id" | cut -c3-).debug
+    else
+        debug={directory}"$f".debug
+    fi
+    mkdir -p "$(dirname "$debug")"
+    objcopy --only-keep-debug --compress-debug-sections "$f" "$debug"
+    chmod 0644 "$debug"
+    objcopy --strip-debug --strip-unneeded --add-gnu-debuglink="$debug" "$f"
+    echo "Debug info of $f split into $debug"
+done
+"""
+
+
+def commit_debuginfo_image(config: BuildSpec, cache_prefix: str, source_image: str, container_name: str,
+                           image_name_tag: str, labels: List[Tuple[str, str]]):
+    """
+    Commit the debug files of source_image into an image of their own, built from scratch so it holds nothing else.
+    Mount it at the debug directory (e.g. podman --mount type=image,source=<image>,target=/usr/lib/debug) or copy
+    from it when symbols are needed.
+    :param config:
+    :param cache_prefix:
+    :param source_image: image holding the split debug files.
+    :param container_name: working container name.
+    :param image_name_tag:
+    :param labels: extra --label entries.
+    :return:
+    """
+    directory = config.DebugInfo.Directory
+    with BuildahContainer(base_image="scratch", image_name=container_name + DEBUGINFO_SUFFIX, config=config,
+                          cache_prefix=cache_prefix) as container:
+        container.copy_container_current(source_image, directory, directory)
+        container.configure([("--label", f"org.valkey.debuginfo.directory={directory}")] + labels)
+        container.commit(image_name_tag)
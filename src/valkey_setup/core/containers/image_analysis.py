@@ -0,0 +1,184 @@
+import json
+import posixpath
+import tarfile
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+import sh
+from rich.console import Console
+from rich.table import Table
+
+from ..tracing import tracer, TracedCommand
+
+console = Console()
+
+WHITEOUT_PREFIX = ".wh."
+OPAQUE_WHITEOUT = ".wh..wh..opq"
+
+
+def classify(path: str, head: bytes) -> str:
+    """
+    File type category used in the size breakdown.
+    :param path: path inside the image, without leading slash.
+    :param head: first bytes of the file.
+    :return:
+    """
+    name = posixpath.basename(path)
+    if path.startswith(("usr/share/man/", "usr/share/doc/", "usr/share/info/")):
+        return "docs"
+    if "/locale/" in f"/{path}":
+        return "locale"
+    if name.endswith((".a", ".la")):
+        return "static libraries"
+    if name.endswith((".h", ".hpp")):
+        return "headers"
+    if head.startswith(b"\x7fELF"):
+        return "shared libraries" if ".so" in name else "executables"
+    if name.endswith((".py", ".pyc")):
+        return "python"
+    return "other"
+
+
+def _read_layer(path: Path) -> Tuple[int, List[Tuple[str, int, str]], List[str], List[str]]:
+    """
+    Read a layer tarball.
+    :param path:
+    :return: (size, [(path, bytes, category)], whiteouts, opaque directories)
+    """
+    files = []
+    whiteouts = []
+    opaque = []
+    with tarfile.open(path, "r:*") as tar:
+        for member in tar:
+            name = member.name[2:] if member.name.startswith("./") else member.name.lstrip("/")
+            base = posixpath.basename(name)
+            if base == OPAQUE_WHITEOUT:
+                opaque.append(posixpath.dirname(name))
+            elif base.startswith(WHITEOUT_PREFIX):
+                whiteouts.append(posixpath.join(posixpath.dirname(name), base[len(WHITEOUT_PREFIX):]))
+            elif member.isfile():
+                handle = tar.extractfile(member)
+                head = handle.read(4) if handle else b""
+                files.append((name, member.size, classify(name, head)))
+    return path.stat().st_size, files, whiteouts, opaque
+
+
+def analyze_image(buildah_path: str, image: str, depth: int = 3) -> Dict[str, Any]:
+    """
+    Break an image down by layer, directory and file type.
+    The image is pushed uncompressed to a temporary `dir:` layout and its layer tarballs are replayed, applying
+    whiteouts, to get the final file system. Bytes of files that a later layer replaces or deletes still ship in
+    the image and are reported as shadowed.
+    :param buildah_path:
+    :param image:
+    :param depth: directory depth of the directory breakdown.
+    :return:
+    """
+    buildah = TracedCommand(sh.Command(buildah_path), tracer)
+
+    with tempfile.TemporaryDirectory(prefix="valkey-analyze-") as directory:
+        with tracer.span("analyze", image=image, detail="push"):
+            buildah("push", "--disable-compression", image, f"dir:{directory}")
+
+        layout = Path(directory)
+        manifest = json.loads((layout / "manifest.json").read_text())
+        image_config = json.loads((layout / manifest["config"]["digest"].split(":", 1)[1]).read_text())
+
+        history = [entry for entry in image_config.get("history", []) if not entry.get("empty_layer")]
+        final: Dict[str, Tuple[int, str, int]] = {}
+        layers = []
+        shadowed = 0
+        for index, descriptor in enumerate(manifest["layers"]):
+            size, files, whiteouts, opaque = _read_layer(layout / descriptor["digest"].split(":", 1)[1])
+
+            removed = set(whiteouts)
+            for path in list(final):
+                if path in removed or any(path.startswith(f"{prefix}/") for prefix in removed | set(opaque)):
+                    shadowed += final.pop(path)[0]
+            for path, file_size, category in files:
+                if path in final:
+                    shadowed += final[path][0]
+                final[path] = (file_size, category, index)
+
+            created_by = history[index].get("created_by", "") if index < len(history) else ""
+            layers.append({"index": index, "digest": descriptor["digest"], "size": size,
+                           "files": len(files), "bytes": sum(f[1] for f in files), "created_by": created_by})
+
+    directories: Dict[str, int] = {}
+    types: Dict[str, Dict[str, int]] = {}
+    for path, (file_size, category, _) in final.items():
+        parent = "/" + "/".join(path.split("/")[:-1][:depth])
+        directories[parent] = directories.get(parent, 0) + file_size
+        entry = types.setdefault(category, {"files": 0, "bytes": 0})
+        entry["files"] += 1
+        entry["bytes"] += file_size
+
+    largest = sorted(final.items(), key=lambda item: item[1][0], reverse=True)
+    return {
+        "image": image,
+        "total": sum(entry[0] for entry in final.values()),
+        "shadowed": shadowed,
+        "layers": layers,
+        "directories": dict(sorted(directories.items(), key=lambda item: item[1], reverse=True)),
+        "types": dict(sorted(types.items(), key=lambda item: item[1]["bytes"], reverse=True)),
+        "largest": [{"path": "/" + path, "bytes": file_size, "type": category, "layer": layer}
+                    for path, (file_size, category, layer) in largest[:100]],
+    }
+
+
+def format_size(size: int) -> str:
+    if size < 1024:
+        return f"{size} B"
+    value = float(size)
+    for unit in ["KiB", "MiB", "GiB"]:
+        value /= 1024
+        if value < 1024 or unit == "GiB":
+            break
+    return f"{value:.1f} {unit}"
+
+
+def print_image_analysis(analysis: Dict[str, Any], top: int = 15):
+    """
+    Print the layer, directory, file type and largest file tables of an analysis.
+    :param analysis: output of analyze_image.
+    :param top: rows of the directory and largest file tables.
+    :return:
+    """
+    console.print(f"[bold blue]{analysis['image']}[/bold blue]: {format_size(analysis['total'])} of files, "
+                  f"{format_size(analysis['shadowed'])} shadowed by later layers")
+
+    table = Table(title="Layers")
+    for column in ["#", "Size", "Files", "Created by"]:
+        table.add_column(column, justify="left" if column == "Created by" else "right")
+    for layer in analysis["layers"]:
+        table.add_row(str(layer["index"]), format_size(layer["size"]), str(layer["files"]), layer["created_by"][-80:])
+    console.print(table)
+
+    table = Table(title="File types")
+    for column in ["Type", "Files", "Size"]:
+        table.add_column(column, justify="left" if column == "Type" else "right")
+    for category, entry in analysis["types"].items():
+        table.add_row(category, str(entry["files"]), format_size(entry["bytes"]))
+    console.print(table)
+
+    table = Table(title="Directories")
+    table.add_column("Directory")
+    table.add_column("Size", justify="right")
+    for directory, size in list(analysis["directories"].items())[:top]:
+        table.add_row(directory, format_size(size))
+    console.print(table)
+
+    table = Table(title="Largest files")
+    for column in ["File", "Type", "Layer", "Size"]:
+        table.add_column(column, justify="right" if column in ("Layer", "Size") else "left")
+    for entry in analysis["largest"][:top]:
+        table.add_row(entry["path"], entry["type"], str(entry["layer"]), format_size(entry["bytes"]))
+    console.print(table)
+
+
+def write_image_analysis(analysis: Dict[str, Any], output: Path):
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(analysis, f, indent=2)
+    console.print(f"Analysis written to {output}")
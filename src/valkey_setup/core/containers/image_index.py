@@ -0,0 +1,81 @@
+import json
+from typing import Dict, Optional, List
+
+import sh
+
+
+def normalize_image_name(name: str) -> str:
+    """
+    Normalize an image reference the way buildah stores it locally.
+    'valkey-setup/cache/core:abc' -> 'localhost/valkey-setup/cache/core:abc'
+    'valkey' -> 'localhost/valkey:latest'
+    :param name:
+    :return:
+    """
+    first, _, rest = name.partition("/")
+    if not rest or ("." not in first and ":" not in first and first != "localhost"):
+        name = "localhost/" + name
+
+    if ":" not in name.rsplit("/", 1)[-1] and "@" not in name:
+        name += ":latest"
+
+    return name
+
+
+def parse_image_list(output: str) -> Dict[str, str]:
+    """
+    Map normalized image names to image IDs from `buildah images --json` output.
+    :param output:
+    :return:
+    """
+    try:
+        images_list = json.loads(output) or []
+    except json.JSONDecodeError:
+        return {}
+
+    images = {}
+    for img_data in images_list:
+        # Dangling images have no names and can never be a cache hit
+        for name in img_data.get("names") or []:
+            images[normalize_image_name(name)] = img_data.get("id", "")
+    return images
+
+
+class ImageIndex:
+    def __init__(self, buildah_cmd: sh.Command):
+        self._buildah_cmd = buildah_cmd
+        self._images: Optional[Dict[str, str]] = None
+
+    def refresh(self):
+        """
+        Rebuild the index of local image names from a single `buildah images --json` call.
+        :return:
+        """
+        self._images = {}
+
+        try:
+            output = self._buildah_cmd("images", "--json")
+        except sh.ErrorReturnCode:
+            return
+
+        self._images = parse_image_list(str(output))
+
+    def _index(self) -> Dict[str, str]:
+        if self._images is None:
+            self.refresh()
+        return self._images
+
+    def exists(self, tag: str) -> bool:
+        return normalize_image_name(tag) in self._index()
+
+    def image_id(self, tag: str) -> Optional[str]:
+        return self._index().get(normalize_image_name(tag))
+
+    def add(self, tag: str, image_id: str = ""):
+        self._index()[normalize_image_name(tag)] = image_id
+
+    def remove(self, tag: str):
+        self._index().pop(normalize_image_name(tag), None)
+
+    def names(self) -> List[str]:
+        return list(self._index().keys())
@@ -0,0 +1,53 @@
+import shlex
+from typing import List
+
+MINIMAL_ROOT = "/tmp/minimal-root"
+
+
+def minimal_root_script(prefix: str, files: List[str], uid: int, gid: int, home: str, data_dir: str) -> str:
+    """
+    Shell script assembling the root file system of a minimal runtime image under MINIMAL_ROOT: the prefix, the
+    shared libraries its ELF files load (the DT_NEEDED closure as resolved by ldd, including the dynamic loader),
+    the given data files and passwd/group entries for the valkey user. Symbolic links are copied together with
+    their targets. Fails if a library cannot be resolved.
+    :param prefix: valkey install prefix.
+    :param files: data files or directories to copy; missing ones are skipped with a warning.
+    :param uid:
+    :param gid:
+    :param home: home directory of the valkey user.
+    :param data_dir: directory created in the root for the server data.
+    :return:
+    """
+    return f"""
+set -e
+R={MINIMAL_ROOT}
+rm -rf "$R" && mkdir -p "$R"
+copy() {{
+    if [ ! -e "$1" ] && [ ! -L "$1" ]; then echo "Skipping missing $1" >&2; return 0; fi
+    mkdir -p "$R$(dirname "$1")"
+    if [ -L "$1" ]; then
+        cp -P "$1" "$R$1"
+        copy "$(readlink -f "$1")"
+    elif [ -d "$1" ]; then
+        mkdir -p "$R$1" && cp -a "$1/." "$R$1/"
+    else
+        cp -p "$1" "$R$1"
+    fi
+}}
+find {shlex.quote(prefix)} -type f > /tmp/minimal-elf
+: > /tmp/minimal-closure
+while read -r f; do
+    [ "$(head -c 4 "$f" | tail -c 3)" = "ELF" ] || continue
+    if ldd "$f" | grep -q "not found"; then echo "Unresolved libraries of $f:" >&2; ldd "$f" >&2; exit 1; fi
+    ldd "$f" | awk '$2 == "=>" && $3 ~ /^\\// {{ print $3 }} $1 ~ /^\\// {{ print $1 }}' >> /tmp/minimal-closure
+done < /tmp/minimal-elf
+sort -u /tmp/minimal-closure -o /tmp/minimal-closure
+copy {shlex.quote(prefix)}
+while read -r lib; do copy "$lib"; done < /tmp/minimal-closure
+for f in {shlex.join(files)}; do copy "$f"; done
+mkdir -p "$R/etc" "$R/tmp" "$R"{shlex.quote(data_dir)}
+chmod 1777 "$R/tmp"
+printf 'root:x:0:0:root:/root:/sbin/nologin\\nvalkey:x:{uid}:{gid}:Valkey Server:{home}:/sbin/nologin\\n' > "$R/etc/passwd"
+printf 'root:x:0:\\nvalkey:x:{gid}:\\n' > "$R/etc/group"
+echo "Minimal root: $(wc -l < /tmp/minimal-closure) libraries, $(du -sh "$R" | cut -f1)"
+"""
@@ -0,0 +1,34 @@
+import posixpath
+from typing import Dict, List, Tuple
+
+MANIFEST_LABEL = "org.valkey.module.files"
+
+
+def manifest_label(files: List[str]) -> Tuple[str, str]:
+    """
+    `buildah config` option recording the files a module image provides, as absolute paths.
+    :param files:
+    :return:
+    """
+    return "--label", f"{MANIFEST_LABEL}={','.join(files)}"
+
+
+def read_manifest(labels: Dict[str, str]) -> List[str]:
+    """
+    Files listed in the manifest label of a module image.
+    :param labels: labels of the module image.
+    :return: empty if the image has no manifest.
+    """
+    return [path for path in labels.get(MANIFEST_LABEL, "").split(",") if path]
+
+
+def group_by_directory(files: List[str]) -> Dict[str, List[str]]:
+    """
+    Group files by parent directory, so each group is installed with a single copy.
+    :param files:
+    :return: {directory: [files]}
+    """
+    groups: Dict[str, List[str]] = {}
+    for path in files:
+        groups.setdefault(posixpath.dirname(path), []).append(path)
+    return groups
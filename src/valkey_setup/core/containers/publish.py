@@ -0,0 +1,45 @@
+from typing import List
+
+import sh
+from rich.console import Console
+
+from ..spec import CompressionConfig
+from ..tracing import tracer, TracedCommand
+
+console = Console()
+
+
+def compression_args(compression: CompressionConfig) -> List[str]:
+    """
+    `buildah push` options selecting the layer compression. Local storage keeps layers uncompressed, so the format
+    is applied when an image leaves the host.
+    :param compression:
+    :return:
+    """
+    args = ["--compression-format", str(compression.Format)]
+    if compression.Level is not None:
+        args.extend(["--compression-level", str(compression.Level)])
+    return args
+
+
+def push_image(buildah_path: str, image: str, destination: str, compression: CompressionConfig,
+               tls_verify: bool = True):
+    """
+    Push a local image with the given layer compression.
+    :param buildah_path:
+    :param image:
+    :param destination: transport and reference, e.g. docker://registry.example.com/valkey:9.0.1 or oci:<dir>:<tag>.
+    :param compression:
+    :param tls_verify: only used by registry destinations.
+    :return:
+    """
+    buildah = TracedCommand(sh.Command(buildah_path), tracer)
+
+    args = ["push", "--quiet"] + compression_args(compression)
+    if destination.startswith("docker://"):
+        args.append(f"--tls-verify={str(tls_verify).lower()}")
+    args.extend([image, destination])
+
+    console.print(f"[dim]buildah {' '.join(args)}[/dim]")
+    with tracer.span("push", image=image, detail=f"{destination} {compression.Format}"):
+        buildah(*args)
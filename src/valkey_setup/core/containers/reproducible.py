@@ -0,0 +1,49 @@
+import os
+from typing import Dict, List, Optional
+
+from ..spec import BuildSpec
+
+
+def source_date_epoch(config: BuildSpec) -> int:
+    """
+    Timestamp of reproducible builds: SOURCE_DATE_EPOCH from the environment if set, else Reproducible.SourceDateEpoch.
+    :param config:
+    :return:
+    """
+    value = os.environ.get("SOURCE_DATE_EPOCH", "")
+    return int(value) if value.strip() else config.Reproducible.SourceDateEpoch
+
+
+def reproducible_env(config: BuildSpec, env: Optional[Dict[str, str]] = None) -> Optional[Dict[str, str]]:
+    """
+    Add SOURCE_DATE_EPOCH to a build environment, so compilers and archivers embed it instead of the current time.
+    :param config: env is returned unchanged unless Reproducible.Enabled.
+    :param env: e.g. the compiler cache environment.
+    :return:
+    """
+    if not config.Reproducible.Enabled:
+        return env
+    return (env or {}) | {"SOURCE_DATE_EPOCH": str(source_date_epoch(config))}
+
+
+def reproducible_commit_args(config: BuildSpec) -> List[str]:
+    """
+    `buildah commit` options making the image depend on its content only: a fixed creation time that is also applied
+    to every file in the layers, no history entries and no buildah version label.
+    :param config:
+    :return: empty unless Reproducible.Enabled.
+    """
+    if not config.Reproducible.Enabled:
+        return []
+    return ["--timestamp", str(source_date_epoch(config)), "--omit-history", "--identity-label=false"]
+
+
+def reproducible_copy_args(config: BuildSpec) -> List[str]:
+    """
+    `buildah copy` / `buildah add` options setting the mtime of the copied files.
+    :param config:
+    :return: empty unless Reproducible.Enabled.
+    """
+    if not config.Reproducible.Enabled:
+        return []
+    return ["--timestamp", str(source_date_epoch(config))]
@@ -0,0 +1,76 @@
+import re
+from typing import List, Dict, Optional
+
+# x86-64 microarchitecture levels understood by gcc/clang (-march) and rustc (-C target-cpu)
+X86_64_LEVELS = ["x86-64", "x86-64-v2", "x86-64-v3", "x86-64-v4"]
+
+MARCH_PATTERN = re.compile(r"-march=\S+")
+
+
+def check_march(march: str) -> str:
+    """
+    :param march: x86-64 level, or empty for the flags in the spec.
+    :return: march
+    """
+    if march and march not in X86_64_LEVELS:
+        raise RuntimeError(f"Unknown x86-64 level '{march}'. Expected one of {X86_64_LEVELS}.")
+    return march
+
+
+def variant_tag(tag: str, march: str) -> str:
+    """
+    '9.0.1', 'x86-64-v3' -> '9.0.1-x86-64-v3'
+    :param tag:
+    :param march:
+    :return:
+    """
+    return f"{tag}-{march}" if march else tag
+
+
+def march_env(march: str, env: Optional[Dict[str, str]] = None, rust: bool = False) -> Optional[Dict[str, str]]:
+    """
+    Add the variables selecting the target level to a build environment.
+    :param march: empty leaves env unchanged.
+    :param env: e.g. the compiler cache environment.
+    :param rust: set RUSTFLAGS instead of CFLAGS/CXXFLAGS.
+    :return:
+    """
+    if not march:
+        return env
+
+    if rust:
+        flags = {"RUSTFLAGS": f"-C target-cpu={march}"}
+    else:
+        flags = {"CFLAGS": f"-march={march}", "CXXFLAGS": f"-march={march}"}
+    return (env or {}) | flags
+
+
+def with_march(env: List[str], march: str) -> List[str]:
+    """
+    Point the CFLAGS/CXXFLAGS assignments of a spec Env list (e.g. "CFLAGS='-march=x86-64-v3 -flto'") at march.
+    -march options are replaced, other flags are kept; missing CFLAGS/CXXFLAGS assignments are added.
+    :param env:
+    :param march:
+    :return:
+    """
+    if not march:
+        return env
+
+    result = []
+    seen = set()
+    for entry in env:
+        name, sep, value = entry.partition("=")
+        if sep and name in ("CFLAGS", "CXXFLAGS"):
+            seen.add(name)
+            quote = value[0] if value[:1] in ("'", '"') else ""
+            flags = value.strip("'\"")
+            flags = MARCH_PATTERN.sub(f"-march={march}", flags) if MARCH_PATTERN.search(flags) \
+                else f"-march={march} {flags}".strip()
+            entry = f"{name}={quote}{flags}{quote}"
+        result.append(entry)
+
+    for name in ("CFLAGS", "CXXFLAGS"):
+        if name not in seen:
+            result.append(f"{name}='-march={march}'")
+
+    return result
@@ -0,0 +1,2 @@
+from .graph import BuildGraph
+from .output import node_output, bound_stream
@@ -0,0 +1,109 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Callable, Dict, List, Optional
+
+from rich.console import Console
+
+from .output import node_output
+from ..tracing import tracer
+
+console = Console()
+
+
+class BuildGraph:
+    def __init__(self, max_workers: int = 4):
+        if max_workers < 1:
+            raise RuntimeError("max_workers must be at least 1")
+
+        self.max_workers = max_workers
+        self._tasks: Dict[str, Callable[[], None]] = {}
+        self._dependencies: Dict[str, List[str]] = {}
+
+    def add(self, name: str, task: Callable[[], None], depends_on: Optional[List[str]] = None):
+        """
+        Register a node in the graph.
+        :param name: unique node name.
+        :param task: callable executed when all dependencies have completed.
+        :param depends_on: names of nodes that must complete first.
+        :return:
+        """
+        if name in self._tasks:
+            raise RuntimeError(f"Node '{name}' already exists in build graph.")
+
+        self._tasks[name] = task
+        self._dependencies[name] = list(depends_on or [])
+
+    def order(self) -> List[List[str]]:
+        """
+        Group nodes into stages. Nodes in the same stage do not depend on each other.
+        :return: list of stages in execution order.
+        """
+        for name, deps in self._dependencies.items():
+            for dep in deps:
+                if dep not in self._tasks:
+                    raise RuntimeError(f"Node '{name}' depends on unknown node '{dep}'.")
+
+        remaining = {name: set(deps) for name, deps in self._dependencies.items()}
+        stages = []
+        while remaining:
+            ready = sorted(name for name, deps in remaining.items() if not deps)
+            if not ready:
+                raise RuntimeError(f"Cycle detected in build graph between: {sorted(remaining)}")
+
+            stages.append(ready)
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+        return stages
+
+    def _run_task(self, name: str):
+        stdout, stderr = sys.stdout, sys.stderr
+        with stdout.node(name), stderr.node(name), tracer.span(name, "node"):
+            self._tasks[name]()
+
+    def run(self):
+        """
+        Execute every node, running independent nodes concurrently.
+        A node starts as soon as its dependencies have completed. Output of each node is prefixed with its name.
+        On the first failure no new nodes are started; running nodes are awaited and the error is re-raised.
+        :return:
+        """
+        self.order()  # Validates graph
+
+        completed = set()
+        pending = dict(self._dependencies)
+        running: Dict[Future, str] = {}
+        failure: Optional[BaseException] = None
+
+        with node_output(), ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                if failure is None:
+                    for name in sorted(pending):
+                        if all(dep in completed for dep in pending[name]):
+                            console.print(f"[bold magenta]Starting[/bold magenta] {name}")
+                            running[executor.submit(self._run_task, name)] = name
+                            del pending[name]
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        console.print(f"[bold red]Failed[/bold red] {name}: {type(error).__name__} {error}")
+                        if failure is None:
+                            failure = error
+                        continue
+
+                    console.print(f"[bold green]Finished[/bold green] {name}")
+                    completed.add(name)
+
+        if failure is not None:
+            skipped = sorted(pending)
+            if skipped:
+                console.print(f"[yellow]Skipped due to earlier failure: {skipped}[/yellow]")
+            raise failure
@@ -0,0 +1,130 @@
+import sys
+import threading
+from contextlib import contextmanager
+from typing import IO, Callable, Optional, Union
+
+
+class PrefixedWriter:
+    def __init__(self, prefix: str, stream: IO[str], lock: threading.Lock):
+        """
+        Writes complete lines to stream, each starting with prefix. Partial lines are held back until their newline,
+        so lines of concurrent writers sharing the stream do not mix.
+        :param prefix:
+        :param stream:
+        :param lock: shared by all writers of stream.
+        """
+        self.prefix = prefix
+        self.stream = stream
+        self._lock = lock
+        self._pending = ""
+
+    @property
+    def encoding(self) -> str:
+        # StringIO and some captured streams have encoding set to None
+        return getattr(self.stream, "encoding", None) or "utf-8"
+
+    def write(self, text: Union[str, bytes]) -> int:
+        if isinstance(text, bytes):
+            text = text.decode(self.encoding, errors="replace")
+        lines = (self._pending + text).split("\n")
+        self._pending = lines.pop()
+        if lines:
+            with self._lock:
+                self.stream.write("".join(f"{self.prefix}{line}\n" for line in lines))
+                self.stream.flush()
+        return len(text)
+
+    def flush(self):
+        # Callers flush after every chunk (e.g. sh), so a partial line still waits for its newline
+        self.stream.flush()
+
+    def close(self):
+        """
+        Write out a trailing partial line.
+        :return:
+        """
+        if self._pending:
+            with self._lock:
+                self.stream.write(f"{self.prefix}{self._pending}\n")
+                self.stream.flush()
+            self._pending = ""
+
+    def isatty(self) -> bool:
+        return self.stream.isatty()
+
+
+class NodeOutput:
+    def __init__(self, stream: IO[str]):
+        """
+        Stands in for sys.stdout / sys.stderr while build graph nodes run on worker threads.
+        Output of a thread inside node() gets the node name as line prefix; other threads write through unchanged.
+        :param stream: the original stream.
+        """
+        self.stream = stream
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def encoding(self) -> str:
+        # StringIO and some captured streams have encoding set to None
+        return getattr(self.stream, "encoding", None) or "utf-8"
+
+    def bound(self) -> IO[str]:
+        """
+        Writer of the calling thread, for output written from other threads on its behalf (e.g. sh output
+        callbacks).
+        :return:
+        """
+        return getattr(self._local, "writer", None) or self.stream
+
+    def write(self, text: Union[str, bytes]) -> int:
+        writer = self.bound()
+        if writer is self.stream:
+            if isinstance(text, bytes):
+                text = text.decode(self.encoding, errors="replace")
+            with self._lock:
+                return self.stream.write(text)
+        return writer.write(text)
+
+    def flush(self):
+        self.bound().flush()
+
+    def isatty(self) -> bool:
+        return self.stream.isatty()
+
+    def fileno(self) -> int:
+        return self.stream.fileno()
+
+    @contextmanager
+    def node(self, name: str):
+        writer = PrefixedWriter(f"[{name}] ", self.stream, self._lock)
+        self._local.writer = writer
+        try:
+            yield
+        finally:
+            writer.close()
+            self._local.writer = None
+
+
+@contextmanager
+def node_output():
+    """
+    Replace sys.stdout and sys.stderr with NodeOutput for the enclosed block.
+    :return: (stdout, stderr)
+    """
+    stdout, stderr = sys.stdout, sys.stderr
+    sys.stdout, sys.stderr = NodeOutput(stdout), NodeOutput(stderr)
+    try:
+        yield sys.stdout, sys.stderr
+    finally:
+        sys.stdout, sys.stderr = stdout, stderr
+
+
+def bound_stream(stream: IO[str]) -> IO[str]:
+    """
+    Resolve stream for the calling thread. Use it for streams handed to code that writes from its own threads.
+    :param stream: sys.stdout or sys.stderr.
+    :return:
+    """
+    bound: Optional[Callable[[], IO[str]]] = getattr(stream, "bound", None)
+    return bound() if bound else stream
@@ -0,0 +1 @@
+from .planner import BuildPlanner, planner
@@ -0,0 +1,123 @@
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from rich.console import Console
+from rich.table import Table
+
+from ..containers.image_index import normalize_image_name
+
+console = Console()
+
+STATUS_STYLES = {"hit": "green", "miss": "bold red", "run": "dim", "commit": "blue"}
+
+
+class BuildPlanner:
+    def __init__(self):
+        """
+        Collects the steps of a dry run. Disabled until enable() is called; while enabled containers resolve
+        cache tags against the local image index instead of executing anything.
+        """
+        self.enabled = False
+        self._steps: List[Dict[str, Any]] = []
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def record(self, image: str, operation: str, status: str, detail: str = "", cache_tag: str = ""):
+        """
+        Record a planned step.
+        :param image: working container the step belongs to.
+        :param operation: e.g. 'run_cached', 'copy', 'run', 'commit'.
+        :param status: 'hit' or 'miss' for cached steps, 'run' for uncached steps and 'commit' for image commits.
+        :param detail: description of the step.
+        :param cache_tag: cache layer the step resolves to.
+        :return:
+        """
+        with self._lock:
+            self._steps.append({
+                "image": image,
+                "operation": operation,
+                "status": status,
+                "detail": " ".join(detail.split()),
+                "cache_tag": cache_tag,
+            })
+
+    def mark_committed(self, tag: str):
+        """
+        Remember that tag is committed during the planned run. Committing creates a new image ID,
+        so later steps keyed on the ID of tag cannot hit.
+        :param tag:
+        :return:
+        """
+        with self._lock:
+            self._pending.add(normalize_image_name(tag))
+
+    def is_pending(self, tag: str) -> bool:
+        with self._lock:
+            return normalize_image_name(tag) in self._pending
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Plan grouped by image, with hit/miss counts and the first miss of each image.
+        Every cached step after the first miss is built on a new layer and misses as well unless the same
+        layer was built before.
+        :return:
+        """
+        with self._lock:
+            steps = list(self._steps)
+
+        images: Dict[str, Dict[str, Any]] = {}
+        for step in steps:
+            image = images.setdefault(step["image"], {"image": step["image"], "hits": 0, "misses": 0,
+                                                      "first_miss": None, "steps": []})
+            entry = {key: value for key, value in step.items() if key != "image"}
+            if step["status"] == "hit":
+                image["hits"] += 1
+            elif step["status"] == "miss":
+                image["misses"] += 1
+                if image["first_miss"] is None:
+                    image["first_miss"] = {"index": len(image["steps"]), **entry}
+            image["steps"].append(entry)
+
+        hits = sum(image["hits"] for image in images.values())
+        misses = sum(image["misses"] for image in images.values())
+        return {
+            "up_to_date": misses == 0,
+            "hits": hits,
+            "misses": misses,
+            "images": list(images.values()),
+        }
+
+    def write_json(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def print_summary(self):
+        plan = self.to_dict()
+
+        for image in plan["images"]:
+            table = Table(title=f"Plan for {image['image']}")
+            for column in ["#", "Step", "Cache", "Layer", "Detail"]:
+                table.add_column(column, no_wrap=True, overflow="ellipsis",
+                                 max_width=None if column != "Detail" else 70)
+
+            first_miss: Optional[int] = image["first_miss"]["index"] if image["first_miss"] else None
+            for index, step in enumerate(image["steps"]):
+                style = STATUS_STYLES.get(step["status"], "white")
+                status = step["status"] + (" (first miss)" if index == first_miss else "")
+                table.add_row(str(index), step["operation"], f"[{style}]{status}[/{style}]",
+                              step["cache_tag"].rsplit(":", 1)[-1], step["detail"])
+            console.print(table)
+
+        if plan["up_to_date"]:
+            console.print(f"[bold green]All {plan['hits']} cached steps hit; only uncached steps and commits run.[/bold green]")
+        else:
+            console.print(f"[bold]{plan['hits']} cached steps hit, {plan['misses']} will be rebuilt.[/bold]")
+
+
+planner = BuildPlanner()
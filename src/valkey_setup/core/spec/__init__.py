@@ -1,2 +1,2 @@
-from .build import BuildSpec, Distro
-from .spec import load_spec
+from .build import BuildSpec, Distro, Compression, CompressionConfig
+from .spec import load_spec, pin_sha256
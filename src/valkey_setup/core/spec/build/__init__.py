@@ -1 +1 @@
-from .build import BuildSpec, Distro
+from .build import BuildSpec, Distro, Compression, CompressionConfig
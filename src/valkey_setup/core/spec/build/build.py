@@ -1,4 +1,5 @@
 from enum import StrEnum
+from typing import List, Dict, Optional
 
 from pydantic import BaseModel, Field
 
@@ -11,6 +12,123 @@ from .valkey_search import ValkeySearchConfig
 class BuildahConfig(BaseModel):
     Path: str = 'buildah'
 
+
+class CompilerCacheConfig(BaseModel):
+    Enabled: bool = False
+    Directory: str = ".tmp/compiler-cache"  # Host directory, persisted across builds
+    MaxSize: str = "10G"
+
+
+class ArtifactStoreConfig(BaseModel):
+    Enabled: bool = False
+    Directory: str = ".tmp/artifacts"  # Host directory holding downloaded sources
+    Offline: bool = False  # Never download; fail if an artifact is missing
+    AllowUnpinned: bool = False  # Accept sources without a Sha256 in the spec; `containers fetch --record` pins them
+
+
+class CacheConfig(BaseModel):
+    UsageFile: str = ".tmp/cache-usage.json"  # Last-used time and parent of every cache layer
+    MaxSize: str = ""  # Disk budget for `cache gc`, e.g. "50G". Empty means no size limit
+    MaxAge: str = ""  # Evict layers unused for longer than this, e.g. "14d". Empty means no age limit
+
+
+class DebugInfoConfig(BaseModel):
+    Enabled: bool = False  # Same as `--debuginfo` on core and module builds
+    Directory: str = "/usr/lib/debug"  # Split debug files, in build-id layout
+
+
+class ReproducibleConfig(BaseModel):
+    Enabled: bool = False  # Same as `--reproducible`
+    SourceDateEpoch: int = 0  # Image and file timestamps; SOURCE_DATE_EPOCH in the environment overrides it
+
+
+class Compression(StrEnum):
+    GZIP = "gzip"
+    ZSTD = "zstd"
+    ZSTD_CHUNKED = "zstd:chunked"  # zstd with a table of contents; lets nodes fetch only the files they lack
+
+
+class CompressionConfig(BaseModel):
+    Format: Compression = Compression.GZIP
+    Level: Optional[int] = None  # Format default if not set; gzip 1-9, zstd 1-20
+
+
+class PublishConfig(BaseModel):
+    Registry: str = ""  # Default destination prefix of `runtime push`, e.g. docker://registry.example.com/valkey
+    TlsVerify: bool = True
+    Compression: CompressionConfig = Field(default_factory=CompressionConfig)
+
+
+class BenchmarkSuiteConfig(BaseModel):
+    Name: str
+    Tests: List[str] = Field(default_factory=lambda: ["get", "set", "incr", "lpush"])  # valkey-benchmark -t
+    Pipeline: int = 1
+    DataSize: int = 64  # Value size in bytes
+    Clients: int = 50
+    Requests: int = 100000
+
+
+class BenchmarkThresholdConfig(BaseModel):
+    Throughput: float = 5.0  # Maximum drop in requests per second, in percent of the baseline
+    P99Latency: float = 10.0  # Maximum increase in p99 latency, in percent of the baseline
+
+
+class ModuleBenchmarkConfig(BaseModel):
+    Requests: int = 50000  # Per workload
+    Clients: int = 50
+    KeySpace: int = 10000  # Distinct keys the JSON workloads read and write (valkey-benchmark -r)
+    JsonDepth: int = 4  # Nesting depth of the JSON documents
+    VectorDimensions: List[int] = Field(default_factory=lambda: [32, 128, 768])
+    VectorKeys: int = 10000  # Vectors indexed before the KNN queries, per dimension
+    Knn: int = 10
+    BloomCapacity: int = 1000000  # BF.RESERVE capacity; BF.ADD inserts as many items
+
+
+class DatasetBenchmarkConfig(BaseModel):
+    Seed: int = 1  # Same seed, same dataset
+    Strings: int = 500000
+    StringSize: int = 100  # Value size in bytes
+    Hashes: int = 100000
+    HashFields: int = 10
+    HashFieldSize: int = 32
+    JsonDocuments: int = 50000  # Needs valkey-json in the image
+    JsonDepth: int = 4
+    Vectors: int = 20000  # Indexed with HNSW, needs valkey-search in the image
+    VectorDimensions: int = 128
+    Repeat: int = 3  # Cold starts per persistence mode; the median is reported
+    # Name -> valkey-server arguments applied on top of the image's valkey.conf
+    Persistence: Dict[str, List[str]] = Field(default_factory=lambda: {
+        "rdb": ["--appendonly", "no"],
+        "aof": ["--appendonly", "yes", "--save", ""],
+    })
+
+
+class PullBenchmarkConfig(BaseModel):
+    Formats: List[Compression] = Field(default_factory=lambda: list(Compression))
+    Level: Optional[int] = None  # Applied to every format
+    Repeat: int = 3  # Cold pulls per format; the median is reported
+    # Registry to push to and pull from, e.g. docker://localhost:5000/valkey-bench.
+    # Empty uses OCI layout directories, which pull whole layers (no partial zstd:chunked pulls)
+    Registry: str = ""
+    TlsVerify: bool = False
+
+
+class BenchmarkConfig(BaseModel):
+    ResultsDirectory: str = ".tmp/benchmarks"  # Results are stored per image and tag
+    Repeat: int = 3  # Runs per suite; the median is compared
+    Suites: List[BenchmarkSuiteConfig] = Field(default_factory=lambda: [BenchmarkSuiteConfig(Name="default")])
+    Threshold: BenchmarkThresholdConfig = Field(default_factory=BenchmarkThresholdConfig)
+    Modules: ModuleBenchmarkConfig = Field(default_factory=ModuleBenchmarkConfig)
+    Dataset: DatasetBenchmarkConfig = Field(default_factory=DatasetBenchmarkConfig)
+    Pull: PullBenchmarkConfig = Field(default_factory=PullBenchmarkConfig)
+
+
+class VariantsConfig(BaseModel):
+    # x86-64 levels `build-all` builds, e.g. ["x86-64-v2", "x86-64-v3", "x86-64-v4"].
+    # Empty builds a single variant with the flags in the spec
+    Levels: List[str] = []
+
+
 class Distro(StrEnum):
     SUSE = "suse"
 
@@ -19,6 +137,14 @@ class BuildSpec(BaseModel):
     BaseImage: str
     Distro: Distro
     Buildah: BuildahConfig = Field(default_factory=BuildahConfig)
+    CompilerCache: CompilerCacheConfig = Field(default_factory=CompilerCacheConfig)
+    ArtifactStore: ArtifactStoreConfig = Field(default_factory=ArtifactStoreConfig)
+    Cache: CacheConfig = Field(default_factory=CacheConfig)
+    Variants: VariantsConfig = Field(default_factory=VariantsConfig)
+    DebugInfo: DebugInfoConfig = Field(default_factory=DebugInfoConfig)
+    Reproducible: ReproducibleConfig = Field(default_factory=ReproducibleConfig)
+    Benchmark: BenchmarkConfig = Field(default_factory=BenchmarkConfig)
+    Publish: PublishConfig = Field(default_factory=PublishConfig)
     Valkey: ValkeyConfig = Field(default_factory=ValkeyConfig)
     ValkeyJson: ValkeyJsonConfig = Field(default_factory=ValkeyJsonConfig)
     ValkeySearch: ValkeySearchConfig = Field(default_factory=ValkeySearchConfig)
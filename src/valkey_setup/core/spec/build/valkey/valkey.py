@@ -3,9 +3,38 @@ from typing import List
 from pydantic import BaseModel, Field
 
 
+class PgoConfig(BaseModel):
+    Enabled: bool = False  # Same as `core build --pgo`
+    # Training workload: valkey-benchmark against a local valkey-server inside the build container
+    Tests: List[str] = Field(default_factory=lambda: ["set", "get", "incr", "lpush", "rpop", "sadd", "hset", "zadd",
+                                                      "lrange_100", "mset"])
+    Requests: int = 200000
+    Clients: int = 50
+    Pipeline: int = 16
+    DataSize: int = 64
+    ExtraArgs: List[str] = Field(default_factory=list)  # Further valkey-benchmark arguments, e.g. ["--threads", "4"]
+
+
 class BuildConfig(BaseModel):
     Dependencies: List[str] = Field(default_factory=list)
     Flags: List[str] = Field(default_factory=list)
+    Pgo: PgoConfig = Field(default_factory=PgoConfig)
+
+
+class DebloatConfig(BaseModel):
+    Enabled: bool = False  # Same as `runtime build --debloat`
+    Strip: bool = True  # strip --strip-unneeded the ELF binaries and modules under Prefix
+    StripPackages: List[str] = Field(default_factory=lambda: ["binutils"])  # Provide strip; removed afterwards
+    RemovePatterns: List[str] = Field(default_factory=lambda: ["*.a", "*.la", "*.h", "*.hpp"])  # Files under Prefix
+    RemovePaths: List[str] = Field(default_factory=lambda: ["/usr/share/man", "/usr/share/doc", "/usr/share/info",
+                                                            "/usr/share/locale"])
+
+
+class MinimalConfig(BaseModel):
+    Enabled: bool = False  # Same as `runtime build --minimal`
+    # Data files copied besides the shared-library closure; the zone named by TZ in Environment is added automatically
+    Files: List[str] = Field(default_factory=lambda: ["/etc/ssl/ca-bundle.pem", "/var/lib/ca-certificates/ca-bundle.pem",
+                                                      "/etc/ssl/certs"])
 
 
 class RuntimeConfig(BaseModel):
@@ -16,12 +45,16 @@ class RuntimeConfig(BaseModel):
     Uid: int = 26
     Gid: int = 26
     Ports: List[int] = Field(default_factory=list)
+    Debloat: DebloatConfig = Field(default_factory=DebloatConfig)
+    Minimal: MinimalConfig = Field(default_factory=MinimalConfig)
+    Layered: bool = False  # Same as `runtime build --layered`
 
 
 class ValkeyConfig(BaseModel):
     Version: str
     # MajorVersion: str
     SourceUrl: str
+    Sha256: str = ""
     Prefix: str = '/usr/local/valkey'
     Build: BuildConfig = Field(default_factory=BuildConfig)
     Runtime: RuntimeConfig = Field(default_factory=RuntimeConfig)
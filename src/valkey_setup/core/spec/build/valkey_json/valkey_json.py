@@ -15,6 +15,7 @@ class RuntimeConfig(BaseModel):
 
 class ValkeyJsonVersion(BaseModel):
     SourceUrl: str
+    Sha256: str = ""  # Digest of the `git archive` tarball of the tag
     Build: BuildConfig = Field(default_factory=BuildConfig)
     Runtime: RuntimeConfig = Field(default_factory=RuntimeConfig)
 
@@ -16,6 +16,7 @@ class RuntimeConfig(BaseModel):
 
 class ValkeySearchVersion(BaseModel):
     SourceUrl: str
+    Sha256: str = ""  # Digest of the `git archive` tarball of the tag
     Build: BuildConfig = Field(default_factory=BuildConfig)
     Runtime: RuntimeConfig = Field(default_factory=RuntimeConfig)
 
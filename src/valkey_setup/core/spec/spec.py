@@ -1,5 +1,6 @@
+import re
 from pathlib import Path
-from typing import TypeVar, Type
+from typing import TypeVar, Type, Tuple, List, Optional
 
 import typer
 import yaml
@@ -31,3 +32,44 @@ def load_spec(spec_file: Path, model: Type[T]) -> T:
     except Exception as e:
         console.print(f"[bold red]Invalid Configuration:[/bold red]\n{e}")
         raise typer.Exit(code=1)
+
+
+def pin_sha256(spec_file: Path, section: Tuple[str, ...], digest: str):
+    """
+    Write `Sha256: "<digest>"` into a source section of a YAML spec, next to its SourceUrl.
+    The file is edited line by line so comments and layout are kept.
+
+    :param spec_file: path to spec file.
+    :param section: keys leading to the section holding SourceUrl, e.g. ("ValkeyJson", "Versions", "1.0.2").
+    :param digest: sha256 hex digest.
+    :return:
+    """
+    lines = spec_file.read_text().splitlines(keepends=True)
+    stack: List[Tuple[int, str]] = []
+    source_line: Optional[int] = None
+    digest_line: Optional[int] = None
+
+    for index, line in enumerate(lines):
+        match = re.match(r"^(\s*)[\"']?([^\"'#:\s][^\"'#:]*)[\"']?\s*:", line)
+        if not match:
+            continue
+        indent, key = len(match.group(1)), match.group(2).strip()
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+        if tuple(k for _, k in stack) == section:
+            if key == "SourceUrl":
+                source_line = index
+            elif key == "Sha256":
+                digest_line = index
+        stack.append((indent, key))
+
+    if source_line is None:
+        raise RuntimeError(f"No SourceUrl under {'.'.join(section)} in {spec_file}")
+
+    indent = re.match(r"^\s*", lines[source_line]).group(0)
+    entry = f'{indent}Sha256: "{digest}"\n'
+    if digest_line is not None:
+        lines[digest_line] = entry
+    else:
+        lines.insert(source_line + 1, entry)
+    spec_file.write_text("".join(lines))
@@ -0,0 +1,151 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List
+
+import sh
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+
+class Tracer:
+    def __init__(self):
+        """
+        Collects timed spans of build operations. Disabled (no-op) until enable() is called.
+        """
+        self.enabled = False
+        self._spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def enable(self):
+        self.enabled = True
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str, category: str = "step", **args):
+        """
+        Time the enclosed block.
+        :param name: span name, e.g. the operation.
+        :param category: 'node', 'step' or 'subprocess'.
+        :param args: attributes recorded with the span. The yielded dict can be updated inside the block,
+            e.g. with the cache outcome.
+        :return:
+        """
+        if not self.enabled:
+            yield {}
+            return
+
+        attrs = dict(args)
+        start = time.perf_counter()
+        try:
+            yield attrs
+        except BaseException:
+            attrs["error"] = True
+            raise
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self._spans.append({
+                    "name": name,
+                    "cat": category,
+                    "start": start - self._origin,
+                    "duration": end - start,
+                    "thread": threading.current_thread().name,
+                    "args": attrs,
+                })
+
+    @property
+    def spans(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._spans)
+
+    def write_chrome_trace(self, path: Path):
+        """
+        Write spans in the Chrome trace-event format (chrome://tracing, Perfetto).
+        :param path:
+        :return:
+        """
+        threads: Dict[str, int] = {}
+        events = []
+        for span in self.spans:
+            tid = threads.setdefault(span["thread"], len(threads) + 1)
+            events.append({
+                "name": span["name"],
+                "cat": span["cat"],
+                "ph": "X",
+                "ts": round(span["start"] * 1e6),
+                "dur": round(span["duration"] * 1e6),
+                "pid": os.getpid(),
+                "tid": tid,
+                "args": {k: v if isinstance(v, (str, int, float, bool)) else str(v) for k, v in span["args"].items()},
+            })
+        for name, tid in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}})
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def print_summary(self, top: int = 15):
+        """
+        Print totals per operation and the slowest steps.
+        :param top: number of slowest steps to list.
+        :return:
+        """
+        spans = self.spans
+        steps = [s for s in spans if s["cat"] == "step"]
+        subprocesses = [s for s in spans if s["cat"] == "subprocess"]
+
+        totals = Table(title="Build operations")
+        for column in ["Operation", "Count", "Total (s)", "Avg (s)", "Cache hits"]:
+            totals.add_column(column, justify="left" if column == "Operation" else "right")
+
+        by_name: Dict[str, List[Dict[str, Any]]] = {}
+        for span in steps + subprocesses:
+            by_name.setdefault(span["name"], []).append(span)
+        for name, group in sorted(by_name.items(), key=lambda item: -sum(s["duration"] for s in item[1])):
+            total = sum(s["duration"] for s in group)
+            cached = [s for s in group if "cache" in s["args"]]
+            hits = sum(1 for s in cached if s["args"]["cache"] == "hit")
+            totals.add_row(name, str(len(group)), f"{total:.2f}", f"{total / len(group):.3f}",
+                           f"{hits}/{len(cached)}" if cached else "-")
+        console.print(totals)
+
+        slowest = Table(title=f"Slowest {top} steps")
+        for column in ["Step", "Image", "Cache", "Hash", "Duration (s)", "Detail"]:
+            slowest.add_column(column, justify="right" if column == "Duration (s)" else "left", no_wrap=True,
+                               overflow="ellipsis", max_width=None if column != "Detail" else 60)
+        for span in sorted(steps, key=lambda s: -s["duration"])[:top]:
+            args = span["args"]
+            detail = " ".join(str(args.get("detail", "")).split())
+            slowest.add_row(span["name"], str(args.get("image", "")), str(args.get("cache", "-")),
+                            str(args.get("hash", "")), f"{span['duration']:.2f}", detail)
+        console.print(slowest)
+
+        subprocess_time = sum(s["duration"] for s in subprocesses)
+        console.print(f"[bold]{len(subprocesses)} buildah subprocesses, {subprocess_time:.2f}s total[/bold]")
+
+
+class TracedCommand:
+    def __init__(self, command: sh.Command, trace: Tracer):
+        """
+        Wraps an sh.Command so each invocation is recorded as a subprocess span.
+        :param command:
+        :param trace:
+        """
+        self._command = command
+        self._tracer = trace
+
+    def __call__(self, *args, **kwargs):
+        name = f"buildah {args[0]}" if args else "buildah"
+        with self._tracer.span(name, "subprocess", detail=" ".join(str(a) for a in args[1:])[:200]):
+            return self._command(*args, **kwargs)
+
+
+tracer = Tracer()
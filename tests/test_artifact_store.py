@@ -0,0 +1,72 @@
+import hashlib
+import shutil
+from pathlib import Path
+
+import pytest
+
+from valkey_setup.core import ArtifactStore, BuildSpec, load_spec, pin_sha256
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def spec_file(tmp_path) -> Path:
+    path = tmp_path / "build.yaml"
+    shutil.copy(ROOT / "configs" / "build.yaml", path)
+    return path
+
+
+def store(spec_file: Path, tmp_path: Path) -> ArtifactStore:
+    config = load_spec(spec_file, BuildSpec)
+    config.ArtifactStore.Directory = str(tmp_path / "artifacts")
+    return ArtifactStore(config)
+
+
+def stored_archive(artifacts: ArtifactStore, content: bytes) -> Path:
+    path = artifacts.path("https://example.com/src.tar.gz", "1.0", "src.tar.gz")
+    path.parent.mkdir(parents=True)
+    path.write_bytes(content)
+    return path
+
+
+def test_unpinned_artifact_is_rejected(spec_file, tmp_path):
+    artifacts = store(spec_file, tmp_path)
+    stored_archive(artifacts, b"source")
+
+    with pytest.raises(RuntimeError, match="No Sha256 recorded"):
+        artifacts.fetch_archive("https://example.com/src.tar.gz", "1.0", "", "src.tar.gz")
+
+    artifacts.config.AllowUnpinned = True
+    artifacts.fetch_archive("https://example.com/src.tar.gz", "1.0", "", "src.tar.gz")
+
+
+def test_pinned_artifact_is_verified(spec_file, tmp_path):
+    artifacts = store(spec_file, tmp_path)
+    stored_archive(artifacts, b"source")
+
+    digest = hashlib.sha256(b"source").hexdigest()
+    assert artifacts.fetch_archive("https://example.com/src.tar.gz", "1.0", digest.upper(), "src.tar.gz").exists()
+    with pytest.raises(RuntimeError, match="Checksum mismatch"):
+        artifacts.fetch_archive("https://example.com/src.tar.gz", "1.0", "0" * 64, "src.tar.gz")
+
+
+def test_pin_sha256_keeps_the_rest_of_the_spec(spec_file):
+    original = spec_file.read_text()
+
+    pin_sha256(spec_file, ("Valkey",), "a" * 64)
+    pin_sha256(spec_file, ("ValkeyJson", "Versions", "1.0.2"), "b" * 64)
+    pin_sha256(spec_file, ("ValkeyJson", "Versions", "1.0.2"), "c" * 64)
+
+    config = load_spec(spec_file, BuildSpec)
+    assert config.Valkey.Sha256 == "a" * 64
+    assert config.ValkeyJson.Versions["1.0.2"].Sha256 == "c" * 64
+    assert config.ValkeySearch.Versions["1.1.0"].Sha256 == ""
+
+    # Only the two Sha256 lines were added; comments stay
+    added = [line for line in spec_file.read_text().splitlines() if line not in original.splitlines()]
+    assert [line.strip() for line in added] == [f'Sha256: "{"a" * 64}"', f'Sha256: "{"c" * 64}"']
+
+
+def test_pin_sha256_requires_a_source_section(spec_file):
+    with pytest.raises(RuntimeError, match="No SourceUrl"):
+        pin_sha256(spec_file, ("ValkeyJson", "Versions", "9.9.9"), "a" * 64)
@@ -0,0 +1,149 @@
+import asyncio
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from valkey_setup.core import AsyncBuildah, AsyncBuildahContainer, AsyncCommandError, BuildSpec, \
+    BuildahContainer, load_spec
+from valkey_setup.core.containers import parse_image_list
+
+ROOT = Path(__file__).resolve().parent.parent
+FAKE_BUILDAH = ROOT / "benchmarks" / "fake_buildah.sh"
+
+
+def slow_buildah(tmp_path: Path) -> Path:
+    """
+    Logs start and end time of every call; `run` sleeps for the time given as its last argument and records its pid.
+    """
+    script = tmp_path / "buildah"
+    script.write_text(f"""#!/bin/sh
+D={tmp_path}
+echo "start $(date +%s.%N) $*" >> "$D/calls.log"
+case "$1" in
+    run)
+        for last; do :; done
+        echo $$ > "$D/run.pid"
+        echo "sleeping $last"
+        sleep "$last" ;;
+    fail)
+        echo "no such thing" >&2
+        exit 3 ;;
+    images)
+        echo "[]" ;;
+esac
+echo "end $(date +%s.%N) $*" >> "$D/calls.log"
+""")
+    script.chmod(0o755)
+    return script
+
+
+def max_overlap(log: Path) -> int:
+    events = []
+    for line in log.read_text().splitlines():
+        kind, timestamp, _ = line.split(" ", 2)
+        events.append((float(timestamp), 1 if kind == "start" else -1))
+    running = peak = 0
+    for _, change in sorted(events, key=lambda e: (e[0], e[1])):
+        running += change
+        peak = max(peak, running)
+    return peak
+
+
+def spec(tmp_path: Path, buildah: Path) -> BuildSpec:
+    config = load_spec(ROOT / "configs" / "build.yaml", BuildSpec)
+    config.Buildah.Path = str(buildah)
+    config.Cache.UsageFile = str(tmp_path / "usage.json")
+    return config
+
+
+def test_concurrency_is_bounded(tmp_path):
+    buildah = AsyncBuildah(str(slow_buildah(tmp_path)), max_concurrency=2)
+
+    async def main():
+        await asyncio.gather(*(buildah("run", f"c{i}", "--", "sleep", "0.2") for i in range(6)))
+
+    asyncio.run(main())
+    assert max_overlap(tmp_path / "calls.log") == 2
+
+
+def test_failures_raise_with_stderr(tmp_path):
+    buildah = AsyncBuildah(str(slow_buildah(tmp_path)))
+
+    with pytest.raises(AsyncCommandError, match="no such thing") as error:
+        asyncio.run(buildah("fail"))
+    assert error.value.exit_code == 3
+
+
+def test_output_is_prefixed_per_task(tmp_path, capsys):
+    buildah = AsyncBuildah(str(slow_buildah(tmp_path)))
+
+    async def main():
+        await asyncio.gather(buildah("run", "a", "--", "0", prefix="task-a", echo=True),
+                             buildah("run", "b", "--", "0", prefix="task-b", echo=True))
+
+    asyncio.run(main())
+    lines = capsys.readouterr().out.splitlines()
+    assert "task-a | sleeping 0" in lines and "task-b | sleeping 0" in lines
+
+
+def test_cancellation_kills_the_call_and_removes_the_container(tmp_path):
+    buildah = AsyncBuildah(str(slow_buildah(tmp_path)))
+    config = spec(tmp_path, tmp_path / "buildah")
+
+    async def build():
+        async with AsyncBuildahContainer("base:latest", "cancelled", config, "test/cache", buildah) as container:
+            await container.run(["sleep", "30"])
+
+    async def main():
+        task = asyncio.create_task(build())
+        while not (tmp_path / "run.pid").exists():
+            await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    start = time.monotonic()
+    asyncio.run(main())
+    assert time.monotonic() - start < 10
+    with pytest.raises(ProcessLookupError):
+        os.kill(int((tmp_path / "run.pid").read_text()), 0)
+
+    calls = [line.split(" ", 2)[2] for line in (tmp_path / "calls.log").read_text().splitlines()
+             if line.startswith("start")]
+    assert calls[-1] == "rm cancelled"
+    assert not any(line.startswith("end") and "sleep 30" in line
+                   for line in (tmp_path / "calls.log").read_text().splitlines())
+    assert buildah.containers == set()
+
+
+def test_async_and_sync_builds_share_cache_layers(tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_BUILDAH_STATE", str(tmp_path))
+    config = spec(tmp_path, FAKE_BUILDAH)
+
+    with BuildahContainer("base:latest", "sync", config, "test/cache") as container:
+        container.run(["mkdir", "/data"])
+        container.run_cached(["make", "install"], extra_cache_keys={"step": "compile"})
+
+    async def main():
+        buildah = AsyncBuildah(str(FAKE_BUILDAH))
+        async with AsyncBuildahContainer("base:latest", "async", config, "test/cache", buildah) as container:
+            await container.run(["mkdir", "/data"])
+            await container.run_cached(["make", "install"], extra_cache_keys={"step": "compile"})
+            return container.container.current_image
+
+    sync_layer = container.current_image
+    assert asyncio.run(main()) == sync_layer
+
+    log = (tmp_path / "invocations.log").read_text()
+    assert log.count("make install") == 1
+    assert "rm async" in log
+
+
+def test_parse_image_list():
+    output = '[{"id": "1", "names": ["valkey:8.1", "localhost/valkey-setup/cache:abc"]}, ' \
+             '{"id": "2", "names": null}, {"id": "3"}]'
+    assert parse_image_list(output) == {"localhost/valkey:8.1": "1", "localhost/valkey-setup/cache:abc": "1"}
+    assert parse_image_list("not json") == {}
+    assert parse_image_list("null") == {}
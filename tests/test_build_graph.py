@@ -0,0 +1,88 @@
+import threading
+
+import pytest
+
+from valkey_setup.core import BuildGraph
+
+
+def noop():
+    pass
+
+
+def test_order_groups_independent_nodes():
+    graph = BuildGraph()
+    graph.add("runtime", noop, depends_on=["core", "valkey-json", "valkey-bloom"])
+    graph.add("valkey-json", noop, depends_on=["core"])
+    graph.add("valkey-bloom", noop, depends_on=["core"])
+    graph.add("core", noop)
+
+    assert graph.order() == [["core"], ["valkey-bloom", "valkey-json"], ["runtime"]]
+
+
+def test_order_rejects_cycles_and_unknown_nodes():
+    graph = BuildGraph()
+    graph.add("a", noop, depends_on=["b"])
+    graph.add("b", noop, depends_on=["a"])
+    graph.add("c", noop)
+    with pytest.raises(RuntimeError, match=r"Cycle detected .*\['a', 'b'\]"):
+        graph.order()
+
+    graph = BuildGraph()
+    graph.add("a", noop, depends_on=["missing"])
+    with pytest.raises(RuntimeError, match="unknown node 'missing'"):
+        graph.order()
+
+
+def test_duplicate_nodes_are_rejected():
+    graph = BuildGraph()
+    graph.add("core", noop)
+    with pytest.raises(RuntimeError, match="already exists"):
+        graph.add("core", noop)
+
+
+def test_run_starts_nodes_after_their_dependencies():
+    finished = []
+    lock = threading.Lock()
+
+    def task(name):
+        def run():
+            with lock:
+                finished.append(name)
+        return run
+
+    graph = BuildGraph(max_workers=2)
+    graph.add("runtime", task("runtime"), depends_on=["json", "bloom"])
+    graph.add("json", task("json"), depends_on=["core"])
+    graph.add("bloom", task("bloom"), depends_on=["core"])
+    graph.add("core", task("core"))
+    graph.run()
+
+    assert finished[0] == "core" and finished[-1] == "runtime"
+    assert sorted(finished[1:3]) == ["bloom", "json"]
+
+
+def test_run_stops_starting_nodes_after_a_failure():
+    ran = []
+    release = threading.Event()
+
+    def fail():
+        raise ValueError("core failed")
+
+    def slow():
+        # Still running when core fails; it is awaited, not cancelled
+        release.wait(5)
+        ran.append("other")
+
+    graph = BuildGraph(max_workers=2)
+    graph.add("core", fail)
+    graph.add("other", slow)
+    graph.add("module", lambda: ran.append("module"), depends_on=["core"])
+    graph.add("late", lambda: ran.append("late"), depends_on=["other"])
+
+    timer = threading.Timer(0.2, release.set)
+    timer.start()
+    with pytest.raises(ValueError, match="core failed"):
+        graph.run()
+    timer.cancel()
+
+    assert ran == ["other"]
@@ -0,0 +1,23 @@
+from pathlib import Path
+
+from valkey_setup.core import BuildSpec, BuildahContainer, load_spec
+
+ROOT = Path(__file__).resolve().parent.parent
+FAKE_BUILDAH = ROOT / "benchmarks" / "fake_buildah.sh"
+
+
+def test_configure_runs_queued_steps_first(tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_BUILDAH_STATE", str(tmp_path))
+    config = load_spec(ROOT / "configs" / "build.yaml", BuildSpec)
+    config.Buildah.Path = str(FAKE_BUILDAH)
+    config.Cache.UsageFile = str(tmp_path / "usage.json")
+
+    with BuildahContainer("base:latest", "test", config, "test/cache", batch=True) as container:
+        container.run(["chown", "-R", "999:999", "/data"])
+        container.run(["rpm", "-e", "zypper"])
+        container.configure([("--user", "999")])
+
+    # The batch script spans several lines of the log
+    log = (tmp_path / "invocations.log").read_text()
+    assert log.index("run test -- sh -c chown -R 999:999 /data") < log.index("rpm -e zypper") \
+        < log.index("config --user 999 test")
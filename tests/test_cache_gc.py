@@ -0,0 +1,130 @@
+import json
+import time
+from pathlib import Path
+
+import sh
+
+from valkey_setup.core import CacheUsage, gc_cache_images
+from valkey_setup.core.containers.cache_gc import remove_images
+
+PREFIX = "valkey-setup/cache"
+DAY = 86400
+
+
+def cache(tag: str) -> str:
+    return f"localhost/{PREFIX}:{tag}"
+
+
+def fake_buildah(tmp_path: Path) -> Path:
+    """
+    Serves images.json and containers.json from tmp_path and logs rmi calls, one per line.
+    rmi fails for a call naming an image listed in busy.txt.
+    """
+    script = tmp_path / "buildah"
+    script.write_text(f"""#!/bin/sh
+D={tmp_path}
+case "$1" in
+    images) cat "$D/images.json" ;;
+    containers) cat "$D/containers.json" ;;
+    rmi)
+        shift
+        echo "$@" >> "$D/rmi.log"
+        for name in "$@"; do
+            if grep -qxF "$name" "$D/busy.txt" 2>/dev/null; then echo "image is in use" >&2; exit 1; fi
+        done
+        ;;
+esac
+""")
+    script.chmod(0o755)
+    return script
+
+
+def setup_cache(tmp_path: Path) -> CacheUsage:
+    """
+    a1 <- a2 <- live image valkey-core, the base of a live image
+    b1 <- b2, b1 unused for long but b2 used an hour ago
+    c1, unused for long
+    w1, base of a working container
+    Sizes include parents: own sizes are a1 100, a2 50, b1 300, b2 100, c1 200, w1 10.
+    """
+    now = time.time()
+    images = [
+        {"id": "a1", "names": [cache("a1")], "size": 100},
+        {"id": "a2", "names": [cache("a2")], "size": 150},
+        {"id": "core", "names": ["valkey-core:8.1"], "size": 150},
+        {"id": "b1", "names": [cache("b1")], "size": 300},
+        {"id": "b2", "names": [cache("b2")], "size": 400},
+        {"id": "c1", "names": [cache("c1")], "size": 200},
+        {"id": "w1", "names": [cache("w1")], "size": 10},
+    ]
+    journal = {
+        cache("a1"): {"last_used": now - 30 * DAY},
+        cache("a2"): {"last_used": now - 30 * DAY, "parent": cache("a1")},
+        "localhost/valkey-core:8.1": {"last_used": now - 30 * DAY, "parent": cache("a2")},
+        cache("b1"): {"last_used": now - 10 * DAY},
+        cache("b2"): {"last_used": now - 3600, "parent": cache("b1")},
+        cache("c1"): {"last_used": now - 10 * DAY},
+        cache("w1"): {"last_used": now - 30 * DAY},
+        cache("gone"): {"last_used": now - 30 * DAY},
+    }
+    (tmp_path / "images.json").write_text(json.dumps(images))
+    (tmp_path / "containers.json").write_text(json.dumps([{"imageid": "w1"}]))
+    (tmp_path / "usage.json").write_text(json.dumps({"images": journal}))
+    return CacheUsage(tmp_path / "usage.json")
+
+
+def removed(tmp_path: Path) -> list:
+    log = tmp_path / "rmi.log"
+    return log.read_text().split() if log.exists() else []
+
+
+def test_protected_layers_survive_and_children_go_first(tmp_path):
+    usage = setup_cache(tmp_path)
+    gc_cache_images(str(fake_buildah(tmp_path)), PREFIX, usage, max_size=0)
+
+    # b1 counts as used when b2 was, ties go to the deeper layer
+    assert removed(tmp_path) == [cache("c1"), cache("b2"), cache("b1")]
+
+    journal = usage.load()
+    assert set(journal) == {cache("a1"), cache("a2"), cache("w1"), "localhost/valkey-core:8.1"}
+
+
+def test_max_age_keeps_recently_used_chains(tmp_path):
+    usage = setup_cache(tmp_path)
+    gc_cache_images(str(fake_buildah(tmp_path)), PREFIX, usage, max_age=DAY)
+
+    assert removed(tmp_path) == [cache("c1")]
+
+
+def test_max_size_stops_once_within_budget(tmp_path):
+    usage = setup_cache(tmp_path)
+    # 760 in total, evicting c1 leaves 560 and b2 leaves 460
+    gc_cache_images(str(fake_buildah(tmp_path)), PREFIX, usage, max_size=500)
+
+    assert removed(tmp_path) == [cache("c1"), cache("b2")]
+
+
+def test_dry_run_removes_nothing(tmp_path):
+    usage = setup_cache(tmp_path)
+    gc_cache_images(str(fake_buildah(tmp_path)), PREFIX, usage, max_size=0, dry_run=True)
+
+    assert removed(tmp_path) == []
+    assert cache("c1") in usage.load()
+
+
+def test_remove_images_in_chunks(tmp_path):
+    buildah = sh.Command(str(fake_buildah(tmp_path)))
+    names = [cache(f"l{i}") for i in range(5)]
+
+    assert remove_images(buildah, names, chunk_size=2) == names
+    assert (tmp_path / "rmi.log").read_text().splitlines() == [
+        f"{names[0]} {names[1]}", f"{names[2]} {names[3]}", names[4]]
+
+
+def test_failing_chunk_is_retried_per_image(tmp_path):
+    buildah = sh.Command(str(fake_buildah(tmp_path)))
+    names = [cache(f"l{i}") for i in range(3)]
+    (tmp_path / "busy.txt").write_text(names[1] + "\n")
+
+    assert remove_images(buildah, names, chunk_size=3) == [names[0], names[2]]
+    assert (tmp_path / "rmi.log").read_text().splitlines() == [" ".join(names)] + names
@@ -0,0 +1,31 @@
+from pathlib import Path
+
+from valkey_setup.core import BuildSpec, CompilerCache, Toolchain, load_spec
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def spec(tmp_path) -> BuildSpec:
+    config = load_spec(ROOT / "configs" / "build.yaml", BuildSpec)
+    config.CompilerCache.Enabled = True
+    config.CompilerCache.Directory = str(tmp_path)
+    return config
+
+
+def test_cargo_target_dir_is_scoped_per_build(tmp_path):
+    config = spec(tmp_path)
+    v3 = dict(CompilerCache(config, Toolchain.CARGO, scope="valkeybloom-1.0.0-x86-64-v3").mounts())
+    v4 = dict(CompilerCache(config, Toolchain.CARGO, scope="valkeybloom-1.0.0-x86-64-v4").mounts())
+
+    target = {path: mount for mount, path in v3.items()}[CompilerCache.CARGO_TARGET_DIR]
+    assert Path(target) == tmp_path / "cargo" / "target" / "valkeybloom-1.0.0-x86-64-v3"
+    assert set(v3) - set(v4) == {target}
+
+    # Registry is shared
+    home = {path: mount for mount, path in v4.items()}[CompilerCache.CARGO_HOME]
+    assert Path(home) == tmp_path / "cargo" / "home"
+
+
+def test_ccache_is_shared(tmp_path):
+    config = spec(tmp_path)
+    assert CompilerCache(config, Toolchain.MAKE).mounts() == CompilerCache(config, Toolchain.CMAKE).mounts()
@@ -0,0 +1,101 @@
+import contextlib
+import io
+from pathlib import Path
+from typing import Callable, List, Dict, Any
+
+import pytest
+import sh
+import yaml
+
+from valkey_setup.containers.core.builder import CoreBuilder
+from valkey_setup.containers.modules.valkey_bloom.builder import ValkeyBloomBuilder
+from valkey_setup.containers.modules.valkey_json.builder import ValkeyJsonBuilder
+from valkey_setup.containers.modules.valkey_search.builder import ValkeySearchBuilder
+from valkey_setup.containers.runtime.builder import RuntimeBuilder, MODULES
+from valkey_setup.core import BuildSpec, tracer
+from valkey_setup.core.containers import ImageIndex
+
+ROOT = Path(__file__).resolve().parent.parent
+FAKE_BUILDAH = ROOT / "benchmarks" / "fake_buildah.sh"
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch) -> BuildSpec:
+    monkeypatch.setenv("FAKE_BUILDAH_STATE", str(tmp_path))
+    monkeypatch.setattr(tracer, "enabled", True)
+    monkeypatch.setattr(tracer, "_spans", [])
+
+    with open(ROOT / "configs" / "build.yaml") as f:
+        data = yaml.safe_load(f)
+    data["Buildah"] = {"Path": str(FAKE_BUILDAH)}
+    data["CompilerCache"] = {"Enabled": False}
+    data["ArtifactStore"] = {"Enabled": False}
+    data["Cache"] = {"UsageFile": str(tmp_path / "cache-usage.json")}
+    data["Valkey"]["Runtime"]["Resources"] = str(ROOT / data["Valkey"]["Runtime"].get("Resources", "resources"))
+    return BuildSpec(**data)
+
+
+def build_all(config: BuildSpec) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Build core, modules and runtime in dependency order.
+    :return: cached steps of each build, in order.
+    """
+    builders: Dict[str, Callable[[], None]] = {
+        "core": lambda: CoreBuilder(config).build(),
+        "valkey-json": lambda: ValkeyJsonBuilder(config).build(),
+        "valkey-search": lambda: ValkeySearchBuilder(config).build(),
+        "valkey-bloom": lambda: ValkeyBloomBuilder(config).build(),
+        "runtime": lambda: RuntimeBuilder(config, modules=[(module, "latest") for module in MODULES]).build(),
+    }
+    steps = {}
+    for name, build in builders.items():
+        start = len(tracer.spans)
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            build()
+        steps[name] = [span["args"] for span in tracer.spans[start:]
+                       if span["cat"] == "step" and "cache" in span["args"]]
+    return steps
+
+
+def misses(steps: List[Dict[str, Any]]) -> List[str]:
+    return [step["detail"] for step in steps if step["cache"] == "miss"]
+
+
+def image_ids() -> Dict[str, str]:
+    index = ImageIndex(sh.Command(str(FAKE_BUILDAH)))
+    return {name: index.image_id(name) for name in index.names() if "/cache/" not in name}
+
+
+def test_unchanged_rebuild_hits_every_step(config):
+    cold = build_all(config)
+    assert all(misses(steps) for steps in cold.values())
+    images = image_ids()
+
+    warm = build_all(config)
+    for name, steps in warm.items():
+        assert steps and misses(steps) == [], name
+    # Final images are not committed again, so copies keyed on their IDs stay valid
+    assert image_ids() == images
+
+
+def test_core_change_misses_only_core_dependent_steps(config):
+    build_all(config)
+    images = image_ids()
+
+    config.Valkey.Build.Flags = config.Valkey.Build.Flags + ["V=1"]
+    steps = build_all(config)
+
+    assert misses(steps["core"])
+    for module in ("valkey-json", "valkey-search", "valkey-bloom"):
+        assert misses(steps[module]) == [], module
+
+    # Runtime layers below the core binaries are kept, everything stacked on them is rebuilt
+    runtime = steps["runtime"]
+    first_miss = next(index for index, step in enumerate(runtime) if step["cache"] == "miss")
+    assert first_miss > 0
+    assert runtime[first_miss]["detail"].startswith(f"{config.ProjectName}-core:")
+    assert all(step["cache"] == "miss" for step in runtime[first_miss:])
+
+    changed = {name for name, image_id in image_ids().items() if images.get(name) != image_id}
+    assert changed == {f"localhost/{config.ProjectName}-core:{config.Valkey.Version}",
+                       f"localhost/{config.ProjectName}-runtime:{config.Valkey.Version}"}
@@ -0,0 +1,43 @@
+import os
+
+from valkey_setup.core.containers.buildah import hash_host_path
+
+
+def tree(root):
+    (root / "conf").mkdir(parents=True)
+    (root / "conf" / "valkey.conf").write_text("port 6379\n")
+    (root / "run.sh").write_text("#!/bin/sh\n")
+    return root
+
+
+def test_same_content_same_digest(tmp_path):
+    a, b = tree(tmp_path / "a"), tree(tmp_path / "b")
+    os.utime(b / "run.sh", (0, 0))
+
+    assert hash_host_path(a) == hash_host_path(b)
+    assert hash_host_path(a / "run.sh") == hash_host_path(b / "run.sh")
+
+
+def test_content_mode_and_names_change_the_digest(tmp_path):
+    digest = hash_host_path(tree(tmp_path / "a"))
+
+    (tmp_path / "a" / "conf" / "valkey.conf").write_text("port 6380\n")
+    changed = hash_host_path(tmp_path / "a")
+    assert changed != digest
+
+    (tmp_path / "a" / "run.sh").chmod(0o755)
+    assert hash_host_path(tmp_path / "a") != changed
+
+    b = tree(tmp_path / "b")
+    (b / "run.sh").rename(b / "start.sh")
+    assert hash_host_path(b) != digest
+
+
+def test_symlinks_hash_their_target_path(tmp_path):
+    root = tree(tmp_path / "a")
+    (root / "link").symlink_to("run.sh")
+    digest = hash_host_path(root)
+
+    (root / "link").unlink()
+    (root / "link").symlink_to("conf/valkey.conf")
+    assert hash_host_path(root) != digest
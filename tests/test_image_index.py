@@ -0,0 +1,43 @@
+from pathlib import Path
+
+import pytest
+import sh
+
+from valkey_setup.core.containers import ImageIndex, normalize_image_name
+
+FAKE_BUILDAH = Path(__file__).resolve().parent.parent / "benchmarks" / "fake_buildah.sh"
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("valkey-setup/cache/core:abc", "localhost/valkey-setup/cache/core:abc"),
+    ("valkey", "localhost/valkey:latest"),
+    ("valkey:8.1", "localhost/valkey:8.1"),
+    ("localhost/valkey:8.1", "localhost/valkey:8.1"),
+    ("registry.example.com/valkey", "registry.example.com/valkey:latest"),
+    ("registry:5000/valkey:8.1", "registry:5000/valkey:8.1"),
+    ("docker.io/library/valkey@sha256:abc", "docker.io/library/valkey@sha256:abc"),
+])
+def test_normalize_image_name(name, expected):
+    assert normalize_image_name(name) == expected
+
+
+def test_normalize_image_name_is_idempotent():
+    name = normalize_image_name("valkey-setup/cache/core")
+    assert normalize_image_name(name) == name
+
+
+def test_index_lists_images_once(tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_BUILDAH_STATE", str(tmp_path))
+    buildah = sh.Command(str(FAKE_BUILDAH))
+    image_id = str(buildah("commit", "test", "valkey-setup/cache/core:abc")).strip()
+
+    index = ImageIndex(buildah)
+    assert index.image_id("valkey-setup/cache/core:abc") == image_id
+    assert not index.exists("valkey-setup/cache/core:def")
+
+    index.add("valkey-setup/cache/core:def", "2")
+    index.remove("localhost/valkey-setup/cache/core:abc")
+    assert index.names() == ["localhost/valkey-setup/cache/core:def"]
+
+    log = (tmp_path / "invocations.log").read_text().splitlines()
+    assert log.count("images --json") == 1
@@ -0,0 +1,52 @@
+import io
+import threading
+
+from valkey_setup.core.pipeline.output import NodeOutput, PrefixedWriter, bound_stream
+
+
+class NoEncoding(io.StringIO):
+    encoding = None
+
+
+def test_prefixed_writer_holds_partial_lines():
+    stream = io.StringIO()
+    writer = PrefixedWriter("[core] ", stream, threading.Lock())
+
+    writer.write("first\nsec")
+    writer.flush()
+    assert stream.getvalue() == "[core] first\n"
+
+    writer.write("ond\nthird")
+    writer.close()
+    assert stream.getvalue() == "[core] first\n[core] second\n[core] third\n"
+
+
+def test_writers_accept_bytes_on_streams_without_encoding():
+    stream = NoEncoding()
+    output = NodeOutput(stream)
+    assert output.encoding == "utf-8"
+
+    output.write(b"plain\n")
+    with output.node("json"):
+        writer = bound_stream(output)
+        assert writer.encoding == "utf-8"
+        writer.write("café\n".encode("utf-8"))
+
+    assert stream.getvalue() == "plain\n[json] café\n"
+
+
+def test_node_output_prefixes_only_node_threads():
+    stream = io.StringIO()
+    output = NodeOutput(stream)
+
+    def node():
+        with output.node("bloom"):
+            output.write("from node\n")
+
+    thread = threading.Thread(target=node)
+    thread.start()
+    thread.join()
+    output.write("from main\n")
+
+    assert stream.getvalue() == "[bloom] from node\nfrom main\n"
+    assert bound_stream(output) is stream
@@ -0,0 +1,33 @@
+import hashlib
+import json
+from pathlib import Path
+
+from valkey_setup.core.bench import layout_size
+
+
+def blob(layout: Path, content: bytes) -> dict:
+    digest = hashlib.sha256(content).hexdigest()
+    path = layout / "blobs" / "sha256" / digest
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return {"digest": f"sha256:{digest}", "size": len(content)}
+
+
+def oci_layout(layout: Path, layer_sizes, descriptor_size: bool = True) -> int:
+    config = blob(layout, b'{"architecture":"amd64"}')
+    layers = [blob(layout, bytes([i]) * size) for i, size in enumerate(layer_sizes)]
+    manifest = blob(layout, json.dumps({"schemaVersion": 2, "config": config, "layers": layers}).encode())
+    if not descriptor_size:
+        del manifest["size"]
+    (layout / "index.json").write_text(json.dumps({"schemaVersion": 2, "manifests": [manifest]}))
+    return len((layout / "blobs" / "sha256" / manifest["digest"].split(":")[1]).read_bytes()) + config["size"]
+
+
+def test_layout_size_counts_manifest_config_and_layers(tmp_path):
+    overhead = oci_layout(tmp_path, [1000, 250])
+    assert layout_size(tmp_path) == {"bytes": overhead + 1250, "layers": 2}
+
+
+def test_manifest_size_falls_back_to_the_blob(tmp_path):
+    overhead = oci_layout(tmp_path, [10], descriptor_size=False)
+    assert layout_size(tmp_path) == {"bytes": overhead + 10, "layers": 1}
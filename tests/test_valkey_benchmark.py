@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import pytest
+
+from valkey_setup.core import BuildSpec, load_spec
+from valkey_setup.core.bench import require_shell, parse_csv, parse_ready, summarize, compare_results
+
+ROOT = Path(__file__).resolve().parent.parent
+
+OUTPUT = """#ready 12.5
+#suite default
+"test","rps","avg_latency_ms","p99_latency_ms"
+"SET","100000.00","0.250","0.500"
+"GET","120000.00","0.200","n/a"
+#suite default
+"test","rps","avg_latency_ms","p99_latency_ms"
+"SET","110000.00","0.240","0.700"
+"GET","130000.00","0.190","0.400"
+#suite pipeline
+SET: rps=1000000.00 (overall: 900000.00) avg_msec=0.1
+"test","rps","avg_latency_ms","p99_latency_ms"
+"SET","900000.00","0.900","2.000"
+#ready 9.5
+"""
+
+
+def test_parse_csv_splits_suites_and_skips_progress():
+    samples = parse_csv(OUTPUT)
+    assert sorted(samples) == ["default/GET", "default/SET", "pipeline/SET"]
+    assert samples["default/SET"] == [{"rps": 100000.0, "avg_latency_ms": 0.25, "p99_latency_ms": 0.5},
+                                      {"rps": 110000.0, "avg_latency_ms": 0.24, "p99_latency_ms": 0.7}]
+    # Non-numeric values are dropped
+    assert samples["default/GET"][0] == {"rps": 120000.0, "avg_latency_ms": 0.2}
+
+    assert sorted(parse_csv(OUTPUT, by_section=True)) == ["default", "pipeline"]
+    assert parse_ready(OUTPUT) == [12.5, 9.5]
+
+
+def test_summarize_takes_the_median():
+    summary = summarize(parse_csv(OUTPUT))
+    assert summary["default/SET"] == {"avg_latency_ms": 0.245, "p99_latency_ms": 0.6, "rps": 105000.0, "runs": 2}
+    assert summary["default/GET"]["p99_latency_ms"] == 0.4
+
+
+@pytest.fixture
+def config() -> BuildSpec:
+    spec = load_spec(ROOT / "configs" / "build.yaml", BuildSpec)
+    spec.Benchmark.Threshold.Throughput = 5.0
+    spec.Benchmark.Threshold.P99Latency = 10.0
+    return spec
+
+
+def results(rps: float, p99: float) -> dict:
+    return {"image": "valkey:test", "results": {"default/SET": {"rps": rps, "p99_latency_ms": p99}}}
+
+
+def test_changes_within_thresholds_pass(config):
+    assert compare_results(results(96000, 1.09), results(100000, 1.0), config) == []
+    # Improvements never regress
+    assert compare_results(results(150000, 0.5), results(100000, 1.0), config) == []
+
+
+def test_regressions_beyond_thresholds(config):
+    regressions = compare_results(results(94000, 1.2), results(100000, 1.0), config)
+    assert regressions == ["default/SET: throughput -6.0% (limit -5.0%)",
+                           "default/SET: p99 latency +20.0% (limit +10.0%)"]
+
+
+def test_tests_without_baseline_are_not_judged(config):
+    assert compare_results(results(1, 100), {}, config) == []
+    assert compare_results(results(1, 100), {"results": {"other/GET": {"rps": 100000}}}, config) == []
+
+
+def test_minimal_images_are_rejected():
+    with pytest.raises(RuntimeError, match="minimal image without a shell"):
+        require_shell("valkey-runtime-minimal:8.1", {"org.valkey.runtime": "minimal"})
+
+
+def test_regular_images_pass():
+    require_shell("valkey-runtime:8.1", {"org.valkey.version": "8.1"})
+    require_shell("valkey-runtime:8.1", {})
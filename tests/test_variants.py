@@ -0,0 +1,39 @@
+import pytest
+
+from valkey_setup.core.containers import check_march, variant_tag, march_env, with_march
+
+
+def test_check_march():
+    assert check_march("x86-64-v3") == "x86-64-v3"
+    assert check_march("") == ""
+    with pytest.raises(RuntimeError, match="Unknown x86-64 level 'x86-64-v5'"):
+        check_march("x86-64-v5")
+
+
+def test_variant_tag():
+    assert variant_tag("9.0.1", "x86-64-v3") == "9.0.1-x86-64-v3"
+    assert variant_tag("9.0.1", "") == "9.0.1"
+
+
+def test_march_env():
+    cache = {"CCACHE_DIR": "/ccache"}
+    assert march_env("", cache) is cache
+    assert march_env("", None) is None
+    assert march_env("x86-64-v3", cache) == {"CCACHE_DIR": "/ccache", "CFLAGS": "-march=x86-64-v3",
+                                             "CXXFLAGS": "-march=x86-64-v3"}
+    assert march_env("x86-64-v4", rust=True) == {"RUSTFLAGS": "-C target-cpu=x86-64-v4"}
+    # The caller's environment is not modified
+    assert cache == {"CCACHE_DIR": "/ccache"}
+
+
+def test_with_march_replaces_existing_march():
+    env = ["CFLAGS='-march=x86-64-v2 -flto'", 'CXXFLAGS="-O2 -march=native"', "LDFLAGS=-flto"]
+    assert with_march(env, "x86-64-v3") == [
+        "CFLAGS='-march=x86-64-v3 -flto'", 'CXXFLAGS="-O2 -march=x86-64-v3"', "LDFLAGS=-flto"]
+
+
+def test_with_march_adds_missing_flags():
+    assert with_march(["CFLAGS=-O2", "BUILD_TLS=yes"], "x86-64-v4") == [
+        "CFLAGS=-march=x86-64-v4 -O2", "BUILD_TLS=yes", "CXXFLAGS='-march=x86-64-v4'"]
+    env = ["CFLAGS=-O2"]
+    assert with_march(env, "") is env